@@ -0,0 +1,135 @@
+"""
+Замер столбцовой аналитики расходов на NumPy (bookkeeper.analytics.columnar).
+
+Сравнивает суммы за периоды бюджетов, траты по категориям и скользящие
+суммы за 30 дней, посчитанные циклом по объектам Expense, с векторными
+вычислениями над ExpenseColumns. Отдельно замеряется построение столбцов
+из строк SQLite и чтение тех же расходов через get_all.
+
+Запуск из корня проекта (нужен NumPy):
+python -m benchmarks.bench_columnar --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Callable
+
+from bookkeeper.analytics.columnar import ExpenseColumns
+from bookkeeper.models.budget import ALLOWED_PERIODS, get_period_bounds
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+from benchmarks.bench_row_decoder import EXPENSE_TABLE
+
+CATEGORIES = 200
+DAYS = 5 * 365
+WINDOW = 30
+REPEATS = 3
+
+
+def measure(func: Callable[[], object]) -> float:
+    """Лучшее время выполнения функции из нескольких повторов, в мс."""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def loop_period_sums(expenses: list[Expense], current_date: date) -> dict[str, float]:
+    """Суммы за периоды бюджетов циклом по расходам."""
+    res = {}
+    for period in ALLOWED_PERIODS:
+        start_date, finish_date = get_period_bounds(period, current_date)
+        res[period] = sum(
+            expense.amount for expense in expenses
+            if start_date <= expense.expense_date < finish_date
+        )
+    return res
+
+
+def loop_category_totals(expenses: list[Expense]) -> dict[int | None, float]:
+    """Траты по категориям циклом по расходам."""
+    res: dict[int | None, float] = defaultdict(float)
+    for expense in expenses:
+        res[expense.category_id] += expense.amount
+    return res
+
+
+def loop_rolling_sums(
+        expenses: list[Expense],
+        start_date: date,
+        finish_date: date
+) -> list[float]:
+    """Скользящие суммы за WINDOW дней циклом по расходам."""
+    daily: dict[date, float] = defaultdict(float)
+    for expense in expenses:
+        daily[expense.expense_date] += expense.amount
+
+    res = []
+    window_sum = 0.0
+    day = start_date - timedelta(days=WINDOW - 1)
+    while day < finish_date:
+        window_sum += daily.get(day, 0.0)
+        window_sum -= daily.get(day - timedelta(days=WINDOW), 0.0)
+        if day >= start_date:
+            res.append(window_sum)
+        day += timedelta(days=1)
+    return res
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    first_day = date(2020, 1, 1)
+    last_day = first_day + timedelta(days=DAYS)
+    current_date = last_day - timedelta(days=1)
+    rnd = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, 'bench.db')
+        with SQLiteConnectionManager(db_file) as manager:
+            manager.connection.execute(EXPENSE_TABLE)
+            repo = SQLiteRepository[Expense](db_file, Expense, manager)
+            repo.add_many(
+                Expense(amount=round(rnd.uniform(1, 5000), 2),
+                        category_id=rnd.randint(1, CATEGORIES),
+                        expense_date=first_day + timedelta(days=rnd.randrange(DAYS)))
+                for _ in range(args.rows)
+            )
+
+            get_all = measure(repo.get_all)
+            build = measure(lambda: ExpenseColumns.from_repository(repo))
+            expenses = repo.get_all()
+            columns = ExpenseColumns.from_repository(repo)
+
+    results = [
+        ('period sums', measure(lambda: loop_period_sums(expenses, current_date)),
+         measure(lambda: columns.period_sums(ALLOWED_PERIODS, current_date))),
+        ('category totals', measure(lambda: loop_category_totals(expenses)),
+         measure(columns.category_totals)),
+        (f'rolling {WINDOW}-day sums',
+         measure(lambda: loop_rolling_sums(expenses, first_day, last_day)),
+         measure(lambda: columns.rolling_sums(WINDOW, first_day, last_day))),
+    ]
+
+    print(f'{args.rows} rows, best of {REPEATS}')
+    print(f'get_all (Expense objects)   {get_all:10.1f} ms')
+    print(f'ExpenseColumns from SQLite  {build:10.1f} ms')
+    print(f'{"":27} {"loop, ms":>10} {"numpy, ms":>10}')
+    for name, loop, vectorized in results:
+        print(f'{name:27} {loop:10.1f} {vectorized:10.3f}  ({loop / vectorized:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Замер влияния индексов из миграции 03_add_indexes на запросы к таблице расходов.
+
+Создает временную базу данных со схемой из миграций, заполняет ее расходами
+и замеряет время выборки и суммирования за период, выборки по категории
+и удаления категории (ON DELETE SET NULL) до и после создания индексов.
+
+Запуск из корня проекта:
+python -m benchmarks.bench_expense_indexes --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.models.category import Category
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+MIGRATION_DIR = os.path.join(
+    os.path.dirname(__file__), '..', 'bookkeeper', 'database', 'migration'
+)
+CATEGORIES = 200
+DAYS = 5 * 365
+REPEATS = 5
+
+
+def read_migration(name: str) -> str:
+    """Возвращает up-часть файла миграции."""
+    with open(os.path.join(MIGRATION_DIR, name), encoding='utf-8') as file:
+        return file.read().split('-- down')[0]
+
+
+def fill_database(db_file: str, rows: int) -> None:
+    """Создает схему и заполняет ее случайными расходами."""
+    rnd = random.Random(0)
+    first_day = date.today() - timedelta(days=DAYS)
+    added = datetime.now().replace(microsecond=0)
+
+    with sqlite3.connect(db_file) as con:
+        con.executescript(read_migration('01_init_tables.sql'))
+        con.executemany(
+            'INSERT INTO category (name) VALUES (?)',
+            [(f'category {i}',) for i in range(CATEGORIES)],
+        )
+        con.executemany(
+            'INSERT INTO expense (amount, category_id, expense_date, added_date, comment)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            (
+                (
+                    round(rnd.uniform(1, 5000), 2),
+                    rnd.randint(1, CATEGORIES),
+                    first_day + timedelta(days=rnd.randrange(DAYS)),
+                    added,
+                    '',
+                )
+                for _ in range(rows)
+            ),
+        )
+    con.close()
+
+
+def measure(func: Callable[[], object]) -> float:
+    """Лучшее время выполнения функции из нескольких повторов, в мс."""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_queries(
+        expenses: SQLiteRepository[Expense],
+        categories: SQLiteRepository[Category],
+        deleted_categories: list[int]
+) -> dict[str, float]:
+    """Замеряет время типичных запросов."""
+    finish = date.today()
+    start = finish - timedelta(days=30)
+    period = {'expense_date__gte': start, 'expense_date__lt': finish}
+    category_id = random.Random(1).randint(1, CATEGORIES)
+
+    def delete_category() -> None:
+        categories.delete(deleted_categories.pop())
+
+    return {
+        'sum for month': measure(lambda: expenses.aggregate('sum', 'amount', period)),
+        'get_all for month': measure(lambda: expenses.get_all(period)),
+        'get_all for category': measure(
+            lambda: expenses.get_all({'category_id': category_id})
+        ),
+        'category month sum': measure(lambda: expenses.aggregate(
+            'sum', 'amount', {'category_id': category_id, **period}
+        )),
+        'delete category': measure(delete_category),
+    }
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, 'bench.db')
+        print(f'Filling database with {args.rows} expenses...')
+        fill_database(db_file, args.rows)
+
+        with SQLiteConnectionManager(db_file) as manager:
+            expenses = SQLiteRepository[Expense](db_file, Expense, manager)
+            categories = SQLiteRepository[Category](db_file, Category, manager)
+            deleted = list(range(CATEGORIES, CATEGORIES - 2 * REPEATS, -1))
+
+            before = run_queries(expenses, categories, deleted)
+            manager.connection.executescript(read_migration('03_add_indexes.sql'))
+            manager.connection.execute('ANALYZE')
+            after = run_queries(expenses, categories, deleted)
+
+    print(f'{"query":<24}{"before, ms":>12}{"after, ms":>12}{"speedup":>10}')
+    for name, time_before in before.items():
+        time_after = after[name]
+        print(f'{name:<24}{time_before:>12.2f}{time_after:>12.2f}'
+              f'{time_before / time_after:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
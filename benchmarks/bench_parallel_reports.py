@@ -0,0 +1,99 @@
+"""
+Замер построения отчета о тратах по месяцам и категориям в нескольких процессах.
+
+Сравнивает ReportEngine (один запрос в текущем процессе) с
+ParallelReportRunner при разном числе процессов на многолетней истории
+расходов. Время пула замеряется без его запуска: первый отчет
+прогревает процессы.
+
+Запуск из корня проекта:
+python -m benchmarks.bench_parallel_reports --rows 2000000 --years 10
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+from bookkeeper.analytics.parallel_reports import ParallelReportRunner
+from bookkeeper.analytics.reports import ReportEngine
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+from benchmarks.bench_row_decoder import EXPENSE_TABLE
+
+CATEGORIES = 200
+REPEATS = 3
+EXPENSE_DATE_INDEX = (
+    'CREATE INDEX idx_expense_date ON expense (expense_date, amount)'
+)
+
+
+def measure(func: Callable[[], object]) -> float:
+    """Лучшее время выполнения функции из нескольких повторов, в мс."""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def worker_counts() -> list[int]:
+    """Число процессов для замеров: степени двойки до числа ядер."""
+    cpus = os.cpu_count() or 1
+    res = [1]
+    while res[-1] * 2 <= cpus:
+        res.append(res[-1] * 2)
+    if res[-1] != cpus:
+        res.append(cpus)
+    return res
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--years', type=int, default=10)
+    args = parser.parse_args()
+
+    first_day = date(2015, 1, 1)
+    days = args.years * 365
+    finish_date = first_day + timedelta(days=days)
+    rnd = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, 'bench.db')
+        with SQLiteConnectionManager(db_file, profile='fast') as manager:
+            manager.connection.execute(EXPENSE_TABLE)
+            manager.connection.execute(EXPENSE_DATE_INDEX)
+            repo = SQLiteRepository[Expense](db_file, Expense, manager)
+            repo.add_many(
+                Expense(amount=round(rnd.uniform(1, 5000), 2),
+                        category_id=rnd.randint(1, CATEGORIES),
+                        expense_date=first_day + timedelta(days=rnd.randrange(days)))
+                for _ in range(args.rows)
+            )
+
+            engine = ReportEngine(repo, max_size=0)
+            single = measure(lambda: engine.report(first_day, finish_date, 'month'))
+
+        print(f'{args.rows} rows, {args.years} years, monthly report, '
+              f'best of {REPEATS}')
+        print(f'ReportEngine          {single:10.1f} ms')
+        for workers in worker_counts():
+            with ParallelReportRunner(db_file, max_workers=workers) as runner:
+                runner.report(first_day, finish_date, 'month')
+                parallel = measure(
+                    lambda: runner.report(first_day, finish_date, 'month')
+                )
+            print(f'{workers:2} process(es)        {parallel:10.1f} ms  '
+                  f'({single / parallel:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
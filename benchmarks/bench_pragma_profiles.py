@@ -0,0 +1,125 @@
+"""
+Замер скорости записи и конкурентного чтения SQLite с разными профилями PRAGMA.
+
+Для каждого профиля (default - настройки SQLite без профиля, журнал отката)
+на новой базе измеряются:
+- одиночные вставки расходов, каждая в своей транзакции (как в приложении);
+- пакетная вставка add_many;
+- число отчетных запросов (aggregate по категориям) в секунду от нескольких
+  потоков-читателей, пока параллельно идут одиночные вставки, и число
+  вставок, которые писатель успевает сделать за это время.
+Читатели с профилями WAL используют профиль 'readonly-analytics'.
+
+Запуск из корня проекта:
+python -m benchmarks.bench_pragma_profiles --rows 20000 --readers 4
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+PROFILES = [None, 'durable', 'fast']
+EXPENSE_TABLE = '''CREATE TABLE expense (
+    pk INTEGER PRIMARY KEY AUTOINCREMENT,
+    amount REAL NOT NULL,
+    category_id INTEGER,
+    expense_date TEXT NOT NULL,
+    added_date TEXT NOT NULL,
+    comment TEXT
+)'''
+
+
+def make_expenses(count: int) -> list[Expense]:
+    """Расходы для вставки."""
+    first_day = date(2020, 1, 1)
+    return [
+        Expense(amount=i % 1000, category_id=i % 50, comment='comment',
+                expense_date=first_day + timedelta(days=i % 1000))
+        for i in range(count)
+    ]
+
+
+def measure_writes(repo: SQLiteRepository[Expense], rows: int) -> tuple[float, float]:
+    """Вставок в секунду: по одной в транзакции и пакетом add_many."""
+    single = max(rows // 20, 1)
+    start = time.perf_counter()
+    for expense in make_expenses(single):
+        repo.add(expense)
+    single_rate = single / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    repo.add_many(make_expenses(rows))
+    batch_rate = rows / (time.perf_counter() - start)
+    return single_rate, batch_rate
+
+
+def measure_concurrency(
+        db_file: str,
+        profile: str | None,
+        repo: SQLiteRepository[Expense],
+        readers: int,
+        duration: float
+) -> tuple[float, float]:
+    """Отчетов в секунду у читателей и вставок в секунду у писателя."""
+    reader_profile = None if profile is None else 'readonly-analytics'
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0]
+
+    def read(idx: int) -> None:
+        with SQLiteConnectionManager(db_file, profile=reader_profile) as manager:
+            reader = SQLiteRepository[Expense](db_file, Expense, manager)
+            while not stop.is_set():
+                reader.aggregate('sum', 'amount', group_by='category_id')
+                reads[idx] += 1
+
+    def write() -> None:
+        while not stop.is_set():
+            repo.add(Expense(amount=1, category_id=writes[0] % 50))
+            writes[0] += 1
+
+    threads = [threading.Thread(target=read, args=(idx,)) for idx in range(readers)]
+    threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / duration, writes[0] / duration
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f'{args.rows} rows, {args.readers} readers, {args.duration} s')
+    print(f'{"profile":10} {"single/s":>10} {"batch/s":>10} '
+          f'{"reports/s":>10} {"writes/s":>10}')
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_file = os.path.join(tmp_dir, 'bench.db')
+            with SQLiteConnectionManager(db_file, profile=profile) as manager:
+                manager.connection.execute(EXPENSE_TABLE)
+                repo = SQLiteRepository[Expense](db_file, Expense, manager)
+                single, batch = measure_writes(repo, args.rows)
+                reports, writes = measure_concurrency(
+                    db_file, profile, repo, args.readers, args.duration
+                )
+        print(f'{profile or "default":10} {single:10.0f} {batch:10.0f} '
+              f'{reports:10.1f} {writes:10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Замер скорости создания объектов из строк таблицы в SQLiteRepository.
+
+Сравнивает прежнюю реализацию _row2obj (цикл по полям со сравнением типов
+и сборкой словаря аргументов для каждой строки) с предкомпилированным
+декодером, а также время get_all на таблице расходов.
+
+Запуск из корня проекта:
+python -m benchmarks.bench_row_decoder --rows 200000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+REPEATS = 5
+EXPENSE_TABLE = '''CREATE TABLE expense (
+    pk INTEGER PRIMARY KEY AUTOINCREMENT,
+    amount REAL NOT NULL,
+    category_id INTEGER,
+    expense_date TEXT NOT NULL,
+    added_date TEXT NOT NULL,
+    comment TEXT
+)'''
+
+
+def legacy_row2obj(repo: SQLiteRepository[Expense], row: tuple[Any, ...]) -> Expense:
+    """Прежняя реализация SQLiteRepository._row2obj."""
+    class_arguments = {}
+    for field_value, field_name in zip(row[1:], repo.fields.keys()):
+        if repo.fields[field_name] == datetime:
+            field_value = datetime.fromisoformat(field_value)
+        if repo.fields[field_name] == date:
+            field_value = date.fromisoformat(field_value)
+        class_arguments[field_name] = field_value
+
+    obj: Expense = repo.cls(**class_arguments)
+    obj.pk = row[0]
+    return obj
+
+
+def measure(func: Callable[[], object]) -> float:
+    """Лучшее время выполнения функции из нескольких повторов, в мс."""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    """Точка входа."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, 'bench.db')
+        with SQLiteConnectionManager(db_file) as manager:
+            manager.connection.execute(EXPENSE_TABLE)
+            repo = SQLiteRepository[Expense](db_file, Expense, manager)
+            first_day = date(2020, 1, 1)
+            repo.add_many(
+                Expense(amount=i % 1000, category_id=i % 50, comment='comment',
+                        expense_date=first_day + timedelta(days=i % 1000))
+                for i in range(args.rows)
+            )
+            rows = manager.connection.execute(repo.queries['get_all']).fetchall()
+
+            legacy = measure(lambda: [legacy_row2obj(repo, row) for row in rows])
+            compiled = measure(lambda: [repo._row2obj(row) for row in rows])
+            get_all = measure(repo.get_all)
+
+    print(f'{args.rows} rows, best of {REPEATS}')
+    print(f'legacy _row2obj     {legacy:10.1f} ms')
+    print(f'compiled decoder    {compiled:10.1f} ms  ({legacy / compiled:.1f}x)')
+    print(f'get_all (with I/O)  {get_all:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Модуль учета трат по периодам бюджета
+"""
+
+from datetime import date
+from typing import Iterable, Mapping
+
+from bookkeeper.models.budget import ALLOWED_PERIODS, get_period_bounds
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.abstract_repository import AbstractRepository
+
+# Суммы меньше этой считаются нулевыми (ошибка округления после удалений).
+EPSILON = 1e-6
+
+
+class BudgetUsage:
+    """
+    Накопительные суммы трат по периодам бюджета.
+
+    Для каждого периода из ALLOWED_PERIODS хранится сумма трат
+    в каждом интервале (дне, неделе, месяце, годе), ключ интервала - дата
+    его начала. При добавлении, изменении или удалении расхода меняются
+    только интервалы, в которые он попадает, поэтому обновление и получение
+    трат за период не зависят от числа расходов.
+    """
+
+    def __init__(self, daily_totals: Mapping[date, float] | None = None) -> None:
+        # Период -> начало интервала -> сумма трат.
+        self._buckets: dict[str, dict[date, float]] = {
+            period: {} for period in ALLOWED_PERIODS
+        }
+        for day, amount in (daily_totals or {}).items():
+            self._change(day, amount)
+
+    @classmethod
+    def from_repository(
+            cls,
+            expense_repository: AbstractRepository[Expense]
+    ) -> 'BudgetUsage':
+        """
+        Построить счетчики по репозиторию расходов одним сгруппированным
+        по дням запросом.
+        """
+        return cls(expense_repository.aggregate('sum', 'amount', group_by='expense_date'))
+
+    def _change(self, day: date, amount: float) -> None:
+        for period, buckets in self._buckets.items():
+            start_date = get_period_bounds(period, day)[0]
+            total = buckets.get(start_date, 0.0) + amount
+            # Траты неотрицательны, поэтому почти нулевая сумма означает,
+            # что все траты интервала удалены.
+            if abs(total) < EPSILON:
+                buckets.pop(start_date, None)
+            else:
+                buckets[start_date] = total
+
+    def add(self, expense: Expense) -> None:
+        """Учесть новый расход."""
+        self._change(expense.expense_date, expense.amount)
+
+    def remove(self, expense: Expense) -> None:
+        """Убрать удаленный расход."""
+        self._change(expense.expense_date, -expense.amount)
+
+    def update(self, old: Expense, new: Expense) -> None:
+        """Заменить расход old его новой версией new."""
+        self.remove(old)
+        self.add(new)
+
+    def add_many(self, expenses: Iterable[Expense]) -> None:
+        """Учесть несколько новых расходов."""
+        for expense in expenses:
+            self.add(expense)
+
+    def get(self, period: str, current_date: date) -> float:
+        """Суммарные траты за период бюджета, содержащий дату current_date."""
+        start_date = get_period_bounds(period, current_date)[0]
+        return self._buckets[period].get(start_date, 0.0)
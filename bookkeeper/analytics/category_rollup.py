@@ -0,0 +1,120 @@
+"""
+Модуль подсчета расходов по категориям с учетом подкатегорий
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Mapping
+
+from bookkeeper.models.category import Category
+from bookkeeper.models.category_tree import CategoryTree
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.abstract_repository import AbstractRepository
+
+
+@dataclass
+class CategoryTotals:
+    """
+    Расходы по категории.
+    own - траты, записанные непосредственно на категорию
+    total - траты категории вместе со всеми подкатегориями
+    """
+    own: float = 0.0
+    total: float = 0.0
+
+
+def rollup_totals(
+        tree: CategoryTree,
+        own_totals: Mapping[int | None, float]
+) -> dict[int, CategoryTotals]:
+    """
+    Суммирует траты по поддеревьям категорий за один обратный обход дерева:
+    подкатегории обрабатываются раньше родителя, и их итог прибавляется
+    к итогу родителя.
+    own_totals - траты по id категории; траты без категории (None) и по
+    категориям, которых нет в дереве, не учитываются.
+    """
+    res = {
+        category.pk: CategoryTotals(own_totals.get(category.pk, 0.0))
+        for category in tree
+    }
+    for category in reversed(list(tree.topological_order())):
+        totals = res[category.pk]
+        totals.total += totals.own
+        parent = tree.parent(category.pk)
+        if parent is not None:
+            res[parent.pk].total += totals.total
+
+    return res
+
+
+def add_to_ancestors(
+        totals: dict[int, CategoryTotals],
+        tree: CategoryTree,
+        pk: int,
+        amount: float
+) -> list[int]:
+    """
+    Прибавляет amount (возможно, отрицательный) к итогам всех предков
+    категории pk. Возвращает id измененных категорий.
+    """
+    changed = [category.pk for category in tree.ancestors(pk)]
+    for ancestor_pk in changed:
+        totals[ancestor_pk].total += amount
+    return changed
+
+
+def add_expense_amount(
+        totals: dict[int, CategoryTotals],
+        tree: CategoryTree,
+        category_id: int | None,
+        amount: float
+) -> list[int]:
+    """
+    Учитывает в итогах rollup_totals траты amount (отрицательные - при
+    удалении расхода) по категории category_id: меняются собственные траты
+    категории и итоги ее и всех предков за O(глубины).
+    Возвращает id измененных категорий.
+    """
+    if category_id is None or category_id not in totals:
+        return []
+    totals[category_id].own += amount
+    totals[category_id].total += amount
+    return [category_id] + add_to_ancestors(totals, tree, category_id, amount)
+
+
+def get_own_totals(
+        expense_repository: AbstractRepository[Expense],
+        start_date: date | None = None,
+        finish_date: date | None = None
+) -> dict[int | None, float]:
+    """
+    Траты по id категории за период (start_date - включительно,
+    finish_date - исключая) одним сгруппированным запросом.
+    """
+    where: dict[str, Any] = {}
+    if start_date is not None:
+        where['expense_date__gte'] = start_date
+    if finish_date is not None:
+        where['expense_date__lt'] = finish_date
+
+    own_totals: dict[int | None, float] = expense_repository.aggregate(
+        'sum', 'amount', where=where or None, group_by='category_id'
+    )
+    return own_totals
+
+
+def get_category_totals(
+        category_repository: AbstractRepository[Category],
+        expense_repository: AbstractRepository[Expense],
+        start_date: date | None = None,
+        finish_date: date | None = None
+) -> dict[int, CategoryTotals]:
+    """
+    Расходы по каждой категории за период: start_date - включительно,
+    finish_date - исключая (границы можно не задавать).
+    Траты по категориям считаются одним сгруппированным запросом
+    к репозиторию расходов, итоги по поддеревьям - в памяти.
+    """
+    own_totals = get_own_totals(expense_repository, start_date, finish_date)
+    return rollup_totals(CategoryTree(category_repository.get_all()), own_totals)
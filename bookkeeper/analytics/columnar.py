@@ -0,0 +1,218 @@
+"""
+Модуль столбцового представления расходов для аналитики на NumPy.
+
+NumPy - необязательная зависимость приложения (poetry install -E analytics,
+для разработки ставится всегда). Если он не установлен, HAS_NUMPY = False,
+а создание ExpenseColumns вызывает ImportError.
+
+Приложение столбцы не использует: траты по периодам бюджета берутся
+из накопительных счетчиков BudgetUsage, отчеты строит ReportEngine
+запросами с группировкой. ExpenseColumns предназначен для разовой
+аналитики по длинной истории расходов (см. benchmarks/bench_columnar.py).
+"""
+
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any, Iterable, Protocol, runtime_checkable
+
+from bookkeeper.models.budget import get_period_bounds
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.abstract_repository import AbstractRepository
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+HAS_NUMPY = np is not None
+# Поля расхода, из которых строятся столбцы.
+COLUMNS = ('amount', 'expense_date', 'category_id')
+# id категории в столбце category_ids для расходов без категории.
+NO_CATEGORY = -1
+EPOCH = date(1970, 1, 1)
+
+
+@runtime_checkable
+class RawRowsRepository(Protocol):  # pylint: disable=too-few-public-methods
+    """
+    Репозиторий, отдающий значения полей без создания объектов модели
+    (например, SQLiteRepository).
+    """
+
+    def get_raw_rows(
+            self,
+            columns: Iterable[str],
+            where: dict[str, Any] | None = None
+    ) -> list[tuple[Any, ...]]:
+        """Значения полей columns в формате СУБД."""
+
+
+def _day(value: date) -> int:
+    """Номер дня от 1970-01-01."""
+    return (value - EPOCH).days
+
+
+class ExpenseColumns:
+    """
+    Расходы в виде столбцов NumPy, отсортированных по дате:
+    amounts - суммы, days - номера дней от 1970-01-01,
+    category_ids - id категорий (NO_CATEGORY для расходов без категории).
+
+    Границы периода находятся двоичным поиском по days, а сумма за период
+    берется из префиксных сумм за O(log N). Суммы по категориям, по дням
+    и скользящие суммы считаются векторно (bincount, cumsum) без цикла
+    по расходам в Python.
+    """
+
+    def __init__(
+            self,
+            amounts: Iterable[float],
+            days: Iterable[int],
+            category_ids: Iterable[int]
+    ) -> None:
+        if np is None:
+            raise ImportError('NumPy is required for columnar expense analytics')
+
+        days_array = np.fromiter(days, dtype=np.int64)
+        order = np.argsort(days_array, kind='stable')
+        self.days: 'npt.NDArray[np.int64]' = days_array[order]
+        self.amounts: 'npt.NDArray[np.float64]' = \
+            np.fromiter(amounts, dtype=np.float64)[order]
+        self.category_ids: 'npt.NDArray[np.int64]' = \
+            np.fromiter(category_ids, dtype=np.int64)[order]
+        self._prefix_sums = np.concatenate(([0.0], np.cumsum(self.amounts)))
+
+    @classmethod
+    def from_rows(
+            cls,
+            rows: Iterable[tuple[float, date | str, int | None]]
+    ) -> 'ExpenseColumns':
+        """
+        Построить столбцы по строкам (сумма, дата, id категории).
+        Дата - объект date или строка в формате ISO, как она хранится в SQLite.
+        """
+        if np is None:
+            raise ImportError('NumPy is required for columnar expense analytics')
+
+        rows = list(rows)
+        if not rows:
+            return cls((), (), ())
+
+        amounts, dates, category_ids = zip(*rows)
+        days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+        return cls(
+            amounts,
+            days,
+            (NO_CATEGORY if pk is None else pk for pk in category_ids),
+        )
+
+    @classmethod
+    def from_expenses(cls, expenses: Iterable[Expense]) -> 'ExpenseColumns':
+        """Построить столбцы по объектам расходов."""
+        return cls.from_rows(
+            (expense.amount, expense.expense_date, expense.category_id)
+            for expense in expenses
+        )
+
+    @classmethod
+    def from_repository(
+            cls,
+            expense_repository: AbstractRepository[Expense],
+            where: dict[str, Any] | None = None
+    ) -> 'ExpenseColumns':
+        """
+        Построить столбцы по расходам из репозитория. Из SQLite строки
+        читаются напрямую, без создания объектов Expense.
+        """
+        if isinstance(expense_repository, RawRowsRepository):
+            return cls.from_rows(expense_repository.get_raw_rows(COLUMNS, where))
+        return cls.from_expenses(expense_repository.iter_all(where))
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def _slice(self, start_date: date | None, finish_date: date | None) -> slice:
+        """Срез расходов за период (границы как в period_sum)."""
+        start = 0 if start_date is None else \
+            int(np.searchsorted(self.days, _day(start_date), side='left'))
+        stop = len(self) if finish_date is None else \
+            int(np.searchsorted(self.days, _day(finish_date), side='left'))
+        return slice(start, max(start, stop))
+
+    def period_sum(
+            self,
+            start_date: date | None = None,
+            finish_date: date | None = None
+    ) -> float:
+        """
+        Суммарные траты за период: start_date - включительно,
+        finish_date - исключая.
+        """
+        period = self._slice(start_date, finish_date)
+        return float(self._prefix_sums[period.stop] - self._prefix_sums[period.start])
+
+    def period_sums(self, periods: Iterable[str], current_date: date) -> dict[str, float]:
+        """
+        Суммарные траты за текущий период каждого бюджета
+        (в том же формате, что и Presenter.period_expenses).
+        """
+        return {
+            period: self.period_sum(*get_period_bounds(period, current_date))
+            for period in periods
+        }
+
+    def category_totals(
+            self,
+            start_date: date | None = None,
+            finish_date: date | None = None
+    ) -> dict[int | None, float]:
+        """
+        Траты по id категории за период (None - расходы без категории).
+        В результат попадают только категории, по которым были расходы.
+        """
+        period = self._slice(start_date, finish_date)
+        # Сдвиг на 1, чтобы NO_CATEGORY попал в нулевую ячейку.
+        ids = self.category_ids[period] - NO_CATEGORY
+        totals = np.bincount(ids, weights=self.amounts[period])
+        counts = np.bincount(ids)
+        return {
+            (None if idx == 0 else idx + NO_CATEGORY): float(totals[idx])
+            for idx in np.flatnonzero(counts).tolist()
+        }
+
+    def daily_totals(
+            self,
+            start_date: date,
+            finish_date: date
+    ) -> 'npt.NDArray[np.float64]':
+        """
+        Траты за каждый день периода: start_date - включительно,
+        finish_date - исключая.
+        """
+        period = self._slice(start_date, finish_date)
+        first_day = _day(start_date)
+        totals = np.bincount(
+            self.days[period] - first_day,
+            weights=self.amounts[period],
+            minlength=max(0, _day(finish_date) - first_day),
+        )
+        return np.asarray(totals, dtype=np.float64)
+
+    def rolling_sums(
+            self,
+            window: int,
+            start_date: date,
+            finish_date: date
+    ) -> 'npt.NDArray[np.float64]':
+        """
+        Скользящие суммы трат: для каждого дня периода - траты за window
+        дней, заканчивающихся этим днем (включительно).
+        """
+        if window < 1:
+            raise ValueError('window must be positive')
+
+        daily = self.daily_totals(start_date - timedelta(days=window - 1), finish_date)
+        prefix_sums = np.concatenate(([0.0], np.cumsum(daily)))
+        return prefix_sums[window:] - prefix_sums[:-window]
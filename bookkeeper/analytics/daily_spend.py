@@ -0,0 +1,154 @@
+"""
+Модуль индекса трат по дням для сумм за произвольный период
+"""
+
+from bisect import bisect_left
+from datetime import date
+from typing import Iterable, Mapping
+
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.abstract_repository import AbstractRepository
+
+
+class DailySpendIndex:
+    """
+    Индекс трат по дням: суммы за любой период [start_date, finish_date)
+    за O(log D), где D - число дней с расходами.
+
+    Траты по дням хранятся в отсортированном списке дней и дереве Фенвика
+    (дереве префиксных сумм) над ним. Изменение трат за день, который уже
+    есть в индексе, и появление дня позже всех известных (обычный случай -
+    первый расход за сегодня) исправляют дерево за O(log D). Появление
+    нового дня в середине истории только помечает индекс устаревшим:
+    список и дерево перестраиваются за O(D) при следующем запросе.
+
+    Индекс нужен для сумм за произвольные диапазоны дат при частых
+    изменениях расходов - для графиков трат по дням и итогов за выбранный
+    пользователем период (в приложении таких видов пока нет). Траты
+    за текущие периоды бюджетов дает BudgetUsage, а ExpenseColumns
+    требует NumPy и перестроения после изменений.
+    """
+
+    def __init__(self, daily_totals: Mapping[date, float] | None = None) -> None:
+        self._daily: dict[date, float] = dict(daily_totals or {})
+        self._days: list[date] = []
+        # Дерево Фенвика: _tree[i] - сумма трат за дни (i - i & -i, i].
+        self._tree: list[float] = [0.0]
+        self._dirty = True
+
+    @classmethod
+    def from_repository(
+            cls,
+            expense_repository: AbstractRepository[Expense]
+    ) -> 'DailySpendIndex':
+        """Построить индекс одним сгруппированным по дням запросом."""
+        return cls(expense_repository.aggregate('sum', 'amount', group_by='expense_date'))
+
+    @classmethod
+    def from_expenses(cls, expenses: Iterable[Expense]) -> 'DailySpendIndex':
+        """Построить индекс по объектам расходов."""
+        index = cls()
+        for expense in expenses:
+            index.add(expense)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._daily)
+
+    def _rebuild(self) -> None:
+        """Перестраивает список дней и дерево Фенвика за O(D)."""
+        self._days = sorted(self._daily)
+        tree = [0.0]
+        tree.extend(self._daily[day] for day in self._days)
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._dirty = False
+
+    def _change(self, day: date, amount: float) -> None:
+        if day not in self._daily:
+            self._daily[day] = amount
+            if not self._dirty and (not self._days or day > self._days[-1]):
+                self._append(day, amount)
+            else:
+                self._dirty = True
+            return
+
+        self._daily[day] += amount
+        if self._dirty:
+            return
+        i = bisect_left(self._days, day) + 1
+        while i < len(self._tree):
+            self._tree[i] += amount
+            i += i & -i
+
+    def _append(self, day: date, amount: float) -> None:
+        """Добавляет день позже всех дней индекса за O(log D)."""
+        self._days.append(day)
+        i = len(self._days)
+        # Новый узел дерева хранит сумму трат за дни (i - i & -i, i].
+        self._tree.append(
+            amount + self._prefix_sum(i - 1) - self._prefix_sum(i - (i & -i))
+        )
+
+    def _prefix_sum(self, count: int) -> float:
+        """Сумма трат за первые count дней индекса."""
+        total = 0.0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+
+    def _bounds(
+            self,
+            start_date: date | None,
+            finish_date: date | None
+    ) -> tuple[int, int]:
+        """Позиции первого дня периода и первого дня после него."""
+        if self._dirty:
+            self._rebuild()
+        start = 0 if start_date is None else bisect_left(self._days, start_date)
+        stop = len(self._days) if finish_date is None \
+            else bisect_left(self._days, finish_date)
+        return start, stop
+
+    def add(self, expense: Expense) -> None:
+        """Учесть новый расход."""
+        self._change(expense.expense_date, expense.amount)
+
+    def remove(self, expense: Expense) -> None:
+        """Убрать удаленный расход."""
+        self._change(expense.expense_date, -expense.amount)
+
+    def update(self, old: Expense, new: Expense) -> None:
+        """Заменить расход old его новой версией new."""
+        self.remove(old)
+        self.add(new)
+
+    def total(
+            self,
+            start_date: date | None = None,
+            finish_date: date | None = None
+    ) -> float:
+        """
+        Суммарные траты за период: start_date - включительно,
+        finish_date - исключая (границы можно не задавать).
+        """
+        start, stop = self._bounds(start_date, finish_date)
+        if stop <= start:
+            return 0.0
+        return self._prefix_sum(stop) - self._prefix_sum(start)
+
+    def daily_totals(
+            self,
+            start_date: date | None = None,
+            finish_date: date | None = None
+    ) -> list[tuple[date, float]]:
+        """
+        Траты по дням периода (только дни с расходами) в порядке дат,
+        например, для графиков.
+        """
+        start, stop = self._bounds(start_date, finish_date)
+        return [(day, self._daily[day]) for day in self._days[start:stop]]
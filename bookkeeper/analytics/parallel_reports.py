@@ -0,0 +1,136 @@
+"""
+Модуль параллельного построения отчетов о тратах в нескольких процессах
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from types import TracebackType
+
+from bookkeeper.analytics.reports import (
+    SpendReport, bucket_starts, build_report, report_groups
+)
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+Groups = dict[tuple[date, int | None], float]
+
+
+def shard_ranges(
+        buckets: list[date],
+        start_date: date,
+        finish_date: date,
+        shards: int
+) -> list[tuple[date, date]]:
+    """
+    Делит период [start_date, finish_date) на не более чем shards смежных
+    диапазонов дат по границам интервалов отчета buckets: каждый интервал
+    целиком попадает в один диапазон, число интервалов в диапазонах
+    отличается не больше чем на один.
+    """
+    shards = max(1, min(shards, len(buckets)))
+    bounds = [start_date]
+    for shard in range(1, shards):
+        bounds.append(buckets[shard * len(buckets) // shards])
+    bounds.append(finish_date)
+    return list(zip(bounds, bounds[1:]))
+
+
+def shard_groups(
+        db_file: str,
+        granularity: str,
+        date_range: tuple[date, date]
+) -> Groups:
+    """
+    Суммы трат по интервалам и категориям за диапазон дат. Выполняется
+    в процессе-исполнителе через собственное соединение только для чтения
+    (не через общий менеджер: при fork процесс унаследовал бы соединения
+    родителя).
+    """
+    with SQLiteConnectionManager(
+            db_file, profile='readonly-analytics', read_only=True) as manager:
+        repo = SQLiteRepository[Expense](db_file, Expense, manager)
+        return report_groups(repo, *date_range, granularity)
+
+
+def merge_groups(partials: list[Groups]) -> Groups:
+    """Складывает частичные суммы трат по одинаковым ключам."""
+    res: Groups = {}
+    for groups in partials:
+        for key, amount in groups.items():
+            res[key] = res.get(key, 0.0) + amount
+    return res
+
+
+class ParallelReportRunner:
+    """
+    Построитель отчетов о тратах для больших историй расходов.
+
+    Период отчета делится на диапазоны дат (шарды) по границам интервалов
+    отчета. Суммы по интервалам и категориям для каждого шарда считает
+    отдельный процесс пула, открывая базу db_file только для чтения, поэтому
+    вычисления идут на нескольких ядрах и не блокируют запись в базу.
+    Частичные суммы складываются в один SpendReport, такой же, как
+    у ReportEngine.
+
+    max_workers - число процессов (по умолчанию - число ядер),
+    shards - число шардов (по умолчанию - число процессов).
+    Пул процессов создается при первом отчете и закрывается методом close.
+    """
+
+    def __init__(
+            self,
+            db_file: str,
+            max_workers: int | None = None,
+            shards: int | None = None
+    ) -> None:
+        self.db_file = db_file
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shards = shards or self.max_workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        """Пул процессов-исполнителей."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers)
+        return self._executor
+
+    def report(
+            self,
+            start_date: date,
+            finish_date: date,
+            granularity: str = 'month'
+    ) -> SpendReport:
+        """
+        Отчет о тратах за период: start_date - включительно,
+        finish_date - исключая.
+        """
+        buckets = bucket_starts(start_date, finish_date, granularity)
+        if not buckets:
+            return build_report(granularity, buckets, {})
+
+        ranges = shard_ranges(buckets, start_date, finish_date, self.shards)
+        partials = list(self.executor.map(
+            partial(shard_groups, self.db_file, granularity), ranges
+        ))
+        return build_report(granularity, buckets, merge_groups(partials))
+
+    def close(self) -> None:
+        """Останавливает процессы пула."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'ParallelReportRunner':
+        return self
+
+    def __exit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None
+    ) -> None:
+        self.close()
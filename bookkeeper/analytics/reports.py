@@ -0,0 +1,159 @@
+"""
+Модуль отчетов о тратах по интервалам времени и категориям
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Mapping
+
+from bookkeeper.models.budget import ALLOWED_PERIODS
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.abstract_repository import AbstractRepository
+from bookkeeper.repository.observed_repository import ObservedRepository
+from bookkeeper.repository.query import truncate_date
+
+GRANULARITIES = ('day', 'week', 'month', 'year')
+# Длина интервала отчета для каждого периода бюджета.
+PERIOD_GRANULARITIES = dict(zip(ALLOWED_PERIODS, GRANULARITIES))
+# Сдвиг от начала интервала, гарантированно попадающий в следующий интервал.
+_STEPS = {'day': 1, 'week': 7, 'month': 32, 'year': 366}
+
+
+@dataclass
+class SpendReport:
+    """
+    Отчет о тратах за период по интервалам.
+    granularity - длина интервала: 'day', 'week', 'month' или 'year'
+    buckets - даты начала интервалов по порядку
+    totals - траты за каждый интервал
+    by_category - траты за каждый интервал по id категории
+    (None - расходы без категории); есть только категории с тратами
+    """
+    granularity: str
+    buckets: list[date]
+    totals: list[float]
+    by_category: dict[int | None, list[float]]
+
+
+def bucket_starts(start_date: date, finish_date: date, granularity: str) -> list[date]:
+    """
+    Даты начала интервалов, пересекающихся с периодом: start_date -
+    включительно, finish_date - исключая.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Unknown report granularity `{granularity}`')
+
+    res = []
+    bucket = truncate_date(start_date, granularity)
+    while bucket is not None and bucket < finish_date:
+        res.append(bucket)
+        bucket = truncate_date(bucket + timedelta(days=_STEPS[granularity]), granularity)
+    return res
+
+
+def build_report(
+        granularity: str,
+        buckets: list[date],
+        groups: Mapping[tuple[date, int | None], float]
+) -> SpendReport:
+    """
+    Отчет по интервалам buckets из сумм трат groups
+    {(начало интервала, id категории): сумма}.
+    """
+    positions = {bucket: idx for idx, bucket in enumerate(buckets)}
+    totals = [0.0] * len(buckets)
+    by_category: dict[int | None, list[float]] = {}
+
+    for (bucket, category_id), amount in groups.items():
+        idx = positions[bucket]
+        totals[idx] += amount
+        if category_id not in by_category:
+            by_category[category_id] = [0.0] * len(buckets)
+        by_category[category_id][idx] += amount
+
+    return SpendReport(granularity, buckets, totals, by_category)
+
+
+def report_groups(
+        expense_repository: AbstractRepository[Expense],
+        start_date: date,
+        finish_date: date,
+        granularity: str
+) -> dict[tuple[date, int | None], float]:
+    """
+    Суммы трат за период по интервалам и категориям одним вызовом aggregate.
+    """
+    groups: dict[tuple[date, int | None], float] = expense_repository.aggregate(
+        'sum', 'amount',
+        where={'expense_date__gte': start_date, 'expense_date__lt': finish_date},
+        group_by=(f'expense_date__{granularity}', 'category_id'),
+    )
+    return groups
+
+
+class ReportEngine:
+    """
+    Построитель отчетов о тратах.
+
+    Траты по интервалам и категориям считаются одним вызовом aggregate
+    с группировкой по усеченной дате и категории: в SQLite это запрос
+    с GROUP BY, в остальных репозиториях - один проход по расходам.
+    Готовые отчеты кэшируются по (начало, конец, интервал), размер кэша
+    ограничен max_size. Репозиторий расходов оборачивается
+    в ObservedRepository (если еще не обернут), и запись через
+    expense_repository сбрасывает кэш. Расходы нужно менять через этот
+    репозиторий (или через тот же ObservedRepository, переданный
+    в конструктор); после изменений в обход него кэш сбрасывается
+    методом invalidate.
+    """
+
+    def __init__(
+            self,
+            expense_repository: AbstractRepository[Expense],
+            max_size: int = 32
+    ) -> None:
+        if not isinstance(expense_repository, ObservedRepository):
+            expense_repository = ObservedRepository(expense_repository)
+        expense_repository.add_observer(self.invalidate)
+        self.expense_repository: ObservedRepository[Expense] = expense_repository
+        self.max_size = max_size
+        self._cache: OrderedDict[tuple[date, date, str], SpendReport] = OrderedDict()
+
+    def invalidate(self) -> None:
+        """Сбрасывает кэш отчетов."""
+        self._cache.clear()
+
+    def report(
+            self,
+            start_date: date,
+            finish_date: date,
+            granularity: str = 'month'
+    ) -> SpendReport:
+        """
+        Отчет о тратах за период: start_date - включительно,
+        finish_date - исключая.
+        """
+        key = (start_date, finish_date, granularity)
+        report = self._cache.get(key)
+        if report is not None:
+            self._cache.move_to_end(key)
+            return report
+
+        report = self._build(start_date, finish_date, granularity)
+        self._cache[key] = report
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return report
+
+    def _build(
+            self,
+            start_date: date,
+            finish_date: date,
+            granularity: str
+    ) -> SpendReport:
+        buckets = bucket_starts(start_date, finish_date, granularity)
+        groups = report_groups(
+            self.expense_repository, start_date, finish_date, granularity
+        )
+        return build_report(granularity, buckets, groups)
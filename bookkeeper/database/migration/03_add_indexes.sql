@@ -0,0 +1,11 @@
+-- up
+CREATE INDEX IF NOT EXISTS idx_expense_date ON expense (expense_date, amount);
+
+CREATE INDEX IF NOT EXISTS idx_expense_category_date ON expense (category_id, expense_date, amount);
+
+CREATE INDEX IF NOT EXISTS idx_category_parent_id ON category (parent_id);
+
+-- down
+DROP INDEX IF EXISTS idx_category_parent_id;
+DROP INDEX IF EXISTS idx_expense_category_date;
+DROP INDEX IF EXISTS idx_expense_date;
@@ -0,0 +1,23 @@
+-- up
+CREATE TABLE IF NOT EXISTS category_closure (
+    ancestor_id INTEGER NOT NULL,
+    descendant_id INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    FOREIGN KEY (ancestor_id) REFERENCES category (pk) ON DELETE CASCADE,
+    FOREIGN KEY (descendant_id) REFERENCES category (pk) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_category_closure_descendant ON category_closure (descendant_id, depth);
+
+INSERT OR IGNORE INTO category_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+    SELECT pk, pk, 0 FROM category
+    UNION ALL
+    SELECT tree.ancestor_id, category.pk, tree.depth + 1
+    FROM tree JOIN category ON category.parent_id = tree.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM tree;
+
+-- down
+DROP TABLE IF EXISTS category_closure;
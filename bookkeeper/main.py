@@ -13,6 +13,9 @@ from bookkeeper.models.category import Category
 from bookkeeper.models.expense import Expense
 from bookkeeper.models.budget import Budget
 from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from bookkeeper.repository.sqlite_category_repository import SQLiteCategoryRepository
+from bookkeeper.repository.cached_repository import CachedRepository
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
 
 DB_NAME = 'database/bookkeeper.db'
 
@@ -22,16 +25,26 @@ if __name__ == '__main__':
     view = MainWindow()
     view.show()
 
-    category_repository = SQLiteRepository[Category](DB_NAME, Category)
-    expense_repository = SQLiteRepository[Expense](DB_NAME, Expense)
-    budget_repository = SQLiteRepository[Budget](DB_NAME, Budget)
-
-    window = Presenter(
-        view,
-        category_repository,
-        expense_repository,
-        budget_repository,
-    )
-    window.show()
-
-    sys.exit(app.exec())
+    with SQLiteConnectionManager(DB_NAME, profile='durable') as connection_manager:
+        category_repository = CachedRepository[Category](
+            SQLiteCategoryRepository(DB_NAME, connection_manager)
+        )
+        expense_repository = SQLiteRepository[Expense](
+            DB_NAME, Expense, connection_manager
+        )
+        budget_repository = SQLiteRepository[Budget](
+            DB_NAME, Budget, connection_manager
+        )
+
+        window = Presenter(
+            view,
+            category_repository,
+            expense_repository,
+            budget_repository,
+        )
+        window.show()
+
+        exit_code = app.exec()
+        window.close()
+
+    sys.exit(exit_code)
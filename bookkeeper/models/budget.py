@@ -3,6 +3,7 @@
 """
 
 from dataclasses import dataclass
+from datetime import date, timedelta
 
 ALLOWED_PERIODS = ['День', 'Неделя', 'Месяц', 'Год']
 
@@ -18,3 +19,26 @@ class Budget:
     amount: float = 0.0
     period: str = 'День'
     pk: int = 0
+
+
+def get_period_bounds(period: str, current_date: date) -> tuple[date, date]:
+    """
+    Границы периода бюджета, содержащего заданную дату:
+    начало - включительно, конец - исключая.
+    Неделя начинается с понедельника.
+    """
+    if period == 'День':
+        start_date = current_date
+        return start_date, start_date + timedelta(days=1)
+    if period == 'Неделя':
+        start_date = current_date - timedelta(days=current_date.weekday())
+        return start_date, start_date + timedelta(weeks=1)
+    if period == 'Месяц':
+        start_date = current_date.replace(day=1)
+        if start_date.month == 12:
+            return start_date, start_date.replace(year=start_date.year + 1, month=1)
+        return start_date, start_date.replace(month=start_date.month + 1)
+    if period == 'Год':
+        start_date = current_date.replace(day=1, month=1)
+        return start_date, start_date.replace(year=start_date.year + 1)
+    raise ValueError(f'Unknown budget period `{period}`')
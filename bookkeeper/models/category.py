@@ -2,12 +2,26 @@
 Модель категории расходов
 """
 
-from collections import defaultdict
 from dataclasses import dataclass
-from typing import Iterator
+from typing import Iterator, Protocol, runtime_checkable
+from bookkeeper.models.category_tree import CategoryTree
 from bookkeeper.repository.abstract_repository import AbstractRepository
 
 
+@runtime_checkable
+class HierarchyRepository(Protocol):
+    """
+    Репозиторий категорий, умеющий получать предков и потомков
+    категории одним запросом (например, SQLiteCategoryRepository).
+    """
+
+    def get_ancestors(self, pk: int) -> list['Category']:
+        """Все предки категории, начиная с родителя."""
+
+    def get_descendants(self, pk: int) -> list['Category']:
+        """Все подкатегории разного уровня ниже данной."""
+
+
 @dataclass
 class Category:
     """
@@ -44,6 +58,9 @@ class Category:
         """
         Получить все категории верхнего уровня в иерархии.
 
+        Если репозиторий поддерживает HierarchyRepository, предки
+        получаются одним запросом.
+
         Parameters
         ----------
         repo - репозиторий для получения объектов
@@ -52,6 +69,10 @@ class Category:
         -------
         Объекты Category от родителя и выше до категории верхнего уровня
         """
+        if self.pk != 0 and isinstance(repo, HierarchyRepository):
+            yield from repo.get_ancestors(self.pk)
+            return
+
         parent = self.get_parent(repo)
         if parent is None:
             return
@@ -64,6 +85,8 @@ class Category:
         """
         Получить все подкатегории из иерархии, т.е. непосредственные
         подкатегории данной, все их подкатегории и т.д.
+        Если репозиторий поддерживает HierarchyRepository, подкатегории
+        получаются одним запросом.
 
         Parameters
         ----------
@@ -74,17 +97,10 @@ class Category:
         Объекты Category, являющиеся подкатегориями разного уровня ниже данной.
         """
 
-        def get_children(graph: dict[int | None, list['Category']],
-                         root: int) -> Iterator['Category']:
-            """ dfs in graph from root """
-            for x in graph[root]:
-                yield x
-                yield from get_children(graph, x.pk)
+        if self.pk != 0 and isinstance(repo, HierarchyRepository):
+            return (cat for cat in repo.get_descendants(self.pk))
 
-        subcats = defaultdict(list)
-        for cat in repo.get_all():
-            subcats[cat.parent_id].append(cat)
-        return get_children(subcats, self.pk)
+        return CategoryTree(repo.get_all()).descendants(self.pk)
 
     @classmethod
     def create_from_tree(
@@ -96,6 +112,7 @@ class Category:
         Список должен быть топологически отсортирован, т.е. потомки
         не должны встречаться раньше своего родителя.
         Проверка корректности исходных данных не производится.
+        Все категории добавляются в одной транзакции репозитория.
         При использовании СУБД с проверкой внешних ключей, будет получена
         ошибка (для sqlite3 - IntegrityError). При отсутствии проверки
         со стороны СУБД, результат, возможно, будет корректным, если исходные
@@ -112,10 +129,11 @@ class Category:
         Список созданных объектов Category
         """
         created: dict[str, Category] = {}
-        for child, parent in tree:
-            category = cls(
-                name=child,
-                parent_id=created[parent].pk if parent is not None else None)
-            repo.add(category)
-            created[child] = category
+        with repo.transaction():
+            for child, parent in tree:
+                category = cls(
+                    name=child,
+                    parent_id=created[parent].pk if parent is not None else None)
+                repo.add(category)
+                created[child] = category
         return list(created.values())
@@ -0,0 +1,143 @@
+"""
+Модель дерева категорий расходов
+"""
+
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    # Модуль категорий сам использует дерево, поэтому импорт только для типов.
+    from bookkeeper.models.category import Category
+
+
+class CategoryTree:
+    """
+    Иерархия категорий в оперативной памяти.
+
+    Строится за O(N) по списку категорий в любом порядке. Родитель и
+    непосредственные подкатегории находятся за O(1), предки - за O(глубины),
+    поддерево - за O(его размера). Дерево обновляется по одной категории
+    методами add, update, remove.
+
+    Категория, родитель которой отсутствует в дереве, считается категорией
+    верхнего уровня.
+    """
+
+    def __init__(self, categories: Iterable['Category'] = ()) -> None:
+        self._categories: dict[int, 'Category'] = {}
+        # Родитель, под которым категория учтена в _children: объект категории
+        # могли изменить до вызова update.
+        self._parents: dict[int, int | None] = {}
+        # Подкатегории по id родителя (в порядке добавления), None - верхний уровень.
+        self._children: dict[int | None, dict[int, None]] = {None: {}}
+        for category in categories:
+            self._categories[category.pk] = category
+        for category in self._categories.values():
+            self._link(category)
+
+    def _link(self, category: 'Category') -> None:
+        self._parents[category.pk] = category.parent_id
+        self._children.setdefault(category.parent_id, {})[category.pk] = None
+
+    def _unlink(self, pk: int) -> None:
+        parent_id = self._parents.pop(pk)
+        siblings = self._children.get(parent_id, {})
+        siblings.pop(pk, None)
+        if not siblings and parent_id is not None:
+            self._children.pop(parent_id, None)
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    def __contains__(self, pk: object) -> bool:
+        return pk in self._categories
+
+    def __iter__(self) -> Iterator['Category']:
+        return self.topological_order()
+
+    def __getitem__(self, pk: int) -> 'Category':
+        return self._categories[pk]
+
+    def get(self, pk: int) -> 'Category | None':
+        """Категория по id."""
+        return self._categories.get(pk)
+
+    def parent(self, pk: int) -> 'Category | None':
+        """Родительская категория или None для категории верхнего уровня."""
+        parent_id = self._parents[pk]
+        if parent_id is None:
+            return None
+        return self._categories.get(parent_id)
+
+    def roots(self) -> list['Category']:
+        """Категории верхнего уровня."""
+        return [
+            self._categories[child]
+            for parent_id, children in self._children.items()
+            if parent_id is None or parent_id not in self._categories
+            for child in children
+        ]
+
+    def children(self, pk: int | None) -> list['Category']:
+        """Непосредственные подкатегории (для None - категории верхнего уровня)."""
+        if pk is None:
+            return self.roots()
+        return [self._categories[child] for child in self._children.get(pk, ())]
+
+    def ancestors(self, pk: int) -> Iterator['Category']:
+        """Все категории выше данной: от родителя до категории верхнего уровня."""
+        seen = {pk}
+        parent = self.parent(pk)
+        while parent is not None and parent.pk not in seen:
+            yield parent
+            seen.add(parent.pk)
+            parent = self.parent(parent.pk)
+
+    def descendants(self, pk: int) -> Iterator['Category']:
+        """Все подкатегории разного уровня ниже данной (обход в глубину)."""
+        stack = list(reversed(self._children.get(pk, {})))
+        seen = {pk}
+        while stack:
+            child = stack.pop()
+            if child in seen:
+                continue
+            seen.add(child)
+            yield self._categories[child]
+            stack.extend(reversed(self._children.get(child, {})))
+
+    def depth(self, pk: int) -> int:
+        """Уровень вложенности категории, у категории верхнего уровня - 0."""
+        return sum(1 for _ in self.ancestors(pk))
+
+    def topological_order(self) -> Iterator['Category']:
+        """
+        Все категории так, что родитель всегда идет раньше подкатегорий
+        (обход в глубину от категорий верхнего уровня).
+        """
+        for root in self.roots():
+            yield root
+            yield from self.descendants(root.pk)
+
+    def add(self, category: 'Category') -> None:
+        """Добавить категорию в дерево."""
+        if category.pk in self._categories:
+            raise ValueError(f'category with pk={category.pk} is already in tree')
+        self._categories[category.pk] = category
+        self._link(category)
+
+    def update(self, category: 'Category') -> None:
+        """Заменить категорию с тем же id (возможно, с новым родителем)."""
+        self._unlink(category.pk)
+        self._categories[category.pk] = category
+        self._link(category)
+
+    def remove(self, pk: int) -> None:
+        """
+        Удалить категорию из дерева. Ее подкатегории становятся категориями
+        верхнего уровня (как при ON DELETE SET NULL в базе данных).
+        """
+        del self._categories[pk]
+        self._unlink(pk)
+        for child in list(self._children.pop(pk, {})):
+            self._categories[child].parent_id = None
+            self._parents.pop(child)
+            self._link(self._categories[child])
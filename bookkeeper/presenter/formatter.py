@@ -2,12 +2,30 @@
 Модуль содержит функцию форматирования данных в требуемый формат для view.
 """
 
-from datetime import date, timedelta
+from datetime import date
+from typing import Iterable, Mapping
+from bookkeeper.analytics.category_rollup import CategoryTotals
 from bookkeeper.models.category import Category
+from bookkeeper.models.category_tree import CategoryTree
 from bookkeeper.models.expense import Expense
 from bookkeeper.models.budget import Budget
 
 
+def format_expense(expense: Expense, category_id_to_name: dict[int, str]) -> list[str]:
+    """Форматирует данные об одном расходе"""
+    category = ''
+    if expense.category_id is not None \
+            and expense.category_id in category_id_to_name:
+        category = category_id_to_name[expense.category_id]
+
+    return [
+        str(expense.expense_date),
+        str(expense.amount),
+        category,
+        expense.comment,
+    ]
+
+
 def format_expense_data(
         expenses: list[Expense],
         category_id_to_name: dict[int, str]
@@ -15,74 +33,76 @@ def format_expense_data(
     """Форматирует данные о расходах"""
     res = []
     for expense in expenses:
-        category = ''
-        if expense.category_id is not None \
-                and expense.category_id in category_id_to_name:
-            category = category_id_to_name[expense.category_id]
-
-        res.append([
-            str(expense.expense_date),
-            str(expense.amount),
-            category,
-            expense.comment,
-        ])
+        res.append(format_expense(expense, category_id_to_name))
 
     return res
 
 
-def format_category_data(categories: list[Category]) -> list[list[str]]:
-    """Форматирует данные о категориях"""
+def format_category(
+        category: Category,
+        category_totals: Mapping[int, CategoryTotals] | None = None
+) -> list[str]:
+    """
+    Форматирует данные об одной категории.
+    Если переданы category_totals, к строке добавляются собственные траты
+    категории и траты вместе с подкатегориями.
+    """
+    parent_id = 0
+    if category.parent_id is not None:
+        parent_id = category.parent_id
+    row = [
+        str(category.pk),
+        str(category.name),
+        str(parent_id),
+    ]
+    if category_totals is not None:
+        totals = category_totals.get(category.pk, CategoryTotals())
+        row += [str(round(totals.own, 2)), str(round(totals.total, 2))]
+
+    return row
+
+
+def format_category_data(
+        categories: Iterable[Category],
+        category_totals: Mapping[int, CategoryTotals] | None = None
+) -> list[list[str]]:
+    """
+    Форматирует данные о категориях.
+    Родительская категория всегда идет раньше подкатегорий.
+    """
     res = [[str(0), '', str(0)]]
-    for category in categories:
-        parent_id = 0
-        if category.parent_id is not None:
-            parent_id = category.parent_id
-        res.append([
-            str(category.pk),
-            str(category.name),
-            str(parent_id),
-        ])
+    for category in CategoryTree(categories).topological_order():
+        res.append(format_category(category, category_totals))
 
     return res
 
 
-def format_budget_data(budgets: list[Budget], expenses: list[Expense]) -> list[list[str]]:
-    """Форматирует данные о бюджете"""
+def format_budget(budget: Budget, period_expenses: dict[str, float]) -> list[str]:
+    """Форматирует данные об одном бюджете"""
+    return [
+        str(budget.period),
+        str(budget.amount),
+        str(round(period_expenses.get(budget.period, 0.0), 2)),
+    ]
+
+
+def format_budget_data(
+        budgets: list[Budget],
+        period_expenses: dict[str, float]
+) -> list[list[str]]:
+    """
+    Форматирует данные о бюджете.
+    period_expenses - суммарные траты за текущий период каждого бюджета.
+    """
     res = []
-    current_date = date.today()
-    start_date = current_date
-    finish_date = current_date
     for budget in budgets:
-        if budget.period == 'День':
-            start_date = current_date
-            finish_date = start_date + timedelta(days=1)
-        elif budget.period == 'Неделя':
-            start_date = current_date - timedelta(days=current_date.weekday())
-            finish_date = start_date + timedelta(weeks=1)
-        elif budget.period == 'Месяц':
-            start_date = current_date.replace(day=1)
-            finish_date = \
-                start_date.replace(month=current_date.month + 1) - timedelta(days=1)
-        elif budget.period == 'Год':
-            start_date = current_date.replace(day=1, month=1)
-            finish_date = start_date.replace(year=current_date.year + 1)
-
-        general_expense = calculate_expenses_in_period(
-            expenses,
-            start_date,
-            finish_date
-        )
-        res.append([
-            str(budget.period),
-            str(budget.amount),
-            str(general_expense),
-        ])
+        res.append(format_budget(budget, period_expenses))
 
     return res
 
 
 def calculate_expenses_in_period(
-        expenses: list[Expense],
+        expenses: Iterable[Expense],
         start_date: date,
         finish_date: date
 ) -> float:
@@ -2,37 +2,117 @@
 Модуль содержит в себе основую бизнес логику приложения.
 """
 
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from functools import partial
+from bookkeeper.analytics.budget_usage import BudgetUsage
+from bookkeeper.analytics.category_rollup import (
+    CategoryTotals, add_expense_amount, add_to_ancestors, get_own_totals, rollup_totals
+)
 from bookkeeper.models.expense import Expense
-from bookkeeper.models.budget import Budget
+from bookkeeper.models.budget import Budget, get_period_bounds
 from bookkeeper.models.category import Category
+from bookkeeper.models.category_tree import CategoryTree
 from bookkeeper.presenter import formatter
-from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from bookkeeper.presenter.repository_worker import RepositoryWorker
+from bookkeeper.repository.abstract_repository import AbstractRepository, T, page_key
 from bookkeeper.view.main_window import MainWindow
 
+# Порядок расходов в таблице: сначала новые.
+EXPENSE_ORDER = '-expense_date'
 
-class Presenter:
+
+def expense_sort_key(expense: Expense) -> tuple[int, int]:
+    """Ключ расхода, по возрастанию которого идут строки таблицы расходов."""
+    return -expense.expense_date.toordinal(), -expense.pk
+
+
+def update_existing(repository: AbstractRepository[T], obj: T) -> T | None:
+    """
+    Обновляет объект в репозитории и возвращает его прежнюю версию
+    или None, если объекта уже нет (тогда ничего не меняет).
+
+    Выполняется в фоновом потоке подряд с остальными изменениями,
+    поэтому прежняя версия - та, к которой применено это изменение,
+    даже если кнопка нажата несколько раз до его завершения.
+    """
+    with repository.transaction():
+        old = repository.get(obj.pk)
+        if old is not None:
+            repository.update(obj)
+    return old
+
+
+def delete_existing(repository: AbstractRepository[T], pk: int) -> T | None:
+    """
+    Удаляет объект из репозитория и возвращает его или None,
+    если объект уже удален (см. update_existing).
+    """
+    with repository.transaction():
+        old = repository.get(pk)
+        if old is not None:
+            repository.delete(pk)
+    return old
+
+
+@dataclass
+class PresenterData:
+    """
+    Данные приложения, загружаемые из бд при запуске.
+    month_bounds - границы текущего месяца, за который считаются
+    category_totals - траты по категориям
+    """
+    category_tree: CategoryTree
+    budgets: list[Budget]
+    budget_usage: BudgetUsage
+    month_bounds: tuple[date, date]
+    category_totals: dict[int, CategoryTotals]
+
+
+class Presenter:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """
     Отвественный за бизнес логику и передачу данных во view.
+
+    Данные загружаются из бд один раз при запуске. Обработчики изменений
+    применяют к состоянию в памяти только измененный объект и передают во
+    view отдельные строки для вставки, обновления или удаления.
+
+    Все запросы к репозиториям выполняет фоновый поток worker, чтобы
+    окно не зависало на медленной бд: обработчик кнопки отправляет запрос,
+    а состояние и view меняются в обработчике результата (методы on_*)
+    в основном потоке. Загрузки данных и страниц расходов отправляются
+    с ключами и отменяются более новыми.
     """
-    categories: list[Category]
+    category_tree: CategoryTree
     expenses: list[Expense]
+    all_expenses_loaded: bool
     budgets: list[Budget]
-    category_id_to_name: dict[int, str] = {}
+    period_expenses: dict[str, float]
+    category_totals: dict[int, CategoryTotals]
+    month_bounds: tuple[date, date]
+    budget_usage: BudgetUsage
+    category_id_to_name: dict[int, str]
 
     def __init__(
             self,
             view: MainWindow,
-            category_repository: SQLiteRepository[Category],
-            expense_repository: SQLiteRepository[Expense],
-            budget_repository: SQLiteRepository[Budget],
+            category_repository: AbstractRepository[Category],
+            expense_repository: AbstractRepository[Expense],
+            budget_repository: AbstractRepository[Budget],
+            worker: RepositoryWorker | None = None,
     ) -> None:
         self.view = view
 
         self.category_repository = category_repository
         self.expense_repository = expense_repository
         self.budget_repository = budget_repository
+        self.worker = worker if worker is not None else RepositoryWorker()
 
-        self.get_data()
+        self.set_data(PresenterData(
+            CategoryTree(), [], BudgetUsage(),
+            get_period_bounds('Месяц', date.today()), {}
+        ))
 
         # Add handlers
 
@@ -57,76 +137,189 @@ class Presenter:
         self.view.budget_view.edit_windows.delete. \
             on_action_button_clicked(self.handle_delete_budget_clicked)
 
-    def get_categories(self) -> None:
+    def load_data(self) -> PresenterData:
         """
-        Получает данных из бд о категориях.
+        Получает данные из бд для приложения (выполняется в фоновом потоке).
         """
-        self.categories = self.category_repository.get_all()
-        self.category_id_to_name.clear()
-        for category in self.categories:
-            self.category_id_to_name[category.pk] = category.name
+        category_tree = CategoryTree(self.category_repository.get_all())
+        month_bounds = get_period_bounds('Месяц', date.today())
+        return PresenterData(
+            category_tree,
+            self.budget_repository.get_all(),
+            BudgetUsage.from_repository(self.expense_repository),
+            month_bounds,
+            rollup_totals(
+                category_tree,
+                get_own_totals(self.expense_repository, *month_bounds)
+            ),
+        )
 
-    def get_data(self) -> None:
+    def set_data(self, data: PresenterData) -> None:
+        """
+        Заменяет состояние в памяти загруженными данными.
+        Расходы для таблицы подгружаются заново.
         """
-        Получает данные из бд для приложения.
+        self.category_tree = data.category_tree
+        self.budgets = data.budgets
+        self.budget_usage = data.budget_usage
+        self.month_bounds = data.month_bounds
+        self.category_totals = data.category_totals
+        self.category_id_to_name = {
+            category.pk: category.name for category in self.category_tree
+        }
+        self.expenses = []
+        self.all_expenses_loaded = False
+        self.get_period_expenses()
+
+    def reload(self) -> None:
+        """Загружает данные из бд заново, отменяя незавершенную загрузку."""
+        self.worker.submit(self.load_data, self.on_data_loaded, key='data')
+
+    def get_period_expenses(self) -> None:
         """
-        self.get_categories()
-        self.budgets = self.budget_repository.get_all()
-        self.expenses = self.expense_repository.get_all()
+        Получает суммарные траты за текущий период каждого бюджета
+        из накопительных счетчиков budget_usage.
+        """
+        current_date = date.today()
+        self.period_expenses = {
+            budget.period: self.budget_usage.get(budget.period, current_date)
+            for budget in self.budgets
+        }
 
-    def show(self) -> None:
+    def fetch_expenses(self, limit: int) -> None:
         """
-        Наполняет данными view и запускает показ.
+        Запрашивает из бд следующую страницу расходов для таблицы
+        (подгружается по мере прокрутки).
         """
-        self.view.category_view.set_up(
-            formatter.format_category_data(self.categories)
+        after_key = None
+        if self.expenses:
+            after_key = page_key(self.expenses[-1], EXPENSE_ORDER)
+        self.worker.submit(
+            partial(
+                self.expense_repository.get_page,
+                order_by=EXPENSE_ORDER, limit=limit, after_key=after_key
+            ),
+            partial(self.on_expenses_fetched, limit),
+            key='expense_page',
         )
-        self.view.expense_view.set_up(
-            formatter.format_expense_data(self.expenses, self.category_id_to_name),
-            formatter.format_category_data(self.categories)
+
+    def on_expenses_fetched(self, limit: int, page: list[Expense]) -> None:
+        """Добавляет полученную страницу расходов в таблицу."""
+        self.expenses.extend(page)
+        self.all_expenses_loaded = len(page) < limit
+        self.view.expense_view.append_expenses(
+            formatter.format_expense_data(page, self.category_id_to_name)
         )
-        self.view.budget_view.set_up(
-            formatter.format_budget_data(self.budgets, self.expenses)
+
+    def get_expense_row(self, expense: Expense) -> int | None:
+        """
+        Номер строки, на которой расход должен стоять в таблице, или None,
+        если он попадает в еще не загруженную часть таблицы.
+        """
+        key = expense_sort_key(expense)
+        row_id = bisect_left(self.expenses, key, key=expense_sort_key)
+        if row_id == len(self.expenses) and not self.all_expenses_loaded:
+            return None
+        return row_id
+
+    def find_expense_row(self, expense: Expense) -> int | None:
+        """Номер строки загруженного расхода или None, если его нет в таблице."""
+        key = expense_sort_key(expense)
+        row_id = bisect_left(self.expenses, key, key=expense_sort_key)
+        if row_id < len(self.expenses) and self.expenses[row_id].pk == expense.pk:
+            return row_id
+        return None
+
+    def find_budget_row(self, pk: int) -> int | None:
+        """Номер строки бюджета или None, если его нет в таблице."""
+        for row_id, budget in enumerate(self.budgets):
+            if budget.pk == pk:
+                return row_id
+        return None
+
+    def format_category(self, pk: int) -> list[str]:
+        """Строка дерева категорий для категории с тратами за месяц."""
+        return formatter.format_category(
+            self.category_tree[pk], self.category_totals
         )
+
+    def show(self) -> None:
+        """
+        Запускает загрузку данных и показ view.
+        """
+        self.reload()
         self.view.show()
 
+    def close(self) -> None:
+        """Дожидается выполнения отправленных запросов к бд."""
+        self.worker.stop()
+
     # ON UPDATES
 
-    def on_categories_updated(self) -> None:
+    def on_data_loaded(self, data: PresenterData) -> None:
         """
-        Обновдяет данные при изменении категорий.
+        Наполняет данными view.
         """
-        self.get_categories()
+        self.set_data(data)
         self.view.category_view.set_up(
-            formatter.format_category_data(self.categories)
+            formatter.format_category_data(self.category_tree, self.category_totals)
         )
         self.view.expense_view.set_up(
-            formatter.format_expense_data(self.expenses, self.category_id_to_name),
-            formatter.format_category_data(self.categories)
+            self.fetch_expenses,
+            formatter.format_category_data(self.category_tree)
+        )
+        self.view.budget_view.set_up(
+            formatter.format_budget_data(self.budgets, self.period_expenses)
         )
 
-    def on_expenses_updated(self) -> None:
+    def on_expense_changed(self, old: Expense | None, new: Expense | None) -> None:
         """
-        Обновдяет данные при изменении расходов.
+        Учитывает изменение одного расхода: old - прежняя версия (None при
+        добавлении), new - новая (None при удалении). Таблица расходов
+        и список expenses уже изменены обработчиком.
         """
-        self.expenses = self.expense_repository.get_all()
-        self.view.expense_view.set_up(
-            formatter.format_expense_data(self.expenses, self.category_id_to_name),
-            formatter.format_category_data(self.categories)
-        )
-        self.view.budget_view.set_up(
-            formatter.format_budget_data(self.budgets, self.expenses)
+        if self.month_bounds != get_period_bounds('Месяц', date.today()):
+            # Начался новый месяц: траты по категориям считаются заново.
+            self.reload()
+            return
+
+        if old is not None:
+            self.budget_usage.remove(old)
+        if new is not None:
+            self.budget_usage.add(new)
+        changed = self.add_month_expense(old, -1) + self.add_month_expense(new, 1)
+        self.view.category_view.update_totals(
+            [self.format_category(pk) for pk in dict.fromkeys(changed)]
         )
+        self.on_period_expenses_updated()
 
-    def on_budgets_updated(self) -> None:
+    def add_month_expense(self, expense: Expense | None, sign: int) -> list[int]:
         """
-        Обновдяет данные при изменении расходов.
+        Прибавляет (sign=1) или вычитает (sign=-1) расход из трат по категориям,
+        если он сделан в текущем месяце. Возвращает id измененных категорий.
         """
-        self.budgets = self.budget_repository.get_all()
-        self.view.budget_view.set_up(
-            formatter.format_budget_data(self.budgets, self.expenses)
+        start_date, finish_date = self.month_bounds
+        if expense is None or not start_date <= expense.expense_date < finish_date:
+            return []
+        return add_expense_amount(
+            self.category_totals, self.category_tree,
+            expense.category_id, sign * expense.amount
         )
 
+    def on_period_expenses_updated(self) -> None:
+        """
+        Пересчитывает траты за текущий период бюджетов и обновляет
+        только строки, в которых они изменились.
+        """
+        old_period_expenses = self.period_expenses
+        self.get_period_expenses()
+        for row_id, budget in enumerate(self.budgets):
+            if old_period_expenses.get(budget.period) \
+                    != self.period_expenses[budget.period]:
+                self.view.budget_view.update_budget(
+                    row_id, formatter.format_budget(budget, self.period_expenses)
+                )
+
     # CATEGORY HANDLERS
 
     def handle_add_category_clicked(self) -> None:
@@ -140,9 +333,23 @@ class Presenter:
         if category.parent_id == 0:
             category.parent_id = None
 
-        self.category_repository.add(category)
+        self.worker.submit(
+            partial(self.category_repository.add, category),
+            lambda _: self.on_category_added(category),
+        )
+
+    def on_category_added(self, category: Category) -> None:
+        """
+        Показывает добавленную категорию.
+        """
+        self.category_tree.add(category)
+        self.category_id_to_name[category.pk] = category.name
+        self.category_totals[category.pk] = CategoryTotals()
+
+        row = self.format_category(category.pk)
+        self.view.category_view.insert_category(row)
+        self.view.expense_view.insert_category(row)
         self.view.category_view.edit_windows.add.hide()
-        self.on_categories_updated()
 
     def handle_update_category_clicked(self) -> None:
         """
@@ -155,9 +362,39 @@ class Presenter:
         if category.parent_id == 0:
             category.parent_id = None
 
-        self.category_repository.update(category)
+        self.worker.submit(
+            partial(update_existing, self.category_repository, category),
+            lambda old: self.on_category_updated(old, category),
+        )
+
+    def on_category_updated(self, old: Category | None, category: Category) -> None:
+        """
+        Показывает обновленную категорию (old - прежняя версия или None,
+        если категория уже удалена).
+        """
         self.view.category_view.edit_windows.update.hide()
-        self.on_categories_updated()
+        if old is None:
+            return
+
+        # Траты поддерева переносятся от прежних предков к новым.
+        subtree_total = self.category_totals[category.pk].total
+        changed = dict.fromkeys(add_to_ancestors(
+            self.category_totals, self.category_tree, category.pk, -subtree_total
+        ))
+        self.category_tree.update(category)
+        changed.update(dict.fromkeys(add_to_ancestors(
+            self.category_totals, self.category_tree, category.pk, subtree_total
+        )))
+
+        row = self.format_category(category.pk)
+        self.view.category_view.update_category(row)
+        self.view.category_view.update_totals(
+            [self.format_category(pk) for pk in changed]
+        )
+        self.view.expense_view.update_category(row)
+        if self.category_id_to_name[category.pk] != category.name:
+            self.category_id_to_name[category.pk] = category.name
+            self.update_expense_rows(category.pk)
 
     def handle_delete_category_clicked(self) -> None:
         """
@@ -167,9 +404,40 @@ class Presenter:
         if pk_to_delete == 0:
             return
 
-        self.category_repository.delete(pk_to_delete)
+        self.worker.submit(
+            partial(delete_existing, self.category_repository, pk_to_delete),
+            lambda old: self.on_category_deleted(old, pk_to_delete),
+        )
+
+    def on_category_deleted(self, old: Category | None, pk_to_delete: int) -> None:
+        """
+        Убирает удаленную категорию (old - None, если она была удалена раньше).
+        """
         self.view.category_view.edit_windows.delete.hide()
-        self.on_categories_updated()
+        if old is None:
+            return
+
+        # Подкатегории становятся категориями верхнего уровня,
+        # поэтому у предков пропадают траты всего поддерева.
+        changed = add_to_ancestors(
+            self.category_totals, self.category_tree, pk_to_delete,
+            -self.category_totals.pop(pk_to_delete).total
+        )
+        self.category_tree.remove(pk_to_delete)
+        del self.category_id_to_name[pk_to_delete]
+        # Расходы удаленной категории остаются без категории.
+        for row_id, expense in enumerate(self.expenses):
+            if expense.category_id == pk_to_delete:
+                expense.category_id = None
+                self.view.expense_view.update_expense(
+                    row_id, self.format_expense(expense)
+                )
+
+        self.view.category_view.remove_category(str(pk_to_delete))
+        self.view.category_view.update_totals(
+            [self.format_category(pk) for pk in changed]
+        )
+        self.view.expense_view.remove_category(str(pk_to_delete))
 
     # EXPENSE HANDLERS
 
@@ -181,9 +449,18 @@ class Presenter:
         if expense.category_id == 0:
             expense.category_id = None
 
-        self.expense_repository.add(expense)
+        self.worker.submit(
+            partial(self.expense_repository.add, expense),
+            lambda _: self.on_expense_added(expense),
+        )
+
+    def on_expense_added(self, expense: Expense) -> None:
+        """
+        Показывает добавленный расход.
+        """
+        self.insert_expense_row(expense)
         self.view.expense_view.edit_windows.add.hide()
-        self.on_expenses_updated()
+        self.on_expense_changed(None, expense)
 
     def handle_update_expense_clicked(self) -> None:
         """
@@ -194,18 +471,76 @@ class Presenter:
             expense.category_id = None
         expense.pk = self.expenses[row_id].pk
 
-        self.expense_repository.update(expense)
+        self.worker.submit(
+            partial(update_existing, self.expense_repository, expense),
+            lambda old: self.on_expense_updated(old, expense),
+        )
+
+    def on_expense_updated(self, old_expense: Expense | None, expense: Expense) -> None:
+        """
+        Показывает обновленный расход. old_expense - версия из бд,
+        к которой применено изменение (None, если расход уже удален):
+        по ней находится строка и вычитаются прежние траты.
+        """
         self.view.expense_view.edit_windows.update.hide()
-        self.on_expenses_updated()
+        if old_expense is None:
+            return
+
+        row_id = self.find_expense_row(old_expense)
+        if row_id is not None:
+            self.expenses.pop(row_id)
+        if row_id is not None and self.get_expense_row(expense) == row_id:
+            self.expenses.insert(row_id, expense)
+            self.view.expense_view.update_expense(row_id, self.format_expense(expense))
+        else:
+            if row_id is not None:
+                self.view.expense_view.remove_expense(row_id)
+            self.insert_expense_row(expense)
+        self.on_expense_changed(old_expense, expense)
 
     def handle_delete_expense_clicked(self) -> None:
         """
         Обрабатывает удаление расхода.
         """
         row_id = self.view.expense_view.delete_content.get_row_id()
-        self.expense_repository.delete(self.expenses[row_id].pk)
+        self.worker.submit(
+            partial(delete_existing, self.expense_repository, self.expenses[row_id].pk),
+            self.on_expense_deleted,
+        )
+
+    def on_expense_deleted(self, expense: Expense | None) -> None:
+        """
+        Убирает удаленный расход (None, если он был удален раньше).
+        """
         self.view.expense_view.edit_windows.delete.hide()
-        self.on_expenses_updated()
+        if expense is None:
+            return
+
+        row_id = self.find_expense_row(expense)
+        if row_id is not None:
+            self.expenses.pop(row_id)
+            self.view.expense_view.remove_expense(row_id)
+        self.on_expense_changed(expense, None)
+
+    def format_expense(self, expense: Expense) -> list[str]:
+        """Строка таблицы расходов для расхода."""
+        return formatter.format_expense(expense, self.category_id_to_name)
+
+    def update_expense_rows(self, category_id: int) -> None:
+        """Обновляет загруженные строки расходов категории."""
+        for row_id, expense in enumerate(self.expenses):
+            if expense.category_id == category_id:
+                self.view.expense_view.update_expense(
+                    row_id, self.format_expense(expense)
+                )
+
+    def insert_expense_row(self, expense: Expense) -> None:
+        """Вставляет расход в таблицу, если его место уже загружено."""
+        row_id = self.get_expense_row(expense)
+        if row_id is None:
+            return
+        self.expenses.insert(row_id, expense)
+        self.view.expense_view.insert_expense(row_id, self.format_expense(expense))
 
     # BUDGET HANDLERS
 
@@ -214,9 +549,21 @@ class Presenter:
         Обрабатывает добавление бюджета.
         """
         budget = self.view.budget_view.add_content.get_budget_add()
-        self.budget_repository.add(budget)
+        self.worker.submit(
+            partial(self.budget_repository.add, budget),
+            lambda _: self.on_budget_added(budget),
+        )
+
+    def on_budget_added(self, budget: Budget) -> None:
+        """
+        Показывает добавленный бюджет.
+        """
+        self.budgets.append(budget)
+        self.get_period_expenses()
+        self.view.budget_view.insert_budget(
+            len(self.budgets) - 1, formatter.format_budget(budget, self.period_expenses)
+        )
         self.view.budget_view.edit_windows.add.hide()
-        self.on_budgets_updated()
 
     def handle_update_budget_clicked(self) -> None:
         """
@@ -224,9 +571,25 @@ class Presenter:
         """
         row_id, budget = self.view.budget_view.update_content.get_budget_update()
         budget.pk = self.budgets[row_id].pk
-        self.budget_repository.update(budget)
+        self.worker.submit(
+            partial(update_existing, self.budget_repository, budget),
+            lambda _: self.on_budget_updated(budget),
+        )
+
+    def on_budget_updated(self, budget: Budget) -> None:
+        """
+        Показывает обновленный бюджет.
+        """
         self.view.budget_view.edit_windows.update.hide()
-        self.on_budgets_updated()
+        row_id = self.find_budget_row(budget.pk)
+        if row_id is None:
+            return
+        self.budgets[row_id] = budget
+        # Траты за период, который больше ни у кого не стоит, убираются.
+        self.get_period_expenses()
+        self.view.budget_view.update_budget(
+            row_id, formatter.format_budget(budget, self.period_expenses)
+        )
 
     def handle_delete_budget_clicked(self) -> None:
         """
@@ -234,6 +597,18 @@ class Presenter:
         """
         row_id = self.view.budget_view.delete_content.get_row_id()
         pk = self.budgets[row_id].pk
-        self.budget_repository.delete(pk)
+        self.worker.submit(
+            partial(delete_existing, self.budget_repository, pk),
+            lambda _: self.on_budget_deleted(pk),
+        )
+
+    def on_budget_deleted(self, pk: int) -> None:
+        """
+        Убирает удаленный бюджет.
+        """
+        row_id = self.find_budget_row(pk)
+        if row_id is not None:
+            self.budgets.pop(row_id)
+            self.get_period_expenses()
+            self.view.budget_view.remove_budget(row_id)
         self.view.budget_view.edit_windows.delete.hide()
-        self.on_budgets_updated()
@@ -0,0 +1,144 @@
+# pylint: disable=import-error,no-name-in-module
+# Workaround for GitHub Actions.
+
+"""
+Модуль выполнения запросов к репозиториям в фоновом потоке.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QObject, Signal
+
+ResultCallback = Callable[[Any], None]
+
+
+@dataclass
+class Job:
+    """
+    Задача для фонового потока.
+    fn - запрос к репозиториям, on_result - обработчик его результата
+    key - ключ, по которому задача вытесняется более новой
+    """
+    job_id: int
+    fn: Callable[[], Any]
+    on_result: ResultCallback | None = None
+    key: str | None = None
+
+
+class RepositoryWorker(QObject):
+    """
+    Исполнитель запросов к репозиториям в отдельном потоке.
+
+    Задачи выполняются по одной в порядке отправки в единственном фоновом
+    потоке, поэтому чтения и изменения не переставляются, а у потока свое
+    соединение с базой (SQLiteConnectionManager держит соединение на поток).
+    Результат передается сигналом в поток, где создан исполнитель, и
+    обработчик on_result вызывается там же - в нем можно менять виджеты.
+    Исключение задачи выбрасывается в этом потоке вместо вызова обработчика.
+
+    Задачи с одинаковым ключом вытесняют друг друга: если отправлена
+    более новая задача с тем же ключом, старая не выполняется, а если
+    уже выполнена - ее результат отбрасывается. Так повторные запросы одних
+    и тех же данных схлопываются в последний, а устаревшие загрузки
+    отменяются. Задачи без ключа (изменения) выполняются всегда.
+    """
+    # Задача, результат, исключение.
+    _done = Signal(object, object, object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._jobs: queue.Queue[Job | None] = queue.Queue()
+        self._lock = threading.Lock()
+        # Последняя отправленная задача по ключу.
+        self._latest: dict[str, int] = {}
+        self._next_id = 0
+        # Отправленные задачи, результат которых еще не обработан.
+        self._unfinished = 0
+
+        self._done.connect(self._deliver)
+        self._thread = threading.Thread(
+            target=self._run, name='repository-worker', daemon=True
+        )
+        self._thread.start()
+
+    def _new_id(self) -> int:
+        job_id = self._next_id
+        self._next_id += 1
+        return job_id
+
+    def _is_superseded(self, job: Job) -> bool:
+        if job.key is None:
+            return False
+        with self._lock:
+            return self._latest.get(job.key) != job.job_id
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+
+            result, error = None, None
+            if not self._is_superseded(job):
+                try:
+                    result = job.fn()
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    error = exc
+            self._done.emit(job, result, error)
+
+    def _deliver(self, job: Job, result: Any, error: Exception | None) -> None:
+        self._unfinished -= 1
+        if job.key is not None:
+            with self._lock:
+                if self._latest.get(job.key) != job.job_id:
+                    return
+                del self._latest[job.key]
+
+        if error is not None:
+            raise error
+        if job.on_result is not None:
+            job.on_result(result)
+
+    def submit(
+            self,
+            fn: Callable[[], Any],
+            on_result: ResultCallback | None = None,
+            key: str | None = None
+    ) -> None:
+        """
+        Отправляет задачу fn в фоновый поток. Задача с ключом key вытесняет
+        ранее отправленную с тем же ключом.
+        """
+        with self._lock:
+            job = Job(self._new_id(), fn, on_result, key)
+            if key is not None:
+                self._latest[key] = job.job_id
+        self._unfinished += 1
+        self._jobs.put(job)
+
+    def cancel(self, key: str) -> None:
+        """Отменяет отправленную задачу с ключом key."""
+        with self._lock:
+            if key in self._latest:
+                self._latest[key] = self._new_id()
+
+    def pending(self) -> int:
+        """Число задач, результат которых еще не обработан."""
+        return self._unfinished
+
+    def wait(self) -> None:
+        """
+        Ждет выполнения всех задач, в том числе отправленных обработчиками
+        результатов, и вызова обработчиков (перед закрытием соединений с базой).
+        """
+        while self._unfinished:
+            QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+
+    def stop(self) -> None:
+        """Выполняет оставшиеся задачи и останавливает фоновый поток."""
+        self.wait()
+        self._jobs.put(None)
+        self._thread.join()
@@ -7,8 +7,12 @@
 использовать его для иных целей.
 """
 
+import heapq
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, Protocol, Any
+from contextlib import contextmanager
+from typing import Generic, TypeVar, Protocol, Any, Iterable, Iterator
+
+from bookkeeper.repository.query import GroupBy, aggregate_objects
 
 
 class Model(Protocol):  # pylint: disable=too-few-public-methods
@@ -21,6 +25,34 @@ class Model(Protocol):  # pylint: disable=too-few-public-methods
 T = TypeVar('T', bound=Model)
 
 
+def parse_order_by(order_by: str) -> tuple[str, bool]:
+    """
+    Разобрать поле сортировки: 'поле' - по возрастанию,
+    '-поле' - по убыванию. Вернуть пару (поле, по убыванию ли).
+    """
+    if order_by.startswith('-'):
+        return order_by[1:], True
+    return order_by, False
+
+
+def page_key(obj: Model, order_by: str = 'pk') -> tuple[Any, int]:
+    """
+    Ключ объекта для постраничной выборки get_page:
+    пара (значение поля сортировки, pk).
+    """
+    field, _ = parse_order_by(order_by)
+    return getattr(obj, field), obj.pk
+
+
+def _sort_key(key: tuple[Any, int]) -> tuple[bool, Any, int]:
+    """
+    Ключ сортировки для get_page: значение None меньше любого другого
+    и не сравнивается с ними.
+    """
+    value, pk = key
+    return value is not None, value, pk
+
+
 class AbstractRepository(ABC, Generic[T]):
     """
     Абстрактный репозиторий.
@@ -30,6 +62,13 @@ class AbstractRepository(ABC, Generic[T]):
     get_all
     update
     delete
+
+    Метод iter_all по умолчанию перебирает результат get_all,
+    get_page - отбирает страницу из результата iter_all,
+    aggregate - вычисляет агрегат за один проход по iter_all.
+    Пакетные методы add_many, update_many, delete_many по умолчанию
+    вызывают одиночные методы в цикле; реализации могут их переопределить.
+    Метод transaction по умолчанию ничего не делает.
     """
 
     @abstractmethod
@@ -47,10 +86,78 @@ class AbstractRepository(ABC, Generic[T]):
     def get_all(self, where: dict[str, Any] | None = None) -> list[T]:
         """
         Получить все записи по некоторому условию
-        where - условие в виде словаря {'название_поля': значение}
+        where - условие в виде словаря {'название_поля': значение},
+        к названию поля можно добавить оператор: {'название_поля__gte': значение}
+        (список операторов см. в bookkeeper.repository.query)
         если условие не задано (по умолчанию), вернуть все записи
         """
 
+    def iter_all(  # pylint: disable=unused-argument
+            self,
+            where: dict[str, Any] | None = None,
+            batch_size: int = 1000
+    ) -> Iterator[T]:
+        """
+        Перебрать записи по некоторому условию, не загружая их все в память.
+        where - условие, как в get_all
+        batch_size - сколько записей реализация может читать за один раз
+        Реализация по умолчанию использует get_all.
+        """
+        yield from self.get_all(where)
+
+    def get_page(
+            self,
+            where: dict[str, Any] | None = None,
+            order_by: str = 'pk',
+            limit: int = 100,
+            after_key: tuple[Any, int] | None = None
+    ) -> list[T]:
+        """
+        Получить страницу записей по условию where (как в get_all).
+        order_by - поле сортировки, префикс '-' означает сортировку по убыванию;
+        записи с равным значением поля упорядочиваются по pk в том же направлении.
+        Записи со значением поля None, как NULL в SQLite, идут первыми
+        при сортировке по возрастанию и последними - по убыванию.
+        limit - максимальный размер страницы
+        after_key - ключ последней записи предыдущей страницы (см. page_key),
+        если не задан, вернуть первую страницу
+        """
+        _, descending = parse_order_by(order_by)
+
+        def key(obj: T) -> tuple[bool, Any, int]:
+            return _sort_key(page_key(obj, order_by))
+
+        objs: Iterator[T] = self.iter_all(where)
+        if after_key is not None:
+            after = _sort_key(after_key)
+            if descending:
+                objs = (obj for obj in objs if key(obj) < after)
+            else:
+                objs = (obj for obj in objs if key(obj) > after)
+
+        if descending:
+            return heapq.nlargest(limit, objs, key=key)
+        return heapq.nsmallest(limit, objs, key=key)
+
+    def aggregate(
+            self,
+            func: str,
+            field: str,
+            where: dict[str, Any] | None = None,
+            group_by: GroupBy | None = None
+    ) -> Any:
+        """
+        Вычислить агрегирующую функцию по полю записей, удовлетворяющих
+        условию where (как в get_all).
+        func - 'sum', 'count', 'min', 'max' или 'avg'
+        (см. bookkeeper.repository.query)
+        field - поле, по которому вычисляется функция
+        group_by - поле группировки (возможно, с усечением даты, например
+        'expense_date__month') или кортеж таких полей; если задано, вернуть
+        словарь {значение поля или кортеж значений: значение функции}
+        """
+        return aggregate_objects(self.iter_all(where), func, field, group_by)
+
     @abstractmethod
     def update(self, obj: T) -> None:
         """ Обновить данные об объекте. Объект должен содержать поле pk. """
@@ -58,3 +165,29 @@ class AbstractRepository(ABC, Generic[T]):
     @abstractmethod
     def delete(self, pk: int) -> None:
         """ Удалить запись """
+
+    def add_many(self, objs: Iterable[T]) -> list[int]:
+        """
+        Добавить несколько объектов в репозиторий, вернуть список их id,
+        также записать id в атрибут pk каждого объекта.
+        """
+        return [self.add(obj) for obj in objs]
+
+    def update_many(self, objs: Iterable[T]) -> None:
+        """ Обновить данные о нескольких объектах. """
+        for obj in objs:
+            self.update(obj)
+
+    def delete_many(self, pks: Iterable[int]) -> None:
+        """ Удалить несколько записей """
+        for pk in pks:
+            self.delete(pk)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Контекстный менеджер транзакции: все изменения внутри блока
+        фиксируются вместе. Реализация по умолчанию ничего не делает
+        (изменения применяются сразу и не откатываются).
+        """
+        yield
@@ -0,0 +1,178 @@
+"""
+Модуль содержит описание абстрактного асинхронного репозитория
+
+Асинхронный репозиторий хранит объекты так же, как AbstractRepository,
+но его методы - корутины, поэтому им можно пользоваться из asyncio
+без обертки каждого вызова в run_in_executor.
+"""
+
+from abc import ABC, abstractmethod
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Generic, Iterable, Iterator, TypeVar
+
+from bookkeeper.repository.abstract_repository import AbstractRepository, T
+from bookkeeper.repository.query import GroupBy
+
+R = TypeVar('R')
+
+
+class AsyncAbstractRepository(ABC, Generic[T]):
+    """
+    Абстрактный асинхронный репозиторий.
+    Абстрактные методы:
+    add
+    get
+    get_all
+    update
+    delete
+
+    Метод iter_all по умолчанию перебирает результат get_all.
+    Смысл методов и их аргументов - как в AbstractRepository.
+    """
+
+    @abstractmethod
+    async def add(self, obj: T) -> int:
+        """
+        Добавить объект в репозиторий, вернуть id объекта,
+        также записать id в атрибут pk.
+        """
+
+    @abstractmethod
+    async def get(self, pk: int) -> T | None:
+        """ Получить объект по id """
+
+    @abstractmethod
+    async def get_all(self, where: dict[str, Any] | None = None) -> list[T]:
+        """
+        Получить все записи по некоторому условию
+        (см. AbstractRepository.get_all)
+        """
+
+    async def iter_all(  # pylint: disable=unused-argument
+            self,
+            where: dict[str, Any] | None = None,
+            batch_size: int = 1000
+    ) -> AsyncIterator[T]:
+        """
+        Перебрать записи по некоторому условию, не загружая их все в память.
+        Реализация по умолчанию использует get_all.
+        """
+        for obj in await self.get_all(where):
+            yield obj
+
+    @abstractmethod
+    async def update(self, obj: T) -> None:
+        """ Обновить данные об объекте. Объект должен содержать поле pk. """
+
+    @abstractmethod
+    async def delete(self, pk: int) -> None:
+        """ Удалить запись """
+
+
+class AsyncRepositoryAdapter(AsyncAbstractRepository[T]):
+    """
+    Асинхронный интерфейс к синхронному репозиторию repository.
+
+    Каждый вызов выполняется методом _run. Здесь он выполняется сразу
+    в потоке цикла событий, что подходит для быстрых репозиториев
+    в памяти; наследники могут передавать вызовы в другой поток.
+    """
+
+    def __init__(self, repository: AbstractRepository[T]) -> None:
+        self.repository = repository
+
+    async def _run(self, fn: Callable[[], R]) -> R:
+        """Выполнить вызов синхронного репозитория."""
+        return fn()
+
+    async def add(self, obj: T) -> int:
+        return await self._run(partial(self.repository.add, obj))
+
+    async def get(self, pk: int) -> T | None:
+        return await self._run(partial(self.repository.get, pk))
+
+    async def get_all(self, where: dict[str, Any] | None = None) -> list[T]:
+        return await self._run(partial(self.repository.get_all, where))
+
+    async def iter_all(
+            self,
+            where: dict[str, Any] | None = None,
+            batch_size: int = 1000
+    ) -> AsyncIterator[T]:
+        """
+        Перебрать записи по некоторому условию. Записи читаются
+        из iter_all синхронного репозитория пачками по batch_size.
+        """
+        objs: Iterator[T] = self.repository.iter_all(where, batch_size)
+        try:
+            while True:
+                batch = await self._run(partial(_take, objs, batch_size))
+                for obj in batch:
+                    yield obj
+                if len(batch) < batch_size:
+                    return
+        finally:
+            close = getattr(objs, 'close', None)
+            if close is not None:
+                await self._run(close)
+
+    async def get_page(
+            self,
+            where: dict[str, Any] | None = None,
+            order_by: str = 'pk',
+            limit: int = 100,
+            after_key: tuple[Any, int] | None = None
+    ) -> list[T]:
+        """ Получить страницу записей (см. AbstractRepository.get_page) """
+        return await self._run(partial(
+            self.repository.get_page, where, order_by, limit, after_key
+        ))
+
+    async def aggregate(
+            self,
+            func: str,
+            field: str,
+            where: dict[str, Any] | None = None,
+            group_by: GroupBy | None = None
+    ) -> Any:
+        """ Вычислить агрегат (см. AbstractRepository.aggregate) """
+        return await self._run(partial(
+            self.repository.aggregate, func, field, where, group_by
+        ))
+
+    async def update(self, obj: T) -> None:
+        await self._run(partial(self.repository.update, obj))
+
+    async def delete(self, pk: int) -> None:
+        await self._run(partial(self.repository.delete, pk))
+
+    async def add_many(self, objs: Iterable[T]) -> list[int]:
+        """ Добавить несколько объектов (см. AbstractRepository.add_many) """
+        return await self._run(partial(self.repository.add_many, list(objs)))
+
+    async def update_many(self, objs: Iterable[T]) -> None:
+        """ Обновить данные о нескольких объектах """
+        await self._run(partial(self.repository.update_many, list(objs)))
+
+    async def delete_many(self, pks: Iterable[int]) -> None:
+        """ Удалить несколько записей """
+        await self._run(partial(self.repository.delete_many, list(pks)))
+
+    async def run_in_transaction(
+            self,
+            fn: Callable[[AbstractRepository[T]], R]
+    ) -> R:
+        """
+        Выполнить fn(repository) над синхронным репозиторием в одной
+        транзакции. Вызовы других корутин в нее не попадают.
+        """
+        def run() -> R:
+            with self.repository.transaction():
+                return fn(self.repository)
+
+        return await self._run(run)
+
+
+def _take(objs: Iterator[T], count: int) -> list[T]:
+    return list(islice(objs, count))
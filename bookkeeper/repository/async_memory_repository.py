@@ -0,0 +1,27 @@
+"""
+Модуль описывает асинхронный репозиторий, работающий в оперативной памяти
+"""
+
+from typing import Iterable
+
+from bookkeeper.repository.abstract_repository import T
+from bookkeeper.repository.async_abstract_repository import AsyncRepositoryAdapter
+from bookkeeper.repository.memory_repository import MemoryRepository
+
+
+class AsyncMemoryRepository(AsyncRepositoryAdapter[T]):
+    """
+    Асинхронный интерфейс к MemoryRepository (например, для тестов кода,
+    работающего с AsyncSQLiteRepository). Операции в памяти быстрые,
+    поэтому выполняются прямо в цикле событий, без потоков.
+    Аргументы indexes и ordered_indexes - как у MemoryRepository.
+    """
+
+    repository: MemoryRepository[T]
+
+    def __init__(
+            self,
+            indexes: Iterable[str] = (),
+            ordered_indexes: Iterable[str] = ()
+    ) -> None:
+        super().__init__(MemoryRepository[T](indexes, ordered_indexes))
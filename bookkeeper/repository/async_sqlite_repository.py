@@ -0,0 +1,85 @@
+"""
+Модуль описывает асинхронный репозиторий, работающий с СУБД SQLite.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository.abstract_repository import T
+from bookkeeper.repository.async_abstract_repository import AsyncRepositoryAdapter, R
+from bookkeeper.repository.sqlite_category_repository import SQLiteCategoryRepository
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_database_executor(db_file: str) -> ThreadPoolExecutor:
+    """
+    Возвращает общий поток запросов к файлу базы данных: исполнитель
+    с одним потоком и очередью запросов. Асинхронные репозитории,
+    созданные для одного и того же файла, получают один исполнитель.
+    """
+    key = os.path.abspath(db_file)
+    with _executors_lock:
+        if key not in _executors:
+            _executors[key] = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f'sqlite-{os.path.basename(key)}'
+            )
+        return _executors[key]
+
+
+def _sqlite_repository(
+        db_file: str,
+        cls: type,
+        connection_manager: SQLiteConnectionManager | None
+) -> SQLiteRepository[Any]:
+    """
+    Синхронный репозиторий для модели cls. Для категорий - репозиторий,
+    поддерживающий таблицу замыкания category_closure.
+    """
+    if cls is Category:
+        return SQLiteCategoryRepository(db_file, connection_manager)
+    return SQLiteRepository[Any](db_file, cls, connection_manager)
+
+
+class AsyncSQLiteRepository(AsyncRepositoryAdapter[T]):
+    """
+    Асинхронный репозиторий, работающий с СУБД SQLite.
+
+    Запросы всех корутин выполняет по очереди один поток (executor),
+    у которого одно соединение с базой от менеджера соединений. Поэтому
+    корутины не ждут друг друга в цикле событий и не открывают лишних
+    соединений, а база не получает конкурентных записей из разных потоков.
+    Синхронный SQLiteRepository доступен в атрибуте repository
+    и используется только из этого потока.
+
+    repository - готовый синхронный репозиторий (например, наследник
+    SQLiteRepository со своей логикой записи). По умолчанию он создается
+    для модели cls; для Category это SQLiteCategoryRepository, иначе
+    изменения категорий не попадали бы в таблицу замыкания.
+    """
+
+    repository: SQLiteRepository[T]
+
+    def __init__(
+            self,
+            db_file: str,
+            cls: type,
+            connection_manager: SQLiteConnectionManager | None = None,
+            executor: ThreadPoolExecutor | None = None,
+            repository: SQLiteRepository[T] | None = None
+    ) -> None:
+        self.executor = executor if executor is not None \
+            else get_database_executor(db_file)
+        if repository is None:
+            repository = _sqlite_repository(db_file, cls, connection_manager)
+        super().__init__(repository)
+
+    async def _run(self, fn: Callable[[], R]) -> R:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn)
@@ -0,0 +1,137 @@
+"""
+Модуль описывает кэширующий репозиторий-обертку
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator
+
+from bookkeeper.repository.abstract_repository import AbstractRepository, T
+from bookkeeper.repository.query import GroupBy
+
+
+class CachedRepository(AbstractRepository[T]):
+    """
+    Кэширующая обертка над любым репозиторием.
+
+    Объекты, полученные через get, хранятся в карте идентичности по pk:
+    повторный get возвращает тот же объект без обращения к репозиторию.
+    Размер кэша ограничен max_size, при переполнении вытесняется объект,
+    к которому дольше всего не обращались (LRU).
+
+    Запись сквозная: add и update сохраняют объект в репозиторий и в кэш.
+    delete сбрасывает кэш целиком, так как удаление может изменить другие
+    записи (например, ON DELETE SET NULL в SQLite). Откат транзакции также
+    сбрасывает кэш. Выборки get_all, iter_all, get_page и aggregate
+    выполняются репозиторием напрямую.
+
+    Счетчики hits и misses показывают число попаданий и промахов get.
+    Остальные атрибуты и методы обернутого репозитория (например,
+    get_ancestors у SQLiteCategoryRepository) доступны напрямую.
+    """
+
+    def __init__(self, repository: AbstractRepository[T], max_size: int = 1024) -> None:
+        self.repository = repository
+        self.max_size = max_size
+        self._cache: OrderedDict[int, T] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _remember(self, obj: T) -> None:
+        """Сохраняет объект в кэш, вытесняя самые старые при переполнении."""
+        self._cache[obj.pk] = obj
+        self._cache.move_to_end(obj.pk)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """Сбрасывает кэш."""
+        self._cache.clear()
+
+    def add(self, obj: T) -> int:
+        pk = self.repository.add(obj)
+        self._remember(obj)
+        return pk
+
+    def add_many(self, objs: Iterable[T]) -> list[int]:
+        objs = list(objs)
+        pks = self.repository.add_many(objs)
+        for obj in objs:
+            self._remember(obj)
+        return pks
+
+    def get(self, pk: int) -> T | None:
+        obj = self._cache.get(pk)
+        if obj is not None:
+            self.hits += 1
+            self._cache.move_to_end(pk)
+            return obj
+
+        self.misses += 1
+        obj = self.repository.get(pk)
+        if obj is not None:
+            self._remember(obj)
+        return obj
+
+    def get_all(self, where: dict[str, Any] | None = None) -> list[T]:
+        return self.repository.get_all(where)
+
+    def iter_all(
+            self,
+            where: dict[str, Any] | None = None,
+            batch_size: int = 1000
+    ) -> Iterator[T]:
+        return self.repository.iter_all(where, batch_size)
+
+    def get_page(
+            self,
+            where: dict[str, Any] | None = None,
+            order_by: str = 'pk',
+            limit: int = 100,
+            after_key: tuple[Any, int] | None = None
+    ) -> list[T]:
+        return self.repository.get_page(where, order_by, limit, after_key)
+
+    def aggregate(
+            self,
+            func: str,
+            field: str,
+            where: dict[str, Any] | None = None,
+            group_by: GroupBy | None = None
+    ) -> Any:
+        return self.repository.aggregate(func, field, where, group_by)
+
+    def update(self, obj: T) -> None:
+        self.repository.update(obj)
+        self._remember(obj)
+
+    def update_many(self, objs: Iterable[T]) -> None:
+        objs = list(objs)
+        self.repository.update_many(objs)
+        for obj in objs:
+            self._remember(obj)
+
+    def delete(self, pk: int) -> None:
+        self.repository.delete(pk)
+        self.clear()
+
+    def delete_many(self, pks: Iterable[int]) -> None:
+        self.repository.delete_many(pks)
+        self.clear()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        try:
+            with self.repository.transaction():
+                yield
+        except BaseException:
+            self.clear()
+            raise
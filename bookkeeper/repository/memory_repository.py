@@ -2,41 +2,190 @@
 Модуль описывает репозиторий, работающий в оперативной памяти
 """
 
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
 from itertools import count
-from typing import Any
+from operator import itemgetter
+from typing import Any, Iterable, Iterator
 from bookkeeper.repository.abstract_repository import AbstractRepository, T
+from bookkeeper.repository.query import compile_where, parse_condition
+
+_value = itemgetter(0)
+_RANGE_OPERATORS = ('eq', 'lt', 'lte', 'gt', 'gte')
 
 
 class MemoryRepository(AbstractRepository[T]):
     """
     Репозиторий, работающий в оперативной памяти. Хранит данные в словаре.
+
+    Для ускорения выборок get_all/iter_all по условию можно объявить индексы:
+    indexes - поля с хеш-индексом (условия eq, in, isnull),
+    ordered_indexes - поля с упорядоченным индексом (условия eq, lt, lte,
+    gt, gte); значения таких полей должны быть сравнимы между собой.
+    Индексы поддерживаются при add/update/delete. Условия по индексированным
+    полям отбирают кандидатов, остальные условия проверяются только для них.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+            self,
+            indexes: Iterable[str] = (),
+            ordered_indexes: Iterable[str] = ()
+    ) -> None:
         self._container: dict[int, T] = {}
         self._counter = count(1)
 
+        self._hash_indexes: dict[str, dict[Any, set[int]]] = {
+            field: {} for field in indexes
+        }
+        # Отсортированные пары (значение, pk); None в индекс не попадает.
+        self._ordered_indexes: dict[str, list[tuple[Any, int]]] = {
+            field: [] for field in ordered_indexes
+        }
+        # Проиндексированные значения полей объекта: объект могли изменить
+        # до вызова update, поэтому старые значения берутся отсюда.
+        self._indexed_values: dict[int, dict[str, Any]] = {}
+
+    # INDEXES
+
+    def _index(self, obj: T) -> None:
+        """Добавляет объект в индексы."""
+        if not self._hash_indexes and not self._ordered_indexes:
+            return
+
+        values = {}
+        for field, hash_index in self._hash_indexes.items():
+            value = values[field] = getattr(obj, field, None)
+            hash_index.setdefault(value, set()).add(obj.pk)
+        for field, ordered_index in self._ordered_indexes.items():
+            value = values[field] = getattr(obj, field, None)
+            if value is not None:
+                insort(ordered_index, (value, obj.pk))
+        self._indexed_values[obj.pk] = values
+
+    def _unindex(self, pk: int) -> None:
+        """Удаляет объект из индексов."""
+        values = self._indexed_values.pop(pk, None)
+        if values is None:
+            return
+
+        for field, hash_index in self._hash_indexes.items():
+            pks = hash_index[values[field]]
+            pks.discard(pk)
+            if not pks:
+                del hash_index[values[field]]
+        for field, ordered_index in self._ordered_indexes.items():
+            if values[field] is not None:
+                del ordered_index[bisect_left(ordered_index, (values[field], pk))]
+
+    def _lookup(self, field: str, op: str, value: Any) -> set[int] | None:
+        """
+        Множество pk объектов, удовлетворяющих условию, по индексу поля.
+        None, если для условия нет подходящего индекса.
+        """
+        hash_index = self._hash_indexes.get(field)
+        if hash_index is not None:
+            if op == 'eq':
+                return set(hash_index.get(value, ()))
+            if op == 'in':
+                return set().union(
+                    *(hash_index.get(x, ()) for x in value if x is not None)
+                )
+            if op == 'isnull' and value:
+                return set(hash_index.get(None, ()))
+
+        ordered_index = self._ordered_indexes.get(field)
+        if ordered_index is None or value is None or op not in _RANGE_OPERATORS:
+            return None
+
+        if op in ('eq', 'gte', 'gt'):
+            bisect = bisect_right if op == 'gt' else bisect_left
+            start = bisect(ordered_index, value, key=_value)
+        else:
+            start = 0
+        if op in ('eq', 'lte', 'lt'):
+            bisect = bisect_left if op == 'lt' else bisect_right
+            stop = bisect(ordered_index, value, key=_value)
+        else:
+            stop = len(ordered_index)
+
+        return {pk for _, pk in ordered_index[start:stop]}
+
+    def _candidates(self, where: dict[str, Any]) -> Iterable[T]:
+        """Объекты, которые могут удовлетворять условию (с учетом индексов)."""
+        pks: set[int] | None = None
+        for key, value in where.items():
+            found = self._lookup(*parse_condition(key), value)
+            if found is not None:
+                pks = found if pks is None else pks & found
+
+        if pks is None:
+            return self._container.values()
+        return [self._container[pk] for pk in sorted(pks)]
+
+    # REPOSITORY
+
     def add(self, obj: T) -> int:
         if getattr(obj, 'pk', None) != 0:
             raise ValueError(f'trying to add object {obj} with filled `pk` attribute')
         pk = next(self._counter)
         self._container[pk] = obj
         obj.pk = pk
+        self._index(obj)
         return pk
 
+    def add_many(self, objs: Iterable[T]) -> list[int]:
+        objs = list(objs)
+        for obj in objs:
+            if getattr(obj, 'pk', None) != 0:
+                raise ValueError(f'trying to add object {obj} with filled `pk` attribute')
+        return [self.add(obj) for obj in objs]
+
     def get(self, pk: int) -> T | None:
         return self._container.get(pk)
 
     def get_all(self, where: dict[str, Any] | None = None) -> list[T]:
         if where is None:
             return list(self._container.values())
-        return [obj for obj in self._container.values()
-                if all(getattr(obj, attr) == value for attr, value in where.items())]
+        predicate = compile_where(where)
+        return [obj for obj in self._candidates(where) if predicate(obj)]
+
+    def iter_all(
+            self,
+            where: dict[str, Any] | None = None,
+            batch_size: int = 1000
+    ) -> Iterator[T]:
+        if where is None:
+            yield from self._container.values()
+            return
+        predicate = compile_where(where)
+        for obj in self._candidates(where):
+            if predicate(obj):
+                yield obj
 
     def update(self, obj: T) -> None:
         if obj.pk == 0:
             raise ValueError('attempt to update object with unknown primary key')
+        self._unindex(obj.pk)
         self._container[obj.pk] = obj
+        self._index(obj)
+
+    def update_many(self, objs: Iterable[T]) -> None:
+        objs = list(objs)
+        if any(obj.pk == 0 for obj in objs):
+            raise ValueError('attempt to update object with unknown primary key')
+        for obj in objs:
+            self.update(obj)
 
     def delete(self, pk: int) -> None:
         self._container.pop(pk)
+        self._unindex(pk)
+
+    def delete_many(self, pks: Iterable[int]) -> None:
+        # Как и в SQLite, пакет удаляется целиком или не удаляется вовсе:
+        # неизвестный или повторяющийся pk - ошибка до удаления.
+        counts = Counter(pks)
+        for pk, pk_count in counts.items():
+            if pk_count > 1 or pk not in self._container:
+                raise KeyError(pk)
+        for pk in counts:
+            self.delete(pk)
@@ -0,0 +1,126 @@
+"""
+Модуль описывает репозиторий-обертку, сообщающую об изменениях данных
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator
+
+from bookkeeper.repository.abstract_repository import AbstractRepository, T
+from bookkeeper.repository.query import GroupBy
+
+Observer = Callable[[], None]
+
+
+class ObservedRepository(AbstractRepository[T]):
+    """
+    Обертка над любым репозиторием, сообщающая наблюдателям об изменениях.
+
+    После каждого вызова add, update, delete и их пакетных вариантов
+    (в том числе неудачного: часть изменений могла примениться) и после
+    отката транзакции вызываются все наблюдатели - функции без аргументов,
+    добавленные методом add_observer. Так кэши, построенные по данным
+    репозитория (например, отчеты ReportEngine), сбрасываются при записи.
+    Изменения в обход обертки наблюдатели не видят.
+
+    Выборки выполняются обернутым репозиторием напрямую, остальные
+    его атрибуты и методы также доступны.
+    """
+
+    def __init__(self, repository: AbstractRepository[T]) -> None:
+        self.repository = repository
+        self.observers: list[Observer] = []
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def add_observer(self, observer: Observer) -> None:
+        """Добавляет наблюдателя."""
+        self.observers.append(observer)
+
+    def remove_observer(self, observer: Observer) -> None:
+        """Убирает наблюдателя."""
+        self.observers.remove(observer)
+
+    def notify(self) -> None:
+        """Сообщает наблюдателям об изменении."""
+        for observer in list(self.observers):
+            observer()
+
+    def add(self, obj: T) -> int:
+        try:
+            return self.repository.add(obj)
+        finally:
+            self.notify()
+
+    def add_many(self, objs: Iterable[T]) -> list[int]:
+        try:
+            return self.repository.add_many(objs)
+        finally:
+            self.notify()
+
+    def get(self, pk: int) -> T | None:
+        return self.repository.get(pk)
+
+    def get_all(self, where: dict[str, Any] | None = None) -> list[T]:
+        return self.repository.get_all(where)
+
+    def iter_all(
+            self,
+            where: dict[str, Any] | None = None,
+            batch_size: int = 1000
+    ) -> Iterator[T]:
+        return self.repository.iter_all(where, batch_size)
+
+    def get_page(
+            self,
+            where: dict[str, Any] | None = None,
+            order_by: str = 'pk',
+            limit: int = 100,
+            after_key: tuple[Any, int] | None = None
+    ) -> list[T]:
+        return self.repository.get_page(where, order_by, limit, after_key)
+
+    def aggregate(
+            self,
+            func: str,
+            field: str,
+            where: dict[str, Any] | None = None,
+            group_by: GroupBy | None = None
+    ) -> Any:
+        return self.repository.aggregate(func, field, where, group_by)
+
+    def update(self, obj: T) -> None:
+        try:
+            self.repository.update(obj)
+        finally:
+            self.notify()
+
+    def update_many(self, objs: Iterable[T]) -> None:
+        try:
+            self.repository.update_many(objs)
+        finally:
+            self.notify()
+
+    def delete(self, pk: int) -> None:
+        try:
+            self.repository.delete(pk)
+        finally:
+            self.notify()
+
+    def delete_many(self, pks: Iterable[int]) -> None:
+        try:
+            self.repository.delete_many(pks)
+        finally:
+            self.notify()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        try:
+            with self.repository.transaction():
+                yield
+        except BaseException:
+            # Данные, прочитанные внутри транзакции, откатились.
+            self.notify()
+            raise
@@ -0,0 +1,216 @@
+"""
+Модуль описывает язык условий выборки из репозитория.
+
+Условие - словарь {'поле__оператор': значение}, все пары которого должны
+выполняться одновременно. Если оператор не указан, проверяется равенство.
+Поддерживаемые операторы:
+eq, ne - равно, не равно (сравнение с None проверяет отсутствие значения)
+lt, lte, gt, gte - меньше, не больше, больше, не меньше (как и в SQL,
+    сравнению с None не удовлетворяет ни одно значение)
+in - значение входит в заданную коллекцию (как и в SQL, None в коллекции
+    не соответствует отсутствующему значению)
+like - значение соответствует шаблону SQL LIKE (% - любая строка,
+    _ - любой символ; как и в SQLite, регистр не учитывается только
+    для латинских букв: 'мясо' не соответствует 'Мясо')
+isnull - значение отсутствует (True) или задано (False)
+
+Пример: {'expense_date__gte': d1, 'expense_date__lt': d2, 'category_id__in': [1, 2]}
+
+Также модуль описывает агрегирующие функции (AGGREGATES), которые,
+как и в SQL, пропускают отсутствующие значения (None):
+sum - сумма (0 для пустой выборки)
+count - количество заданных значений
+min, max, avg - минимум, максимум, среднее (None для пустой выборки)
+
+Группировка (group_by) - имя поля или кортеж имен полей. К полю с датой
+можно добавить усечение: 'поле__day', 'поле__week' (неделя начинается
+с понедельника), 'поле__month', 'поле__year'; ключом группы тогда будет
+дата начала дня, недели, месяца или года.
+Пример: group_by=('expense_date__month', 'category_id')
+"""
+
+import operator
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Iterable
+
+OPERATORS = ('eq', 'ne', 'lt', 'lte', 'gt', 'gte', 'in', 'like', 'isnull')
+
+Predicate = Callable[[Any], bool]
+
+
+def parse_condition(key: str) -> tuple[str, str]:
+    """Разделить ключ условия на имя поля и оператор."""
+    field, separator, op = key.rpartition('__')
+    if separator and op in OPERATORS:
+        return field, op
+    return key, 'eq'
+
+
+def like_to_regex(pattern: str) -> re.Pattern[str]:
+    """
+    Перевести шаблон SQL LIKE в регулярное выражение. Регистр
+    не учитывается только для латинских букв, как в SQLite.
+    """
+    regex = ''.join(
+        '.*' if char == '%' else '.' if char == '_' else re.escape(char)
+        for char in pattern
+    )
+    return re.compile(regex, re.IGNORECASE | re.ASCII | re.DOTALL)
+
+
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    'lt': operator.lt,
+    'lte': operator.le,
+    'gt': operator.gt,
+    'gte': operator.ge,
+}
+
+
+def _value_predicate(op: str, value: Any) -> Callable[[Any], bool]:
+    """Проверка значения поля для одного оператора."""
+    if op == 'eq':
+        return lambda x: bool(x == value)
+    if op == 'ne':
+        return lambda x: bool(x != value)
+    if op == 'in':
+        values = [x for x in value if x is not None]
+        return lambda x: x is not None and x in values
+    if op == 'isnull':
+        return lambda x: (x is None) == bool(value)
+    # Как и в SQL, отсутствующее значение (в поле или в условии)
+    # не сравнимо ни с чем.
+    if op == 'like':
+        regex = None if value is None else like_to_regex(value)
+        return lambda x: (x is not None and regex is not None
+                          and regex.fullmatch(str(x)) is not None)
+    compare = _COMPARISONS[op]
+    return lambda x: x is not None and value is not None and compare(x, value)
+
+
+def compile_where(where: dict[str, Any] | None) -> Predicate:
+    """
+    Построить функцию, проверяющую, удовлетворяет ли объект условию where.
+    Пустое условие (None) удовлетворяется любым объектом.
+    """
+    if not where:
+        return lambda obj: True
+
+    checks = []
+    for key, value in where.items():
+        field, op = parse_condition(key)
+        checks.append((field, _value_predicate(op, value)))
+
+    def predicate(obj: Any) -> bool:
+        return all(check(getattr(obj, field)) for field, check in checks)
+
+    return predicate
+
+
+AGGREGATES = ('sum', 'count', 'min', 'max', 'avg')
+
+TRUNCATIONS: dict[str, Callable[[date], date]] = {
+    'day': lambda day: day,
+    'week': lambda day: day - timedelta(days=day.weekday()),
+    'month': lambda day: day.replace(day=1),
+    'year': lambda day: day.replace(month=1, day=1),
+}
+
+GroupBy = str | tuple[str, ...]
+
+
+def parse_group_by(key: str) -> tuple[str, str | None]:
+    """Разделить ключ группировки на имя поля и усечение даты (или None)."""
+    field, separator, truncation = key.rpartition('__')
+    if separator and truncation in TRUNCATIONS:
+        return field, truncation
+    return key, None
+
+
+def truncate_date(value: date | datetime | None, truncation: str) -> date | None:
+    """Дата начала дня, недели, месяца или года, содержащего value."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return TRUNCATIONS[truncation](value)
+
+
+def _group_getter(key: str) -> Callable[[Any], Any]:
+    field, truncation = parse_group_by(key)
+    if truncation is None:
+        return operator.attrgetter(field)
+    return lambda obj: truncate_date(getattr(obj, field), truncation)
+
+
+def compile_group_key(group_by: GroupBy) -> Callable[[Any], Any]:
+    """
+    Построить функцию, вычисляющую ключ группы объекта: значение поля
+    для одного поля или кортеж значений для кортежа полей.
+    """
+    if isinstance(group_by, str):
+        return _group_getter(group_by)
+
+    getters = [_group_getter(key) for key in group_by]
+    return lambda obj: tuple(getter(obj) for getter in getters)
+
+
+class Accumulator:
+    """Накопитель значений одной группы для агрегирующей функции."""
+
+    def __init__(self, func: str) -> None:
+        self.func = func
+        self.count = 0
+        self.total: Any = 0
+        self.value: Any = None
+
+    def add(self, value: Any) -> None:
+        """Учесть очередное значение."""
+        if value is None:
+            return
+        self.count += 1
+        if self.func in ('sum', 'avg'):
+            self.total += value
+        elif self.func == 'min' and (self.value is None or value < self.value):
+            self.value = value
+        elif self.func == 'max' and (self.value is None or value > self.value):
+            self.value = value
+
+    def result(self) -> Any:
+        """Значение агрегирующей функции по учтенным значениям."""
+        if self.func == 'sum':
+            return self.total
+        if self.func == 'count':
+            return self.count
+        if self.func == 'avg':
+            return self.total / self.count if self.count else None
+        return self.value
+
+
+def aggregate_objects(
+        objs: Iterable[Any],
+        func: str,
+        field: str,
+        group_by: GroupBy | None = None
+) -> Any:
+    """
+    Вычислить агрегирующую функцию func по полю field объектов за один проход.
+    Если задано group_by, вернуть словарь {ключ группы: результат}.
+    """
+    if func not in AGGREGATES:
+        raise ValueError(f'Unknown aggregate function `{func}`')
+
+    if group_by is None:
+        accumulator = Accumulator(func)
+        for obj in objs:
+            accumulator.add(getattr(obj, field))
+        return accumulator.result()
+
+    group_key = compile_group_key(group_by)
+    groups: dict[Any, Accumulator] = {}
+    for obj in objs:
+        key = group_key(obj)
+        if key not in groups:
+            groups[key] = Accumulator(func)
+        groups[key].add(getattr(obj, field))
+    return {key: accumulator.result() for key, accumulator in groups.items()}
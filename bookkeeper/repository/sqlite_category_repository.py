@@ -0,0 +1,168 @@
+"""
+Модуль описывает репозиторий категорий, работающий с СУБД SQLite.
+"""
+
+from typing import Iterable
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+CLOSURE_QUERIES = {
+    'add': '''
+        INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, :pk, depth + 1 FROM category_closure
+        WHERE descendant_id = :parent_id
+        UNION ALL
+        SELECT :pk, :pk, 0
+    ''',
+    'is_descendant': '''
+        SELECT 1 FROM category_closure
+        WHERE ancestor_id = :pk AND descendant_id = :parent_id
+    ''',
+    # Отрывает поддерево :pk (включая :pk) от всех его предков (включая :pk).
+    'detach': '''
+        DELETE FROM category_closure
+        WHERE descendant_id IN (
+            SELECT descendant_id FROM category_closure WHERE ancestor_id = :pk
+        ) AND ancestor_id IN (
+            SELECT ancestor_id FROM category_closure
+            WHERE descendant_id = :pk AND ancestor_id != :pk
+        )
+    ''',
+    # Удаляет связи предков :pk (включая :pk) с его поддеревом.
+    'detach_with_self': '''
+        DELETE FROM category_closure
+        WHERE descendant_id IN (
+            SELECT descendant_id FROM category_closure WHERE ancestor_id = :pk
+        ) AND ancestor_id IN (
+            SELECT ancestor_id FROM category_closure WHERE descendant_id = :pk
+        )
+    ''',
+    'attach': '''
+        INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+        SELECT parents.ancestor_id, subtree.descendant_id,
+               parents.depth + subtree.depth + 1
+        FROM category_closure AS parents, category_closure AS subtree
+        WHERE parents.descendant_id = :parent_id AND subtree.ancestor_id = :pk
+    ''',
+}
+
+
+class SQLiteCategoryRepository(SQLiteRepository[Category]):
+    """
+    Репозиторий категорий с иерархическим индексом.
+
+    Помимо таблицы category поддерживает таблицу замыкания category_closure
+    (миграция 04_category_closure): для каждой пары "предок - потомок",
+    включая пару категории с самой собой, хранится расстояние между ними.
+    Таблица обновляется в той же транзакции, что и category, поэтому
+    предки, потомки и поддерево категории получаются одним запросом по индексу.
+    """
+
+    def __init__(
+            self,
+            db_file: str,
+            connection_manager: SQLiteConnectionManager | None = None,
+            read_only: bool = False
+    ) -> None:
+        super().__init__(db_file, Category, connection_manager, read_only=read_only)
+
+        names = ', '.join(f'category.{field}' for field in self.fields)
+        select = f'SELECT category.pk, {names} FROM category JOIN category_closure'
+        self.queries['get_ancestors'] = (
+            f'{select} ON category.pk = category_closure.ancestor_id'
+            ' WHERE category_closure.descendant_id = ? AND category_closure.depth > 0'
+            ' ORDER BY category_closure.depth'
+        )
+        self.queries['get_descendants'] = (
+            f'{select} ON category.pk = category_closure.descendant_id'
+            ' WHERE category_closure.ancestor_id = ? AND category_closure.depth > 0'
+            ' ORDER BY category_closure.depth, category.pk'
+        )
+        self.queries['get_subtree_pks'] = (
+            'SELECT descendant_id FROM category_closure WHERE ancestor_id = ?'
+        )
+
+    def add(self, obj: Category) -> int:
+        self._check_writable()
+        with self.connection_manager.transaction() as con:
+            pk = super().add(obj)
+            con.execute(CLOSURE_QUERIES['add'], {'pk': pk, 'parent_id': obj.parent_id})
+        return pk
+
+    def add_many(self, objs: Iterable[Category]) -> list[int]:
+        self._check_writable()
+        objs = list(objs)
+        with self.connection_manager.transaction() as con:
+            pks = super().add_many(objs)
+            con.executemany(
+                CLOSURE_QUERIES['add'],
+                [{'pk': obj.pk, 'parent_id': obj.parent_id} for obj in objs],
+            )
+        return pks
+
+    def update(self, obj: Category) -> None:
+        self._check_writable()
+        if getattr(obj, 'pk', None) is None:
+            raise ValueError('Try to update object without `pk` attribute')
+
+        with self.connection_manager.transaction() as con:
+            old = self.get(obj.pk)
+            if old is None:
+                raise ValueError('Try to update object with unknown primary key')
+
+            params = {'pk': obj.pk, 'parent_id': obj.parent_id}
+            moved = old.parent_id != obj.parent_id
+            if moved and obj.parent_id is not None and con.execute(
+                    CLOSURE_QUERIES['is_descendant'], params).fetchone():
+                raise ValueError('Category cannot become a subcategory of itself')
+
+            super().update(obj)
+            if moved:
+                con.execute(CLOSURE_QUERIES['detach'], params)
+                con.execute(CLOSURE_QUERIES['attach'], params)
+
+    def update_many(self, objs: Iterable[Category]) -> None:
+        self._check_writable()
+        with self.connection_manager.transaction():
+            for obj in objs:
+                self.update(obj)
+
+    def delete(self, pk: int) -> None:
+        self._check_writable()
+        with self.connection_manager.transaction() as con:
+            # Подкатегории получат parent_id = NULL (ON DELETE SET NULL),
+            # поэтому их поддеревья отрываются от предков удаляемой категории.
+            con.execute(CLOSURE_QUERIES['detach_with_self'], {'pk': pk})
+            super().delete(pk)
+
+    def delete_many(self, pks: Iterable[int]) -> None:
+        self._check_writable()
+        with self.connection_manager.transaction():
+            for pk in pks:
+                self.delete(pk)
+
+    def get_ancestors(self, pk: int) -> list[Category]:
+        """Все предки категории, начиная с родителя."""
+        rows = self.connection_manager.connection.execute(
+            self.queries['get_ancestors'], [pk]
+        )
+        return list(map(self._decoder, rows))
+
+    def get_descendants(self, pk: int) -> list[Category]:
+        """Все подкатегории разного уровня ниже данной, по уровням."""
+        rows = self.connection_manager.connection.execute(
+            self.queries['get_descendants'], [pk]
+        )
+        return list(map(self._decoder, rows))
+
+    def get_subtree_pks(self, pk: int) -> list[int]:
+        """
+        id категории и всех ее подкатегорий. Например, расходы по поддереву:
+        expense_repository.get_all({'category_id__in': repo.get_subtree_pks(pk)})
+        """
+        rows = self.connection_manager.connection.execute(
+            self.queries['get_subtree_pks'], [pk]
+        )
+        return [row[0] for row in rows]
@@ -0,0 +1,307 @@
+"""
+Модуль описывает менеджер соединений с СУБД SQLite.
+
+Менеджер держит по одному долгоживущему соединению на поток и позволяет
+нескольким репозиториям, работающим с одним файлом базы данных,
+переиспользовать эти соединения вместо открытия нового на каждый запрос.
+Менеджеры рассчитаны на долгоживущие потоки (главный поток, фоновый
+исполнитель запросов): соединение короткоживущего потока закрывается
+после его завершения.
+"""
+
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import closing, contextmanager
+from types import TracebackType
+from typing import Callable, Iterable, Iterator, Mapping
+from urllib.request import pathname2url
+
+SetupHook = Callable[[sqlite3.Connection], None]
+PragmaProfile = Mapping[str, int | str]
+
+# Наборы PRAGMA для соединений. Во всех профилях база работает в режиме WAL:
+# читатели не блокируют писателя и друг друга (режим журнала хранится в файле
+# базы, поэтому профиль только для чтения его не задает, а пользуется
+# установленным).
+PRAGMA_PROFILES: dict[str, PragmaProfile] = {
+    # Фиксация транзакции переживает отключение питания.
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+    # Последние транзакции могут потеряться при отключении питания
+    # (но не при падении приложения), база при этом не портится.
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64 * 1024,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # Соединения отчетов: только чтение, большой кэш и отображение в память.
+    'readonly-analytics': {
+        'cache_size': -256 * 1024,
+        'mmap_size': 1024 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+        'query_only': 'ON',
+    },
+}
+
+
+def enable_foreign_keys(con: sqlite3.Connection) -> None:
+    """Включает проверку внешних ключей для соединения."""
+    con.execute('PRAGMA foreign_keys = ON')
+
+
+def get_pragma_profile(profile: str | PragmaProfile) -> PragmaProfile:
+    """
+    Профиль PRAGMA по имени из PRAGMA_PROFILES или сам профиль
+    в виде словаря {'имя PRAGMA': значение}.
+    """
+    if isinstance(profile, str):
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f'Unknown PRAGMA profile `{profile}`')
+        return PRAGMA_PROFILES[profile]
+
+    for name, value in profile.items():
+        if not name.isidentifier() or not (
+                isinstance(value, int) or str(value).isidentifier()):
+            raise ValueError(f'Invalid PRAGMA `{name} = {value}`')
+    return profile
+
+
+def apply_pragmas(profile: str | PragmaProfile) -> SetupHook:
+    """Хук настройки соединения, выполняющий PRAGMA профиля по порядку."""
+    pragmas = get_pragma_profile(profile)
+
+    def hook(con: sqlite3.Connection) -> None:
+        for name, value in pragmas.items():
+            con.execute(f'PRAGMA {name} = {value}')
+
+    return hook
+
+
+def create_snapshot(db_file: str, snapshot_file: str) -> None:
+    """
+    Копирует базу db_file в snapshot_file средствами онлайн-резервного
+    копирования SQLite: копия согласована, даже если в базу в это время
+    пишут, а писатель блокируется только на время копирования страниц.
+    Копия сохраняется в режиме журнала отката, одним файлом.
+    """
+    with closing(sqlite3.connect(db_file)) as source, \
+            closing(sqlite3.connect(snapshot_file)) as target:
+        source.backup(target)
+        target.execute('PRAGMA journal_mode = DELETE')
+
+
+class _ThreadConnection:  # pylint: disable=too-few-public-methods
+    """Соединение потока и поколение менеджера, в котором оно открыто."""
+
+    def __init__(self, connection: sqlite3.Connection, generation: int) -> None:
+        self.connection = connection
+        self.generation = generation
+
+
+def _release(
+        lock: threading.Lock,
+        connections: list[sqlite3.Connection],
+        con: sqlite3.Connection
+) -> None:
+    """Закрывает соединение и убирает его из списка открытых соединений."""
+    with lock:
+        if con in connections:
+            connections.remove(con)
+    con.close()
+
+
+class SQLiteConnectionManager:  # pylint: disable=too-many-instance-attributes
+    """
+    Менеджер соединений с СУБД SQLite.
+    Для каждого потока лениво открывается одно соединение, которое живет
+    до вызова close или до завершения потока. Сразу после открытия
+    соединения однократно выполняются хуки настройки (PRAGMA и т.п.).
+
+    Соединения работают в режиме autocommit (isolation_level=None):
+    каждый запрос вне явной транзакции фиксируется сразу.
+
+    profile - профиль PRAGMA (имя из PRAGMA_PROFILES или словарь), который
+    применяется к каждому соединению раньше остальных хуков; по умолчанию
+    используются настройки SQLite.
+
+    read_only - открывать базу только для чтения (URI file:...?mode=ro):
+    такие соединения не берут блокировку на запись, поэтому отчеты
+    в отдельных процессах не мешают приложению, а запись в базу
+    завершается ошибкой sqlite3.OperationalError.
+    """
+
+    def __init__(
+            self,
+            db_file: str,
+            setup_hooks: Iterable[SetupHook] | None = None,
+            profile: str | PragmaProfile | None = None,
+            read_only: bool = False
+    ) -> None:
+        self.db_file = db_file
+        self.profile = profile
+        self.read_only = read_only
+        self.setup_hooks: list[SetupHook] = [enable_foreign_keys]
+        if profile is not None:
+            self.setup_hooks.append(apply_pragmas(profile))
+        if setup_hooks is not None:
+            self.setup_hooks.extend(setup_hooks)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        # Увеличивается при close, чтобы потоки переоткрыли свои соединения.
+        self._generation = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открывает и настраивает новое соединение."""
+        if self.read_only:
+            con = sqlite3.connect(
+                f'file:{pathname2url(os.path.abspath(self.db_file))}?mode=ro',
+                isolation_level=None,
+                check_same_thread=False,
+                uri=True,
+            )
+        else:
+            con = sqlite3.connect(
+                self.db_file,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+        for hook in self.setup_hooks:
+            hook(con)
+
+        with self._lock:
+            self._connections.append(con)
+
+        return con
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Соединение текущего потока (открывается при первом обращении)."""
+        local: _ThreadConnection | None = getattr(self._local, 'connection', None)
+        if local is None or local.generation != self._generation:
+            con = self._connect()
+            local = _ThreadConnection(con, self._generation)
+            # Данные потока удаляются при его завершении, вместе с ними
+            # закрывается и соединение. Финализатор не ссылается на менеджер,
+            # чтобы не продлевать его жизнь.
+            weakref.finalize(local, _release, self._lock, self._connections, con)
+            self._local.connection = local
+
+        return local.connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Выполняет блок в одной транзакции соединения текущего потока.
+        Все репозитории, использующие этот менеджер, пишут в эту же транзакцию,
+        фиксация выполняется одна - при выходе из внешнего блока.
+        Вложенный вызов открывает точку сохранения (SAVEPOINT): при ошибке
+        откатываются только изменения вложенного блока.
+        Для базы только для чтения транзакция дает согласованный снимок
+        данных для нескольких запросов.
+        """
+        con = self.connection
+        if not con.in_transaction:
+            con.execute('BEGIN' if self.read_only else 'BEGIN IMMEDIATE')
+            try:
+                yield con
+                # Неудачная фиксация тоже откатывается, иначе соединение
+                # осталось бы в незавершенной транзакции.
+                con.commit()
+            except BaseException:
+                con.rollback()
+                raise
+            return
+
+        depth: int = getattr(self._local, 'savepoint_depth', 0) + 1
+        self._local.savepoint_depth = depth
+        savepoint = f'bookkeeper_sp_{depth}'
+        con.execute(f'SAVEPOINT {savepoint}')
+        try:
+            yield con
+        except BaseException:
+            con.execute(f'ROLLBACK TO {savepoint}')
+            con.execute(f'RELEASE {savepoint}')
+            raise
+        else:
+            con.execute(f'RELEASE {savepoint}')
+        finally:
+            self._local.savepoint_depth = depth - 1
+
+    def close(self) -> None:
+        """
+        Закрывает все открытые соединения.
+        При следующем обращении к connection соединение будет открыто заново.
+        """
+        with self._lock:
+            connections = self._connections[:]
+            self._connections.clear()
+            self._generation += 1
+
+        for con in connections:
+            con.close()
+
+    def __enter__(self) -> 'SQLiteConnectionManager':
+        return self
+
+    def __exit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None
+    ) -> None:
+        self.close()
+
+
+_managers: dict[tuple[str, bool], SQLiteConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(
+        db_file: str,
+        profile: str | PragmaProfile | None = None,
+        read_only: bool = False
+) -> SQLiteConnectionManager:
+    """
+    Возвращает общий менеджер соединений для файла базы данных.
+    Репозитории, созданные для одного и того же файла, получают один менеджер
+    (отдельный для доступа только на чтение).
+    Профиль PRAGMA задается при создании менеджера; запрос того же файла
+    с другим профилем - ошибка.
+    """
+    key = os.path.abspath(db_file), read_only
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = SQLiteConnectionManager(
+                db_file, profile=profile, read_only=read_only
+            )
+        manager = _managers[key]
+    if profile is not None and manager.profile != profile:
+        raise ValueError(
+            f'Connection manager for `{db_file}` uses another PRAGMA profile'
+        )
+    return manager
+
+
+def close_connection_managers(db_file: str | None = None) -> None:
+    """
+    Закрывает общие менеджеры соединений для файла базы данных
+    (по умолчанию - для всех файлов) и убирает их из реестра:
+    следующий get_connection_manager создаст новый менеджер.
+    """
+    path = None if db_file is None else os.path.abspath(db_file)
+    with _managers_lock:
+        keys = [key for key in _managers if path is None or key[0] == path]
+        managers = [_managers.pop(key) for key in keys]
+    for manager in managers:
+        manager.close()
@@ -2,24 +2,107 @@
 Модуль описывает репозиторий, работающий с СУБД SQLite.
 """
 
-import sqlite3
-from typing import Any
+from contextlib import contextmanager
+from functools import partial
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Iterable, Iterator
 from inspect import get_annotations
 from datetime import datetime, date
 
 
-from bookkeeper.repository.abstract_repository import AbstractRepository, T
+from bookkeeper.repository.abstract_repository import (
+    AbstractRepository, T, parse_order_by
+)
+from bookkeeper.repository.query import (
+    AGGREGATES, GroupBy, parse_condition, parse_group_by
+)
+from bookkeeper.repository.sqlite_connection import (
+    PragmaProfile, SQLiteConnectionManager, get_connection_manager
+)
+
+SQL_OPERATORS = {
+    'eq': '=',
+    'lt': '<',
+    'lte': '<=',
+    'gt': '>',
+    'gte': '>=',
+    'like': 'LIKE',
+}
+
+# Усечение даты при группировке (см. bookkeeper.repository.query).
+SQL_TRUNCATIONS = {
+    'day': 'date({})',
+    'week': "date({}, 'weekday 0', '-6 days')",
+    'month': "date({}, 'start of month')",
+    'year': "date({}, 'start of year')",
+}
+
+# Преобразования значений из формата СУБД в тип поля модели.
+CONVERTERS: dict[Any, Callable[[Any], Any]] = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+}
+
+
+def _after_condition(
+        field: str,
+        descending: bool,
+        after_key: tuple[Any, int]
+) -> tuple[str, list[Any]]:
+    """
+    Условие get_page на записи после ключа after_key и его параметры.
+    NULL меньше любого значения: при сортировке по возрастанию такие
+    записи идут первыми, по убыванию - последними.
+    """
+    value, pk = after_key
+    sign = '<' if descending else '>'
+    if field == 'pk':
+        return f'pk {sign} ?', [pk]
+    if value is None:
+        if descending:
+            return f'({field} IS NULL AND pk < ?)', [pk]
+        return f'({field} IS NOT NULL OR pk > ?)', [pk]
+    null_tail = f' OR {field} IS NULL' if descending else ''
+    return (
+        f'({field} {sign} ? OR ({field} = ? AND pk {sign} ?){null_tail})',
+        [value, value, pk],
+    )
+
+
+def _decode_date(value: str | None) -> date | None:
+    """Переводит дату, усеченную в SQL, в объект date."""
+    return None if value is None else date.fromisoformat(value)
 
 
 class SQLiteRepository(AbstractRepository[T]):
-    """Основной репозиторий для работы с СУБД SQLite."""
-
-    def __init__(self, db_file: str, cls: type) -> None:
+    """
+    Основной репозиторий для работы с СУБД SQLite.
+    Соединения берутся из менеджера соединений: если он не передан явно,
+    используется общий менеджер для файла db_file с профилем PRAGMA profile
+    (см. sqlite_connection.PRAGMA_PROFILES).
+
+    Репозиторий над менеджером только для чтения (read_only=True) подходит
+    для отчетов в отдельных процессах: методы изменения выбрасывают
+    PermissionError, не обращаясь к базе.
+    """
+
+    def __init__(
+            self,
+            db_file: str,
+            cls: type,
+            connection_manager: SQLiteConnectionManager | None = None,
+            profile: str | PragmaProfile | None = None,
+            read_only: bool = False
+    ) -> None:
         self.db_file = db_file
+        if connection_manager is None:
+            connection_manager = get_connection_manager(db_file, profile, read_only)
+        self.connection_manager = connection_manager
         self.table_name = cls.__name__.lower()
         self.fields = get_annotations(cls, eval_str=True)
         self.fields.pop('pk')
         self.cls = cls
+        self._decoder = self._compile_decoder()
 
         # queries help
         names = ', '.join(self.fields.keys())
@@ -27,7 +110,6 @@ class SQLiteRepository(AbstractRepository[T]):
         fields_update = ", ".join([f"{field}=?" for field in self.fields.keys()])
 
         self.queries = {
-            'foreign_keys': 'PRAGMA foreign_keys = ON',
             'add': f'INSERT INTO {self.table_name} ({names}) VALUES ({placeholders})',
             'get': f'SELECT pk, {names} FROM {self.table_name} WHERE pk = ?',
             'get_all': f'SELECT pk, {names}  FROM {self.table_name}',
@@ -35,95 +117,329 @@ class SQLiteRepository(AbstractRepository[T]):
             'delete': f'DELETE FROM {self.table_name} WHERE pk = ?',
         }
 
-    def _row2obj(self, row: tuple[Any]) -> T:
-        """Just a soul cry: dynamic typing is shit"""
-        class_arguments = {}
-
-        # Компановка аргументов класса (+ обработка формата datetime, date)
-        for field_value, field_name in zip(row[1:], self.fields.keys()):    # type: ignore
-            if self.fields[field_name] == datetime:
-                field_value = datetime.fromisoformat(field_value)
-
-            if self.fields[field_name] == date:
-                field_value = date.fromisoformat(field_value)
-
-            class_arguments[field_name] = field_value
-
-        obj = self.cls(**class_arguments)
-        obj.pk = row[0]
-
-        return obj  # type: ignore
+    def _compile_decoder(self) -> Callable[[tuple[Any, ...]], T]:
+        """
+        Собирает функцию, создающую объект модели из строки таблицы
+        (pk, поля...). Преобразования полей вычисляются один раз, а для
+        dataclass с полем pk в конце поля передаются в конструктор позиционно.
+        """
+        cls = self.cls
+        names = tuple(self.fields)
+        converters = tuple(
+            (idx, CONVERTERS[field_type])
+            for idx, field_type in enumerate(self.fields.values())
+            if field_type in CONVERTERS
+        )
+        positional = is_dataclass(cls) and \
+            tuple(f.name for f in fields(cls) if f.init) == names + ('pk',)
+
+        def decode_positional(row: tuple[Any, ...]) -> T:
+            values = list(row[1:])
+            for idx, convert in converters:
+                values[idx] = convert(values[idx])
+
+            obj = cls(*values)
+            obj.pk = row[0]
+            return obj  # type: ignore[no-any-return]
+
+        def decode_keywords(row: tuple[Any, ...]) -> T:
+            values = list(row[1:])
+            for idx, convert in converters:
+                values[idx] = convert(values[idx])
+
+            obj = cls(**dict(zip(names, values)))
+            obj.pk = row[0]
+            return obj  # type: ignore[no-any-return]
+
+        return decode_positional if positional else decode_keywords
+
+    @property
+    def read_only(self) -> bool:
+        """Открыта ли база только для чтения."""
+        return self.connection_manager.read_only
+
+    def _check_writable(self) -> None:
+        """Запрещает изменения в репозитории только для чтения."""
+        if self.read_only:
+            raise PermissionError(f'Repository `{self.table_name}` is read-only')
+
+    def _row2obj(self, row: tuple[Any, ...]) -> T:
+        """Создает объект модели из строки таблицы (pk, поля...)."""
+        return self._decoder(row)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Транзакция менеджера соединений: общая для всех репозиториев,
+        созданных с тем же менеджером.
+        """
+        with self.connection_manager.transaction():
+            yield
 
     def add(self, obj: T) -> int:
+        self._check_writable()
         if getattr(obj, 'pk', None) != 0:
             raise ValueError(f'Try to add object {obj} with filled `pk` attribute')
 
         values = [getattr(obj, x) for x in self.fields]
 
-        with sqlite3.connect(self.db_file) as con:
-            cur = con.cursor()
-            cur.execute(self.queries['foreign_keys'])
-            cur.execute(self.queries['add'], values)
+        cur = self.connection_manager.connection.execute(self.queries['add'], values)
+        if cur.lastrowid is not None:
+            obj.pk = cur.lastrowid
 
-            if cur.lastrowid is not None:
-                obj.pk = cur.lastrowid
+        return obj.pk
 
-        con.close()
+    def add_many(self, objs: Iterable[T]) -> list[int]:
+        self._check_writable()
+        objs = list(objs)
+        for obj in objs:
+            if getattr(obj, 'pk', None) != 0:
+                raise ValueError(f'Try to add object {obj} with filled `pk` attribute')
+        if not objs:
+            return []
 
-        return obj.pk
+        values = [[getattr(obj, x) for x in self.fields] for obj in objs]
 
-    def get(self, pk: int) -> T | None:
-        with sqlite3.connect(self.db_file) as con:
-            cur = con.cursor()
-            row = cur.execute(self.queries['get'], [pk]).fetchone()
+        with self.connection_manager.transaction() as con:
+            con.executemany(self.queries['add'], values)
+            # Пока транзакция держит блокировку на запись, строки получают
+            # идущие подряд id, последний из которых - last_insert_rowid.
+            last_pk = con.execute('SELECT last_insert_rowid()').fetchone()[0]
+
+        first_pk = last_pk - len(objs) + 1
+        for pk, obj in enumerate(objs, start=first_pk):
+            obj.pk = pk
+
+        return [obj.pk for obj in objs]
 
-        con.close()
+    def get(self, pk: int) -> T | None:
+        cur = self.connection_manager.connection.execute(self.queries['get'], [pk])
+        row = cur.fetchone()
 
         if row is None:
             return None
 
         return self._row2obj(row)
 
-    def get_all(self, where: dict[str, Any] | None = None) -> list[T]:
-        with sqlite3.connect(self.db_file) as con:
-            cur = con.cursor()
-            base = self.queries['get_all']
-
-            if where is not None:
-                conditions = " AND ".join([f"{field} = ?" for field in where.keys()])
-                rows = cur.execute(
-                    base + f' WHERE {conditions}',
-                    list(where.values())
-                ).fetchall()
+    def _check_field(self, field: str) -> None:
+        """Проверяет, что поле есть в таблице (имена полей попадают в SQL)."""
+        if field != 'pk' and field not in self.fields:
+            raise ValueError(f'Unknown field `{field}`')
+
+    def _conditions(self, where: dict[str, Any] | None) -> tuple[list[str], list[Any]]:
+        """
+        Переводит условие where (см. bookkeeper.repository.query)
+        в список SQL условий и их параметры.
+        """
+        conditions: list[str] = []
+        params: list[Any] = []
+        if where is None:
+            return conditions, params
+
+        for key, value in where.items():
+            field, op = parse_condition(key)
+            self._check_field(field)
+
+            if op == 'isnull':
+                conditions.append(f'{field} IS {"" if value else "NOT "}NULL')
+            elif op in ('eq', 'ne') and value is None:
+                conditions.append(f'{field} IS {"" if op == "eq" else "NOT "}NULL')
+            elif op == 'ne':
+                conditions.append(f'{field} IS NOT ?')
+                params.append(value)
+            elif op == 'in':
+                values = list(value)
+                placeholders = ', '.join('?' * len(values))
+                conditions.append(f'{field} IN ({placeholders})')
+                params.extend(values)
+            else:
+                conditions.append(f'{field} {SQL_OPERATORS[op]} ?')
+                params.append(value)
+
+        return conditions, params
+
+    def _select(self, conditions: list[str], columns: str | None = None) -> str:
+        """
+        Собирает запрос выборки по списку SQL условий.
+        columns - выражение вместо списка всех полей таблицы.
+        """
+        if columns is None:
+            query = self.queries['get_all']
+        else:
+            query = f'SELECT {columns} FROM {self.table_name}'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return query
+
+    def _decode(self, field: str, value: Any) -> Any:
+        """Переводит значение поля из формата СУБД в тип поля модели."""
+        convert = CONVERTERS.get(self.fields.get(field))
+        if value is None or convert is None:
+            return value
+        return convert(value)
+
+    def _group_columns(
+            self,
+            group_by: GroupBy
+    ) -> tuple[str, Callable[[tuple[Any, ...]], Any]]:
+        """
+        Переводит группировку в список SQL выражений и функцию, собирающую
+        ключ группы из первых столбцов строки результата.
+        """
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        expressions = []
+        decoders: list[Callable[[Any], Any]] = []
+        for key in keys:
+            field, truncation = parse_group_by(key)
+            self._check_field(field)
+            if truncation is None:
+                expressions.append(field)
+                decoders.append(partial(self._decode, field))
             else:
-                rows = cur.execute(base).fetchall()
+                expressions.append(SQL_TRUNCATIONS[truncation].format(field))
+                decoders.append(_decode_date)
 
-        con.close()
+        if isinstance(group_by, str):
+            decode = decoders[0]
+            return expressions[0], lambda row: decode(row[0])
+        return ', '.join(expressions), lambda row: tuple(
+            decode(value) for decode, value in zip(decoders, row)
+        )
 
-        return [self._row2obj(row) for row in rows]
+    def get_all(self, where: dict[str, Any] | None = None) -> list[T]:
+        conditions, params = self._conditions(where)
+        rows = self.connection_manager.connection.execute(
+            self._select(conditions), params
+        ).fetchall()
+
+        return list(map(self._decoder, rows))
+
+    def get_raw_rows(
+            self,
+            columns: Iterable[str],
+            where: dict[str, Any] | None = None
+    ) -> list[tuple[Any, ...]]:
+        """
+        Значения полей columns в формате СУБД, без создания объектов модели
+        (например, для построения столбцов данных в bookkeeper.analytics).
+        """
+        columns = list(columns)
+        for field in columns:
+            self._check_field(field)
+
+        conditions, params = self._conditions(where)
+        return self.connection_manager.connection.execute(
+            self._select(conditions, ', '.join(columns)), params
+        ).fetchall()
+
+    def iter_all(
+            self,
+            where: dict[str, Any] | None = None,
+            batch_size: int = 1000
+    ) -> Iterator[T]:
+        conditions, params = self._conditions(where)
+        cur = self.connection_manager.connection.execute(
+            self._select(conditions), params
+        )
+        try:
+            while rows := cur.fetchmany(batch_size):
+                yield from map(self._decoder, rows)
+        finally:
+            cur.close()
+
+    def get_page(
+            self,
+            where: dict[str, Any] | None = None,
+            order_by: str = 'pk',
+            limit: int = 100,
+            after_key: tuple[Any, int] | None = None
+    ) -> list[T]:
+        field, descending = parse_order_by(order_by)
+        self._check_field(field)
+
+        conditions, params = self._conditions(where)
+        if after_key is not None:
+            condition, after_params = _after_condition(field, descending, after_key)
+            conditions.append(condition)
+            params.extend(after_params)
+
+        direction = 'DESC' if descending else 'ASC'
+        query = self._select(conditions) \
+            + f' ORDER BY {field} {direction}, pk {direction} LIMIT ?'
+        params.append(limit)
+        rows = self.connection_manager.connection.execute(query, params).fetchall()
+
+        return list(map(self._decoder, rows))
+
+    def aggregate(
+            self,
+            func: str,
+            field: str,
+            where: dict[str, Any] | None = None,
+            group_by: GroupBy | None = None
+    ) -> Any:
+        if func not in AGGREGATES:
+            raise ValueError(f'Unknown aggregate function `{func}`')
+        self._check_field(field)
+
+        expression = f'{func.upper()}({field})'
+        if func == 'sum':
+            expression = f'COALESCE({expression}, 0)'
+
+        def decode(value: Any) -> Any:
+            return self._decode(field, value) if func in ('min', 'max') else value
+
+        conditions, params = self._conditions(where)
+        con = self.connection_manager.connection
+
+        if group_by is None:
+            row = con.execute(self._select(conditions, expression), params).fetchone()
+            return decode(row[0])
+
+        columns, group_key = self._group_columns(group_by)
+        query = self._select(conditions, f'{columns}, {expression}') \
+            + f' GROUP BY {columns}'
+        return {
+            group_key(row): decode(row[-1])
+            for row in con.execute(query, params)
+        }
 
     def update(self, obj: T) -> None:
+        self._check_writable()
         if getattr(obj, 'pk', None) is None:
             raise ValueError('Try to update object without `pk` attribute')
 
         values = [getattr(obj, x) for x in self.fields]
         values.append(obj.pk)
 
-        with sqlite3.connect(self.db_file) as con:
-            cur = con.cursor()
-            cur.execute(self.queries['foreign_keys'])
-            cur.execute(self.queries['update'], values)
-            if cur.rowcount == 0:
-                raise ValueError('Try to update object with unknown primary key')
+        cur = self.connection_manager.connection.execute(self.queries['update'], values)
+        if cur.rowcount == 0:
+            raise ValueError('Try to update object with unknown primary key')
 
-        con.close()
+    def update_many(self, objs: Iterable[T]) -> None:
+        self._check_writable()
+        objs = list(objs)
+        if any(getattr(obj, 'pk', None) is None for obj in objs):
+            raise ValueError('Try to update object without `pk` attribute')
+
+        values = [[getattr(obj, x) for x in self.fields] + [obj.pk] for obj in objs]
+
+        with self.connection_manager.transaction() as con:
+            cur = con.executemany(self.queries['update'], values)
+            if cur.rowcount != len(values):
+                raise ValueError('Try to update object with unknown primary key')
 
     def delete(self, pk: int) -> None:
-        with sqlite3.connect(self.db_file) as con:
-            cur = con.cursor()
-            cur.execute(self.queries['foreign_keys'])
-            cur.execute(self.queries['delete'], [pk])
-            if cur.rowcount == 0:
+        self._check_writable()
+        cur = self.connection_manager.connection.execute(self.queries['delete'], [pk])
+        if cur.rowcount == 0:
+            raise ValueError('Try to delete object with unknown primary key')
+
+    def delete_many(self, pks: Iterable[int]) -> None:
+        self._check_writable()
+        values = [[pk] for pk in pks]
+
+        with self.connection_manager.transaction() as con:
+            cur = con.executemany(self.queries['delete'], values)
+            if cur.rowcount != len(values):
                 raise ValueError('Try to delete object with unknown primary key')
-
-        con.close()
@@ -5,14 +5,19 @@
 Модуль общих виджетов.
 """
 
-from typing import Callable
+from typing import Any, Callable
 from PySide6.QtWidgets import (
     QComboBox, QHBoxLayout, QFrame, QLabel, QGridLayout,
     QAbstractItemView, QWidget, QVBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QTreeView
+    QTableWidget, QTableWidgetItem, QHeaderView, QTreeView, QTableView
+)
+from PySide6.QtCore import (
+    QAbstractTableModel, QModelIndex, QPersistentModelIndex, Qt
 )
 from PySide6.QtGui import QStandardItemModel
 
+ModelIndex = QModelIndex | QPersistentModelIndex
+
 
 class CategoryDropdown(QComboBox):
     """Дропдаун категорий."""
@@ -22,6 +27,22 @@ class CategoryDropdown(QComboBox):
         for category in categories:
             self.addItem(category[1], category[0])
 
+    def add_category(self, category: list[str]) -> None:
+        """Добавляет категорию [pk, имя, ...] в конец дропдауна."""
+        self.addItem(category[1], category[0])
+
+    def update_category(self, category: list[str]) -> None:
+        """Обновляет имя категории [pk, имя, ...]."""
+        idx = self.findData(category[0])
+        if idx >= 0:
+            self.setItemText(idx, category[1])
+
+    def remove_category(self, pk: str) -> None:
+        """Удаляет категорию из дропдауна."""
+        idx = self.findData(pk)
+        if idx >= 0:
+            self.removeItem(idx)
+
     def get_selected_category_id(self) -> int:
         """Отдает id (pk) категории, выбранной в дропдауне."""
         return int(self.itemData(self.currentIndex()))
@@ -138,11 +159,169 @@ class Table(QTableWidget):  # pylint: disable=too-few-public-methods
         """Заполняет таблицу."""
         self.setRowCount(len(data))
         for row_idx, row in enumerate(data):
-            for column_idx, datum in enumerate(row):
-                self.setItem(
-                    row_idx, column_idx,
-                    QTableWidgetItem(datum)
-                )
+            self.update_row(row_idx, row)
+
+    def insert_row(self, row_idx: int, row: list[str]) -> None:
+        """Вставляет строку."""
+        self.insertRow(row_idx)
+        self.update_row(row_idx, row)
+
+    def update_row(self, row_idx: int, row: list[str]) -> None:
+        """Заменяет содержимое строки."""
+        for column_idx, datum in enumerate(row):
+            self.setItem(
+                row_idx, column_idx,
+                QTableWidgetItem(datum)
+            )
+
+    def remove_row(self, row_idx: int) -> None:
+        """Удаляет строку."""
+        self.removeRow(row_idx)
+
+
+class LazyTableModel(QAbstractTableModel):
+    """
+    Модель таблицы, подгружающая строки страницами по мере прокрутки.
+
+    Следующие limit строк запрашиваются функцией request_rows(limit),
+    а ответ (возможно, из другого потока) передается в append_rows:
+    меньше limit строк означает, что строки закончились. Пока ответ
+    не получен, новые страницы не запрашиваются.
+    Изменения отдельных строк (insert_row, update_row, remove_row)
+    сообщаются представлению точечными сигналами модели.
+    """
+
+    def __init__(
+            self,
+            headers: list[str],
+            page_size: int = 200,
+            parent: QWidget | None = None
+    ) -> None:
+        super().__init__(parent)
+        self.headers = headers
+        self.page_size = page_size
+        self.rows: list[list[str]] = []
+        self.request_rows: Callable[[int], None] | None = None
+        self.has_more = False
+        self.loading = False
+
+    def rowCount(self, parent: ModelIndex = QModelIndex()) -> int:
+        """Число загруженных строк."""
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent: ModelIndex = QModelIndex()) -> int:
+        """Число столбцов."""
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index: ModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        """Значение ячейки."""
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return self.rows[index.row()][index.column()]
+
+    def headerData(
+            self,
+            section: int,
+            orientation: Qt.Orientation,
+            role: int = Qt.ItemDataRole.DisplayRole
+    ) -> Any:
+        """Заголовки столбцов и номера строк."""
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return section + 1
+
+    def canFetchMore(self, parent: ModelIndex) -> bool:
+        """Есть ли еще не загруженные строки."""
+        return not parent.isValid() and self.has_more and not self.loading
+
+    def fetchMore(self, parent: ModelIndex) -> None:
+        """Запрашивает следующую страницу строк."""
+        if parent.isValid() or self.request_rows is None or self.loading:
+            return
+
+        self.loading = True
+        self.request_rows(self.page_size)
+
+    def append_rows(self, rows: list[list[str]]) -> None:
+        """Добавляет в конец запрошенную страницу строк."""
+        self.loading = False
+        self.has_more = len(rows) == self.page_size
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def reset(self, request_rows: Callable[[int], None] | None) -> None:
+        """
+        Сбрасывает загруженные строки, задает новый источник строк
+        и запрашивает первую страницу.
+        """
+        self.beginResetModel()
+        self.rows = []
+        self.request_rows = request_rows
+        self.has_more = request_rows is not None
+        self.loading = False
+        self.endResetModel()
+        # Представление само запрашивает следующие страницы, пока строки
+        # не заполнят его по высоте, и при прокрутке к концу таблицы.
+        self.fetchMore(QModelIndex())
+
+    def insert_row(self, row_idx: int, row: list[str]) -> None:
+        """Вставляет строку."""
+        self.beginInsertRows(QModelIndex(), row_idx, row_idx)
+        self.rows.insert(row_idx, row)
+        self.endInsertRows()
+
+    def update_row(self, row_idx: int, row: list[str]) -> None:
+        """Заменяет строку."""
+        self.rows[row_idx] = row
+        self.dataChanged.emit(
+            self.index(row_idx, 0), self.index(row_idx, len(self.headers) - 1)
+        )
+
+    def remove_row(self, row_idx: int) -> None:
+        """Удаляет строку."""
+        self.beginRemoveRows(QModelIndex(), row_idx, row_idx)
+        del self.rows[row_idx]
+        self.endRemoveRows()
+
+
+class LazyTable(QTableView):
+    """Виджет таблицы над LazyTableModel."""
+
+    def __init__(
+            self,
+            headers: list[str],
+            header_resize_modes: list[QHeaderView.ResizeMode],
+            parent: QWidget | None = None
+    ) -> None:
+        super().__init__(parent)
+
+        self.table_model = LazyTableModel(headers, parent=self)
+        self.setModel(self.table_model)
+
+        header = self.horizontalHeader()
+        for idx, header_resize_mode in enumerate(header_resize_modes):
+            header.setSectionResizeMode(
+                idx, header_resize_mode
+            )
+
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+
+    def currentRow(self) -> int:  # pylint: disable=invalid-name
+        """Номер текущей строки или -1 (как у QTableWidget)."""
+        return self.currentIndex().row()
+
+    def row(self, row_idx: int) -> list[str]:
+        """Данные загруженной строки."""
+        return self.table_model.rows[row_idx]
 
 
 class Tree(QTreeView):  # pylint: disable=too-few-public-methods
@@ -210,7 +389,7 @@ class FrameTreeViewWithControls(FrameViewWithControls):
 
 class FrameTableViewWithControls(FrameViewWithControls):
     """Виджет отображение дерева, обрамленный рамкой."""
-    table: Table
+    table: QTableView
 
     def set_layout(self, name: str) -> None:
         """Устанавливает макет."""
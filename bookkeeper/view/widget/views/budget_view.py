@@ -23,6 +23,7 @@ HEADERS = ["Период", "Бюджет", "Расходы"]
 class BudgetView(FrameTableViewWithControls):
     """Отображение бюджета."""
     budgets: list[list[str]]
+    table: Table
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
@@ -57,10 +58,31 @@ class BudgetView(FrameTableViewWithControls):
         self.table.set_data(budgets)
 
         for row_id in range(self.table.rowCount()):
-            budget = float(self.table.item(row_id, 1).text())
-            general_expense = float(self.table.item(row_id, 2).text())
-            if general_expense > budget:
-                self.table.item(row_id, 2).setBackground(QColor(50, 0, 0))
+            self.highlight_row(row_id)
+
+    def highlight_row(self, row_id: int) -> None:
+        """Выделяет траты, превысившие бюджет."""
+        budget = float(self.table.item(row_id, 1).text())
+        general_expense = float(self.table.item(row_id, 2).text())
+        if general_expense > budget:
+            self.table.item(row_id, 2).setBackground(QColor(50, 0, 0))
+
+    def insert_budget(self, row_id: int, budget: list[str]) -> None:
+        """Вставляет строку бюджета."""
+        self.budgets.insert(row_id, budget)
+        self.table.insert_row(row_id, budget)
+        self.highlight_row(row_id)
+
+    def update_budget(self, row_id: int, budget: list[str]) -> None:
+        """Заменяет строку бюджета."""
+        self.budgets[row_id] = budget
+        self.table.update_row(row_id, budget)
+        self.highlight_row(row_id)
+
+    def remove_budget(self, row_id: int) -> None:
+        """Удаляет строку бюджета."""
+        del self.budgets[row_id]
+        self.table.remove_row(row_id)
 
     # Actions
 
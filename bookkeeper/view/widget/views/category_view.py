@@ -5,9 +5,8 @@
 Модуль отображения категорий.
 """
 
-from collections import deque
 from PySide6.QtWidgets import (
-    QLabel, QWidget, QGridLayout, QLineEdit, QHBoxLayout
+    QLabel, QWidget, QGridLayout, QLineEdit, QHBoxLayout, QHeaderView
 )
 from PySide6.QtGui import QStandardItem
 from bookkeeper.view.widget.common import (
@@ -18,6 +17,8 @@ from bookkeeper.models.category import Category
 
 class CategoryView(FrameTreeViewWithControls):
     """Отображение категорий."""
+    tree: 'CategoryTree'
+
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
 
@@ -47,6 +48,38 @@ class CategoryView(FrameTreeViewWithControls):
         self.update_content.parent_dropdown.set_data(categories)
         self.delete_content.dropdown.set_data(categories)
 
+    def dropdowns(self) -> list[CategoryDropdown]:
+        """Дропдауны категорий в окнах редактирования."""
+        return [
+            self.add_content.dropdown,
+            self.update_content.dropdown_to_edit,
+            self.update_content.parent_dropdown,
+            self.delete_content.dropdown,
+        ]
+
+    def insert_category(self, category: list[str]) -> None:
+        """Добавляет строку категории."""
+        self.tree.insert_row(category)
+        for dropdown in self.dropdowns():
+            dropdown.add_category(category)
+
+    def update_category(self, category: list[str]) -> None:
+        """Заменяет строку категории (в том числе при смене родителя)."""
+        self.tree.update_row(category)
+        for dropdown in self.dropdowns():
+            dropdown.update_category(category)
+
+    def update_totals(self, categories: list[list[str]]) -> None:
+        """Обновляет траты в строках категорий."""
+        for category in categories:
+            self.tree.update_row(category)
+
+    def remove_category(self, pk: str) -> None:
+        """Удаляет категорию, ее подкатегории становятся верхнего уровня."""
+        self.tree.remove_row(pk)
+        for dropdown in self.dropdowns():
+            dropdown.remove_category(pk)
+
     # Actions
     def on_add_button_clicked(self) -> None:
         """Обработка нажатия кнопки добавления."""
@@ -61,34 +94,75 @@ class CategoryView(FrameTreeViewWithControls):
         self.edit_windows.delete.show()
 
 
-class CategoryTree(Tree):   # pylint: disable=too-few-public-methods
-    """Иерархическая таблица категорий."""
+class CategoryTree(Tree):
+    """Иерархическая таблица категорий с тратами за текущий месяц."""
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        # Элементы первой колонки по pk категории.
+        self.items: dict[str, QStandardItem] = {}
+        self.item_model.setHorizontalHeaderLabels(
+            ['Иерархия', 'Траты за месяц', 'С подкатегориями']
+        )
+        self.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.header().setStretchLastSection(False)
+
     def set_data(self, data: list[list[str]]) -> None:
-        """Устанавливает данные для древовидной структуры."""
+        """
+        Устанавливает данные для древовидной структуры.
+        Строки [pk, имя, pk родителя, траты, траты с подкатегориями] должны
+        идти так, чтобы родитель был раньше подкатегорий
+        (см. formatter.format_category_data).
+        """
         self.item_model.setRowCount(0)
-        root = self.item_model.invisibleRootItem()
-        seen: dict[str, QStandardItem] = {}
-        nodes = deque(data)
-        while nodes:
-            node = nodes.popleft()
-            if node[2] == '0':
-                parent = root
-            else:
-                pid = node[2]
-                if pid not in seen:
-                    nodes.append(node)
-                    continue
-
-                parent = seen[pid]
-
-            pk = node[0]
-            parent.appendRow([
-                QStandardItem(node[1]),
-            ])
-            seen[pk] = parent.child(parent.rowCount() - 1)
+        self.items = {}
+        for row in data:
+            self.insert_row(row)
 
         self.expandAll()
 
+    def parent_item(self, parent_id: str) -> QStandardItem:
+        """Элемент родителя или корень для категории верхнего уровня."""
+        return self.items.get(parent_id, self.item_model.invisibleRootItem())
+
+    def insert_row(self, row: list[str]) -> None:
+        """
+        Добавляет строку [pk, имя, pk родителя, траты, траты с подкатегориями]
+        последней среди подкатегорий родителя.
+        """
+        pk, name, parent_id, *totals = row
+        parent = self.parent_item(parent_id)
+        item = QStandardItem(name)
+        parent.appendRow([item, *(QStandardItem(total) for total in totals)])
+        self.items[pk] = item
+        self.expand(parent.index())
+
+    def update_row(self, row: list[str]) -> None:
+        """Обновляет строку категории, при смене родителя переносит ее."""
+        pk, name, parent_id, *totals = row
+        item = self.items[pk]
+        parent = item.parent() or self.item_model.invisibleRootItem()
+        new_parent = self.parent_item(parent_id)
+        if new_parent is not parent:
+            new_parent.appendRow(parent.takeRow(item.row()))
+            self.expand(new_parent.index())
+            self.expand(item.index())
+            parent = new_parent
+
+        item.setText(name)
+        for column, total in enumerate(totals, start=1):
+            parent.child(item.row(), column).setText(total)
+
+    def remove_row(self, pk: str) -> None:
+        """Удаляет строку категории, подкатегории переносятся на верхний уровень."""
+        item = self.items.pop(pk)
+        root = self.item_model.invisibleRootItem()
+        while item.rowCount():
+            child = item.child(0)
+            root.appendRow(item.takeRow(0))
+            self.expand(child.index())
+        parent = item.parent() or root
+        parent.removeRow(item.row())
+
 
 class AddContent(QWidget):
     """Контент добавления для окна редактирования."""
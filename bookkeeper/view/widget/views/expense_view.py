@@ -6,7 +6,7 @@
 """
 
 from datetime import date
-from typing import Tuple
+from typing import Callable, Tuple
 from PySide6.QtWidgets import (
     QLabel, QWidget, QHeaderView,
     QGridLayout, QLineEdit, QDateEdit, QDoubleSpinBox
@@ -14,7 +14,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import QDate
 from bookkeeper.view.widget.common import (
     FrameTableViewWithControls, DeleteTableContent, CategoryDropdown,
-    Table, EditWindows, AddUpdateTableContent
+    LazyTable, EditWindows, AddUpdateTableContent
 )
 from bookkeeper.models.expense import Expense
 
@@ -22,8 +22,11 @@ HEADERS = ["Дата", "Сумма", "Категория", "Комментари
 
 
 class ExpenseView(FrameTableViewWithControls):
-    """Отображение расходов."""
-    expenses: list[list[str]]
+    """
+    Отображение расходов.
+    Строки таблицы подгружаются страницами по мере прокрутки.
+    """
+    table: LazyTable
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
@@ -35,7 +38,7 @@ class ExpenseView(FrameTableViewWithControls):
             QHeaderView.ResizeMode.Stretch
         ]
 
-        self.table = Table(HEADERS, header_resize_modes, self)
+        self.table = LazyTable(HEADERS, header_resize_modes, self)
         self.set_layout('Расходы')
 
         self.add_content = AddUpdateContent()
@@ -53,14 +56,54 @@ class ExpenseView(FrameTableViewWithControls):
         self.edit_windows.update.setFixedSize(400, 200)
         self.edit_windows.delete.setFixedSize(400, 100)
 
-    def set_up(self, expenses: list[list[str]], categories: list[list[str]]) -> None:
-        """Устанавливает данные для виджета."""
-        self.expenses = expenses
-        if expenses is not None:
-            self.table.set_data(expenses)
-        if categories is not None:
-            self.update_content.category_dropdown.set_data(categories)
-            self.add_content.category_dropdown.set_data(categories)
+    def set_up(
+            self,
+            request_expenses: Callable[[int], None],
+            categories: list[list[str]]
+    ) -> None:
+        """
+        Устанавливает данные для виджета.
+        request_expenses(limit) - запрашивает следующие limit строк расходов,
+        которые передаются в append_expenses.
+        """
+        self.table.table_model.reset(request_expenses)
+        self.set_categories(categories)
+
+    def set_categories(self, categories: list[list[str]]) -> None:
+        """Устанавливает категории для окон редактирования."""
+        self.update_content.category_dropdown.set_data(categories)
+        self.add_content.category_dropdown.set_data(categories)
+
+    def insert_category(self, category: list[str]) -> None:
+        """Добавляет категорию в окна редактирования."""
+        self.update_content.category_dropdown.add_category(category)
+        self.add_content.category_dropdown.add_category(category)
+
+    def update_category(self, category: list[str]) -> None:
+        """Обновляет имя категории в окнах редактирования."""
+        self.update_content.category_dropdown.update_category(category)
+        self.add_content.category_dropdown.update_category(category)
+
+    def remove_category(self, pk: str) -> None:
+        """Удаляет категорию из окон редактирования."""
+        self.update_content.category_dropdown.remove_category(pk)
+        self.add_content.category_dropdown.remove_category(pk)
+
+    def append_expenses(self, expenses: list[list[str]]) -> None:
+        """Добавляет в конец таблицы запрошенную страницу расходов."""
+        self.table.table_model.append_rows(expenses)
+
+    def insert_expense(self, row_id: int, expense: list[str]) -> None:
+        """Вставляет строку расхода."""
+        self.table.table_model.insert_row(row_id, expense)
+
+    def update_expense(self, row_id: int, expense: list[str]) -> None:
+        """Заменяет строку расхода."""
+        self.table.table_model.update_row(row_id, expense)
+
+    def remove_expense(self, row_id: int) -> None:
+        """Удаляет строку расхода."""
+        self.table.table_model.remove_row(row_id)
 
     # Actions
 
@@ -74,7 +117,7 @@ class ExpenseView(FrameTableViewWithControls):
         if row_id < 0:
             return
 
-        self.update_content.set_row(row_id, self.expenses[self.table.currentRow()])
+        self.update_content.set_row(row_id, self.table.row(row_id))
         self.edit_windows.update.show()
 
     def on_delete_button_clicked(self) -> None:
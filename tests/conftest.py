@@ -0,0 +1,19 @@
+"""
+Общие фикстуры тестов
+"""
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def app():
+    """
+    Приложение Qt, общее для всех тестов.
+
+    Создается одно на весь запуск: после QCoreApplication виджеты
+    создать уже нельзя, поэтому сразу создается QApplication.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    qt_widgets = pytest.importorskip('PySide6.QtWidgets')
+    return qt_widgets.QApplication.instance() or qt_widgets.QApplication([])
@@ -0,0 +1,72 @@
+"""
+Тесты для учета трат по периодам бюджета
+"""
+from datetime import date
+
+import pytest
+
+from bookkeeper.analytics.budget_usage import BudgetUsage
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.memory_repository import MemoryRepository
+
+TODAY = date(2023, 3, 15)   # среда
+
+
+@pytest.fixture
+def usage():
+    usage = BudgetUsage()
+    usage.add_many([
+        Expense(1, expense_date=date(2023, 3, 15)),
+        Expense(2, expense_date=date(2023, 3, 13)),
+        Expense(4, expense_date=date(2023, 3, 1)),
+        Expense(8, expense_date=date(2023, 1, 1)),
+        Expense(16, expense_date=date(2022, 12, 31)),
+    ])
+    return usage
+
+
+def test_get(usage):
+    assert usage.get('День', TODAY) == 1
+    assert usage.get('Неделя', TODAY) == 3
+    assert usage.get('Месяц', TODAY) == 7
+    assert usage.get('Год', TODAY) == 15
+    assert usage.get('Год', date(2022, 1, 1)) == 16
+    assert usage.get('День', date(2000, 1, 1)) == 0
+
+
+def test_update_and_remove(usage):
+    old = Expense(1, expense_date=date(2023, 3, 15))
+    new = Expense(5, expense_date=date(2023, 2, 28))
+    usage.update(old, new)
+    assert usage.get('День', TODAY) == 0
+    assert usage.get('Месяц', TODAY) == 6
+    assert usage.get('Год', TODAY) == 19
+
+    usage.remove(new)
+    assert usage.get('Год', TODAY) == 14
+
+
+def test_remove_all_leaves_zero():
+    usage = BudgetUsage()
+    expenses = [Expense(0.1, expense_date=TODAY) for _ in range(10)]
+    usage.add_many(expenses)
+    for expense in expenses:
+        usage.remove(expense)
+    assert usage.get('Год', TODAY) == 0.0
+
+
+def test_unknown_period(usage):
+    with pytest.raises(ValueError):
+        usage.get('Век', TODAY)
+
+
+def test_from_repository():
+    repo = MemoryRepository[Expense]()
+    repo.add_many([
+        Expense(1, expense_date=TODAY),
+        Expense(2, expense_date=TODAY),
+        Expense(4, expense_date=date(2023, 3, 1)),
+    ])
+    usage = BudgetUsage.from_repository(repo)
+    assert usage.get('День', TODAY) == 3
+    assert usage.get('Месяц', TODAY) == 7
@@ -0,0 +1,98 @@
+"""
+Тесты для подсчета расходов по категориям с учетом подкатегорий
+"""
+from datetime import date
+
+import pytest
+
+from bookkeeper.analytics.category_rollup import (
+    CategoryTotals, add_expense_amount, add_to_ancestors, get_category_totals,
+    rollup_totals
+)
+from bookkeeper.models.category import Category
+from bookkeeper.models.category_tree import CategoryTree
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.memory_repository import MemoryRepository
+
+
+@pytest.fixture
+def category_repo():
+    # Продукты -> Мясо -> Сырое мясо, Продукты -> Сладости, Книги
+    repo = MemoryRepository[Category]()
+    Category.create_from_tree([
+        ('Продукты', None), ('Мясо', 'Продукты'), ('Сырое мясо', 'Мясо'),
+        ('Сладости', 'Продукты'), ('Книги', None),
+    ], repo)
+    return repo
+
+
+@pytest.fixture
+def expense_repo():
+    repo = MemoryRepository[Expense]()
+    repo.add_many([
+        Expense(100, category_id=1, expense_date=date(2023, 1, 10)),
+        Expense(20, category_id=2, expense_date=date(2023, 1, 11)),
+        Expense(3, category_id=3, expense_date=date(2023, 1, 12)),
+        Expense(4, category_id=4, expense_date=date(2023, 1, 31)),
+        Expense(1000, category_id=3, expense_date=date(2023, 2, 1)),
+        Expense(7, category_id=None, expense_date=date(2023, 1, 15)),
+    ])
+    return repo
+
+
+def test_rollup_totals():
+    tree = CategoryTree([
+        Category('c', parent_id=2, pk=3),
+        Category('b', parent_id=1, pk=2),
+        Category('a', pk=1),
+    ])
+    totals = rollup_totals(tree, {1: 1, 3: 10, None: 100, 42: 1000})
+    assert totals == {
+        1: CategoryTotals(1, 11),
+        2: CategoryTotals(0, 10),
+        3: CategoryTotals(10, 10),
+    }
+
+
+def test_get_category_totals(category_repo, expense_repo):
+    totals = get_category_totals(
+        category_repo, expense_repo, date(2023, 1, 1), date(2023, 2, 1)
+    )
+    assert totals[1] == CategoryTotals(100, 127)
+    assert totals[2] == CategoryTotals(20, 23)
+    assert totals[3] == CategoryTotals(3, 3)
+    assert totals[4] == CategoryTotals(4, 4)
+    assert totals[5] == CategoryTotals(0, 0)
+
+
+def test_get_category_totals_without_bounds(category_repo, expense_repo):
+    totals = get_category_totals(category_repo, expense_repo)
+    assert totals[1].total == 1127
+    assert totals[3].own == 1003
+
+
+def test_add_expense_amount():
+    tree = CategoryTree([
+        Category('a', pk=1),
+        Category('b', parent_id=1, pk=2),
+        Category('c', parent_id=2, pk=3),
+    ])
+    totals = rollup_totals(tree, {1: 1, 3: 10})
+    assert add_expense_amount(totals, tree, 3, 5) == [3, 2, 1]
+    assert totals == rollup_totals(tree, {1: 1, 3: 15})
+    assert add_expense_amount(totals, tree, 2, -0) == [2, 1]
+    assert add_expense_amount(totals, tree, None, 5) == []
+    assert add_expense_amount(totals, tree, 42, 5) == []
+
+
+def test_add_to_ancestors_moves_subtree():
+    tree = CategoryTree([
+        Category('a', pk=1),
+        Category('b', parent_id=1, pk=2),
+        Category('c', pk=3),
+    ])
+    totals = rollup_totals(tree, {2: 10})
+    assert add_to_ancestors(totals, tree, 2, -totals[2].total) == [1]
+    tree.update(Category('b', parent_id=3, pk=2))
+    assert add_to_ancestors(totals, tree, 2, totals[2].total) == [3]
+    assert totals == rollup_totals(tree, {2: 10})
@@ -0,0 +1,87 @@
+"""
+Тесты для столбцового представления расходов
+"""
+from dataclasses import replace
+from datetime import date
+
+import pytest
+
+from bookkeeper.analytics.budget_usage import BudgetUsage
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.memory_repository import MemoryRepository
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+np = pytest.importorskip('numpy')
+from bookkeeper.analytics.columnar import ExpenseColumns  # noqa: E402
+
+EXPENSES = [
+    Expense(1, category_id=1, expense_date=date(2023, 3, 15)),
+    Expense(2, category_id=2, expense_date=date(2023, 3, 13)),
+    Expense(4, category_id=None, expense_date=date(2023, 3, 1)),
+    Expense(8, category_id=1, expense_date=date(2023, 1, 1)),
+    Expense(16, category_id=3, expense_date=date(2022, 12, 31)),
+]
+
+
+@pytest.fixture
+def columns():
+    return ExpenseColumns.from_expenses(EXPENSES)
+
+
+def test_period_sum(columns):
+    assert len(columns) == 5
+    assert columns.period_sum() == 31
+    assert columns.period_sum(date(2023, 3, 1), date(2023, 3, 15)) == 6
+    assert columns.period_sum(date(2023, 1, 1)) == 15
+    assert columns.period_sum(finish_date=date(2023, 1, 1)) == 16
+    assert columns.period_sum(date(2024, 1, 1), date(2023, 1, 1)) == 0
+
+
+def test_period_sums_match_budget_usage(columns):
+    usage = BudgetUsage()
+    usage.add_many(EXPENSES)
+    today = date(2023, 3, 15)
+    periods = ['День', 'Неделя', 'Месяц', 'Год']
+    assert columns.period_sums(periods, today) == {
+        period: usage.get(period, today) for period in periods
+    }
+
+
+def test_category_totals(columns):
+    assert columns.category_totals() == {1: 9, 2: 2, 3: 16, None: 4}
+    assert columns.category_totals(date(2023, 3, 1)) == {1: 1, 2: 2, None: 4}
+    assert columns.category_totals(date(2030, 1, 1)) == {}
+
+
+def test_daily_and_rolling_sums(columns):
+    daily = columns.daily_totals(date(2023, 3, 12), date(2023, 3, 16))
+    assert daily.tolist() == [0, 2, 0, 1]
+    rolling = columns.rolling_sums(2, date(2023, 3, 12), date(2023, 3, 16))
+    assert rolling.tolist() == [0, 2, 2, 1]
+    with pytest.raises(ValueError):
+        columns.rolling_sums(0, date(2023, 3, 12), date(2023, 3, 16))
+
+
+def test_empty():
+    columns = ExpenseColumns.from_rows([])
+    assert len(columns) == 0
+    assert columns.period_sum() == 0
+    assert columns.category_totals() == {}
+
+
+def test_from_repository(tmp_path):
+    memory_repo = MemoryRepository[Expense]()
+    memory_repo.add_many(replace(e) for e in EXPENSES)
+    db_file = str(tmp_path / 'test.db')
+    sqlite_repo = SQLiteRepository[Expense](db_file, Expense)
+    sqlite_repo.connection_manager.connection.execute(
+        'CREATE TABLE expense (pk INTEGER PRIMARY KEY, amount, category_id, '
+        'expense_date, added_date, comment)'
+    )
+    sqlite_repo.add_many(replace(e) for e in EXPENSES)
+
+    for repo in memory_repo, sqlite_repo:
+        columns = ExpenseColumns.from_repository(
+            repo, where={'expense_date__gte': date(2023, 1, 1)}
+        )
+        assert columns.category_totals() == {1: 9, 2: 2, None: 4}
@@ -0,0 +1,93 @@
+"""
+Тесты для индекса трат по дням
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from bookkeeper.analytics.daily_spend import DailySpendIndex
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.memory_repository import MemoryRepository
+
+
+@pytest.fixture
+def index():
+    return DailySpendIndex.from_expenses([
+        Expense(1, expense_date=date(2023, 3, 15)),
+        Expense(2, expense_date=date(2023, 3, 13)),
+        Expense(4, expense_date=date(2023, 3, 13)),
+        Expense(8, expense_date=date(2023, 1, 1)),
+    ])
+
+
+def test_total(index):
+    assert len(index) == 3
+    assert index.total() == 15
+    assert index.total(date(2023, 3, 13)) == 7
+    assert index.total(date(2023, 3, 14), date(2023, 3, 16)) == 1
+    assert index.total(finish_date=date(2023, 3, 13)) == 8
+    assert index.total(date(2023, 3, 16), date(2023, 3, 1)) == 0
+
+
+def test_edits(index):
+    assert index.total() == 15
+    index.add(Expense(16, expense_date=date(2023, 3, 13)))
+    assert index.total(date(2023, 3, 13), date(2023, 3, 14)) == 22
+    index.add(Expense(32, expense_date=date(2023, 2, 1)))
+    assert index.total(date(2023, 2, 1), date(2023, 3, 1)) == 32
+    index.update(Expense(32, expense_date=date(2023, 2, 1)),
+                 Expense(64, expense_date=date(2023, 3, 15)))
+    assert index.total(date(2023, 2, 1), date(2023, 3, 1)) == 0
+    index.remove(Expense(8, expense_date=date(2023, 1, 1)))
+    assert index.total() == 87
+
+
+def test_append_later_days_without_rebuild(index):
+    index.total()
+    first_day = date(2023, 3, 16)
+    for offset in range(20):
+        index.add(Expense(offset + 1, expense_date=first_day + timedelta(offset)))
+        assert not index._dirty
+    assert index.total() == 15 + sum(range(1, 21))
+    assert index.total(date(2023, 3, 15), date(2023, 3, 20)) == 1 + 1 + 2 + 3 + 4
+    assert index.total(first_day + timedelta(10)) == sum(range(11, 21))
+
+    index.add(Expense(100, expense_date=date(2023, 2, 1)))
+    assert index._dirty
+    assert index.total(date(2023, 2, 1), date(2023, 3, 1)) == 100
+
+
+def test_daily_totals(index):
+    assert index.daily_totals(date(2023, 3, 1)) == [
+        (date(2023, 3, 13), 6), (date(2023, 3, 15), 1)
+    ]
+
+
+def test_matches_full_scan():
+    rnd = random.Random(0)
+    first_day = date(2023, 1, 1)
+    expenses = [
+        Expense(rnd.randint(1, 100), expense_date=first_day + timedelta(rnd.randrange(60)))
+        for _ in range(200)
+    ]
+    index = DailySpendIndex.from_expenses(expenses[:100])
+    index.total()
+    for expense in expenses[100:]:
+        index.add(expense)
+    for _ in range(50):
+        start = first_day + timedelta(rnd.randrange(-5, 65))
+        finish = start + timedelta(rnd.randrange(30))
+        assert index.total(start, finish) == sum(
+            e.amount for e in expenses if start <= e.expense_date < finish
+        )
+
+
+def test_from_repository():
+    repo = MemoryRepository[Expense]()
+    repo.add_many([
+        Expense(1, expense_date=date(2023, 3, 15)),
+        Expense(2, expense_date=date(2023, 3, 15)),
+    ])
+    index = DailySpendIndex.from_repository(repo)
+    assert index.daily_totals() == [(date(2023, 3, 15), 3)]
@@ -0,0 +1,81 @@
+"""
+Тесты для параллельного построения отчетов
+"""
+import os
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from bookkeeper.analytics.parallel_reports import (
+    ParallelReportRunner, merge_groups, shard_ranges
+)
+from bookkeeper.analytics.reports import ReportEngine, bucket_starts
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_repository import SQLiteRepository
+
+MIGRATION = os.path.join(
+    os.path.dirname(__file__), '..', '..',
+    'bookkeeper', 'database', 'migration', '01_init_tables.sql'
+)
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / 'reports.db')
+    with open(MIGRATION, encoding='utf-8') as file:
+        script = file.read().split('-- down')[0]
+    con = sqlite3.connect(db_file)
+    con.executescript(script)
+    con.close()
+
+    with SQLiteConnectionManager(db_file) as manager:
+        con = manager.connection
+        con.executemany('INSERT INTO category (name) VALUES (?)', [('a',), ('b',)])
+        repo = SQLiteRepository[Expense](db_file, Expense, manager)
+        first_day = date(2021, 1, 1)
+        repo.add_many(
+            Expense(i % 7, category_id=[1, 2, None][i % 3],
+                    expense_date=first_day + timedelta(days=i))
+            for i in range(3 * 365)
+        )
+        yield db_file
+
+
+def test_shard_ranges():
+    buckets = bucket_starts(date(2023, 1, 15), date(2023, 6, 1), 'month')
+    assert shard_ranges(buckets, date(2023, 1, 15), date(2023, 6, 1), 2) == [
+        (date(2023, 1, 15), date(2023, 3, 1)),
+        (date(2023, 3, 1), date(2023, 6, 1)),
+    ]
+    assert len(shard_ranges(buckets, date(2023, 1, 15), date(2023, 6, 1), 10)) == 5
+    assert shard_ranges(buckets, date(2023, 1, 15), date(2023, 6, 1), 1) == [
+        (date(2023, 1, 15), date(2023, 6, 1)),
+    ]
+
+
+def test_merge_groups():
+    key = (date(2023, 1, 1), 1)
+    assert merge_groups([{key: 1.0}, {key: 2.0, (date(2023, 2, 1), None): 4.0}]) == {
+        key: 3.0, (date(2023, 2, 1), None): 4.0,
+    }
+
+
+@pytest.mark.parametrize('granularity', ['week', 'month', 'year'])
+def test_matches_report_engine(db_file, granularity):
+    start_date, finish_date = date(2021, 3, 10), date(2023, 11, 20)
+    with SQLiteConnectionManager(db_file) as manager:
+        expected = ReportEngine(
+            SQLiteRepository[Expense](db_file, Expense, manager)
+        ).report(start_date, finish_date, granularity)
+
+    with ParallelReportRunner(db_file, max_workers=2, shards=3) as runner:
+        report = runner.report(start_date, finish_date, granularity)
+        assert sum(runner.report(start_date, start_date, granularity).totals) == 0
+
+    assert report.buckets == expected.buckets
+    assert report.totals == pytest.approx(expected.totals)
+    assert report.by_category.keys() == expected.by_category.keys()
+    for category_id, amounts in expected.by_category.items():
+        assert report.by_category[category_id] == pytest.approx(amounts)
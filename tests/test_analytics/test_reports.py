@@ -0,0 +1,87 @@
+"""
+Тесты для отчетов о тратах
+"""
+from datetime import date
+
+import pytest
+
+from bookkeeper.analytics.reports import ReportEngine, bucket_starts
+from bookkeeper.models.expense import Expense
+from bookkeeper.repository.memory_repository import MemoryRepository
+from bookkeeper.repository.observed_repository import ObservedRepository
+
+
+@pytest.fixture
+def repo():
+    repo = MemoryRepository[Expense]()
+    repo.add_many([
+        Expense(1, category_id=1, expense_date=date(2022, 12, 31)),
+        Expense(2, category_id=1, expense_date=date(2023, 1, 1)),
+        Expense(4, category_id=2, expense_date=date(2023, 1, 2)),
+        Expense(8, category_id=None, expense_date=date(2023, 3, 10)),
+    ])
+    return repo
+
+
+def test_bucket_starts():
+    assert bucket_starts(date(2023, 1, 31), date(2023, 4, 1), 'month') == [
+        date(2023, 1, 1), date(2023, 2, 1), date(2023, 3, 1),
+    ]
+    assert bucket_starts(date(2023, 1, 1), date(2023, 1, 10), 'week') == [
+        date(2022, 12, 26), date(2023, 1, 2), date(2023, 1, 9),
+    ]
+    assert bucket_starts(date(2023, 1, 1), date(2023, 1, 1), 'day') == []
+    with pytest.raises(ValueError):
+        bucket_starts(date(2023, 1, 1), date(2023, 2, 1), 'century')
+
+
+def test_report(repo):
+    report = ReportEngine(repo).report(date(2023, 1, 1), date(2023, 4, 1), 'month')
+    assert report.buckets == [date(2023, 1, 1), date(2023, 2, 1), date(2023, 3, 1)]
+    assert report.totals == [6, 0, 8]
+    assert report.by_category == {1: [2, 0, 0], 2: [4, 0, 0], None: [0, 0, 8]}
+
+
+def test_report_weeks(repo):
+    report = ReportEngine(repo).report(date(2022, 12, 26), date(2023, 1, 9), 'week')
+    assert report.totals == [3, 4]
+
+
+def test_report_cache_and_invalidate(repo):
+    engine = ReportEngine(repo, max_size=1)
+    report = engine.report(date(2023, 1, 1), date(2024, 1, 1), 'year')
+    assert report.totals == [14]
+    repo.add(Expense(16, expense_date=date(2023, 5, 5)))
+    assert engine.report(date(2023, 1, 1), date(2024, 1, 1), 'year') is report
+
+    engine.invalidate()
+    report = engine.report(date(2023, 1, 1), date(2024, 1, 1), 'year')
+    assert report.totals == [30]
+
+    # max_size=1: отчет за другой период вытесняет прежний
+    engine.report(date(2023, 1, 1), date(2023, 2, 1), 'day')
+    assert engine.report(date(2023, 1, 1), date(2024, 1, 1), 'year') is not report
+
+
+def test_report_invalidated_on_writes(repo):
+    engine = ReportEngine(repo)
+    period = (date(2023, 1, 1), date(2024, 1, 1), 'year')
+    assert engine.report(*period).totals == [14]
+
+    expense = Expense(16, expense_date=date(2023, 5, 5))
+    engine.expense_repository.add(expense)
+    assert engine.report(*period).totals == [30]
+    engine.expense_repository.update(Expense(32, expense_date=date(2023, 5, 5),
+                                             pk=expense.pk))
+    assert engine.report(*period).totals == [46]
+    engine.expense_repository.delete_many([expense.pk])
+    assert engine.report(*period).totals == [14]
+
+
+def test_report_shares_observed_repository(repo):
+    observed = ObservedRepository(repo)
+    engines = [ReportEngine(observed), ReportEngine(observed)]
+    period = (date(2023, 1, 1), date(2024, 1, 1), 'year')
+    assert [engine.report(*period).totals for engine in engines] == [[14], [14]]
+    observed.add(Expense(16, expense_date=date(2023, 5, 5)))
+    assert [engine.report(*period).totals for engine in engines] == [[30], [30]]
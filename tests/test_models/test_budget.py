@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+from bookkeeper.models.budget import Budget, ALLOWED_PERIODS, get_period_bounds
+
+
+def test_create_object():
+    b = Budget(amount=100, period='Месяц')
+    assert b.amount == 100
+    assert b.period == 'Месяц'
+    assert b.pk == 0
+
+
+@pytest.mark.parametrize('period, expected', [
+    ('День', (date(2023, 3, 15), date(2023, 3, 16))),
+    ('Неделя', (date(2023, 3, 13), date(2023, 3, 20))),
+    ('Месяц', (date(2023, 3, 1), date(2023, 4, 1))),
+    ('Год', (date(2023, 1, 1), date(2024, 1, 1))),
+])
+def test_get_period_bounds(period, expected):
+    assert get_period_bounds(period, date(2023, 3, 15)) == expected
+
+
+def test_get_period_bounds_december():
+    assert get_period_bounds('Месяц', date(2023, 12, 31)) == \
+        (date(2023, 12, 1), date(2024, 1, 1))
+
+
+def test_all_periods_supported():
+    for period in ALLOWED_PERIODS:
+        start, finish = get_period_bounds(period, date.today())
+        assert start <= date.today() < finish
+
+
+def test_get_period_bounds_unknown():
+    with pytest.raises(ValueError):
+        get_period_bounds('Век', date.today())
@@ -0,0 +1,83 @@
+"""
+Тесты для дерева категорий
+"""
+import pytest
+
+from bookkeeper.models.category import Category
+from bookkeeper.models.category_tree import CategoryTree
+
+
+@pytest.fixture
+def categories():
+    # 1 -> 2 -> 4, 1 -> 3, 5; дети намеренно идут раньше родителей
+    return [
+        Category('4', parent_id=2, pk=4),
+        Category('3', parent_id=1, pk=3),
+        Category('2', parent_id=1, pk=2),
+        Category('1', pk=1),
+        Category('5', pk=5),
+    ]
+
+
+@pytest.fixture
+def tree(categories):
+    return CategoryTree(categories)
+
+
+def names(categories):
+    return [c.name for c in categories]
+
+
+def test_lookups(tree):
+    assert len(tree) == 5
+    assert 4 in tree
+    assert tree.get(4).name == '4'
+    assert tree[4].name == '4'
+    assert tree.get(6) is None
+    with pytest.raises(KeyError):
+        tree[6]
+    assert tree.parent(4).name == '2'
+    assert tree.parent(1) is None
+    assert names(tree.children(1)) == ['3', '2']
+    assert names(tree.children(None)) == ['1', '5']
+    assert names(tree.ancestors(4)) == ['2', '1']
+    assert names(tree.descendants(1)) == ['3', '2', '4']
+    assert [tree.depth(pk) for pk in (1, 2, 4)] == [0, 1, 2]
+
+
+def test_topological_order(tree):
+    order = names(tree.topological_order())
+    assert sorted(order) == ['1', '2', '3', '4', '5']
+    for category in tree:
+        for ancestor in tree.ancestors(category.pk):
+            assert order.index(ancestor.name) < order.index(category.name)
+
+
+def test_missing_parent_is_root():
+    tree = CategoryTree([Category('orphan', parent_id=100, pk=1)])
+    assert names(tree.roots()) == ['orphan']
+    assert tree.parent(1) is None
+
+
+def test_add(tree):
+    tree.add(Category('6', parent_id=4, pk=6))
+    assert names(tree.ancestors(6)) == ['4', '2', '1']
+    with pytest.raises(ValueError):
+        tree.add(Category('6', pk=6))
+
+
+def test_update_moves_subtree(tree):
+    category = tree.get(2)
+    category.parent_id = 5
+    tree.update(category)
+    assert names(tree.children(1)) == ['3']
+    assert names(tree.descendants(5)) == ['2', '4']
+    assert names(tree.ancestors(4)) == ['2', '5']
+
+
+def test_remove(tree):
+    tree.remove(2)
+    assert 2 not in tree
+    assert tree.get(4).parent_id is None
+    assert names(tree.roots()) == ['1', '5', '4']
+    assert names(tree.descendants(1)) == ['3']
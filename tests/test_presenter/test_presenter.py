@@ -0,0 +1,249 @@
+"""
+Тесты для изменений записей, которые presenter выполняет в фоновом потоке,
+и для применения этих изменений к состоянию в памяти и к view
+"""
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+
+shiboken6 = pytest.importorskip('shiboken6')
+pytest.importorskip('PySide6.QtWidgets')
+from bookkeeper.models.budget import Budget  # noqa: E402
+from bookkeeper.models.category import Category  # noqa: E402
+from bookkeeper.models.expense import Expense  # noqa: E402
+from bookkeeper.presenter.presenter import (  # noqa: E402
+    Presenter, delete_existing, update_existing
+)
+from bookkeeper.repository.memory_repository import MemoryRepository  # noqa: E402
+from bookkeeper.view.main_window import MainWindow  # noqa: E402
+
+
+@pytest.fixture
+def repo():
+    repo = MemoryRepository[Expense]()
+    repo.add(Expense(100, 1, expense_date=date(2023, 3, 1)))
+    return repo
+
+
+def test_update_existing_returns_applied_version(repo):
+    first = Expense(30, 1, expense_date=date(2023, 3, 1), pk=1)
+    second = Expense(30, 2, expense_date=date(2023, 3, 1), pk=1)
+    assert update_existing(repo, first).amount == 100
+    # Повторное нажатие: прежняя версия - уже измененная, а не исходная.
+    assert update_existing(repo, second) == first
+    assert repo.get(1) == second
+
+
+def test_update_deleted(repo):
+    repo.delete(1)
+    assert update_existing(repo, Expense(30, pk=1)) is None
+    assert repo.get(1) is None
+
+
+def test_delete_existing(repo):
+    expense = repo.get(1)
+    assert delete_existing(repo, 1) == expense
+    assert delete_existing(repo, 1) is None
+    assert repo.get_all() == []
+
+
+def make_presenter(categories, expenses, budgets):
+    presenter = Presenter(MainWindow(), categories, expenses, budgets)
+    presenter.on_data_loaded(presenter.load_data())
+    presenter.worker.wait()
+    return presenter
+
+
+def close_presenter(presenter):
+    """
+    Останавливает presenter и удаляет окно сразу, в основном потоке:
+    иначе окно из цикла ссылок presenter-view может собрать сборщик
+    мусора в фоновом потоке следующего presenter.
+    """
+    presenter.close()
+    shiboken6.delete(presenter.view)
+
+
+def category_rows(presenter):
+    """Строки дерева категорий: (имя, имя родителя, траты, с подкатегориями)."""
+    res = set()
+
+    def walk(parent, parent_name):
+        for row_id in range(parent.rowCount()):
+            item = parent.child(row_id, 0)
+            res.add((item.text(), parent_name,
+                     parent.child(row_id, 1).text(), parent.child(row_id, 2).text()))
+            walk(item, item.text())
+
+    walk(presenter.view.category_view.tree.item_model.invisibleRootItem(), None)
+    return res
+
+
+def dropdown_items(dropdown):
+    return sorted((dropdown.itemData(i), dropdown.itemText(i))
+                  for i in range(dropdown.count()))
+
+
+def snapshot(presenter):
+    """Состояние presenter в памяти и строки, показанные во view."""
+    view = presenter.view
+    budget_table = view.budget_view.table
+    return {
+        'expenses': presenter.expenses,
+        'category_totals': presenter.category_totals,
+        'period_expenses': presenter.period_expenses,
+        'expense_rows': view.expense_view.table.table_model.rows,
+        'budget_rows': view.budget_view.budgets,
+        'budget_table': [
+            [budget_table.item(row_id, column).text() for column in range(3)]
+            for row_id in range(budget_table.rowCount())
+        ],
+        'category_rows': category_rows(presenter),
+        'category_dropdowns': [
+            dropdown_items(dropdown) for dropdown in view.category_view.dropdowns()
+        ],
+        'expense_dropdown': dropdown_items(view.expense_view.add_content.category_dropdown),
+    }
+
+
+@pytest.fixture
+def presenter(app):
+    today = date.today()
+    categories = MemoryRepository[Category]()
+    food, meat, books = Category.create_from_tree(
+        [('Еда', None), ('Мясо', 'Еда'), ('Книги', None)], categories
+    )
+    expenses = MemoryRepository[Expense]()
+    expenses.add_many([
+        Expense(100.0, meat.pk, expense_date=today),
+        Expense(50.0, food.pk, expense_date=today),
+        Expense(30.0, books.pk, expense_date=today.replace(day=1) - timedelta(days=1)),
+        Expense(20.0, None, 'без категории', expense_date=today),
+        Expense(7.5, books.pk, expense_date=today - timedelta(days=400)),
+    ])
+    budgets = MemoryRepository[Budget]()
+    budgets.add_many([Budget(1000.0, 'День'), Budget(30000.0, 'Месяц')])
+    presenter = make_presenter(categories, expenses, budgets)
+    yield presenter
+    close_presenter(presenter)
+
+
+def assert_matches_fresh_load(presenter):
+    fresh = make_presenter(
+        presenter.category_repository,
+        presenter.expense_repository,
+        presenter.budget_repository,
+    )
+    try:
+        assert snapshot(presenter) == snapshot(fresh)
+    finally:
+        close_presenter(fresh)
+
+
+def test_initial_load(presenter):
+    assert len(presenter.expenses) == 5
+    assert presenter.period_expenses['День'] == 170
+    assert_matches_fresh_load(presenter)
+
+
+@pytest.mark.parametrize('days_ago', [0, 40, 1000])
+def test_add_expense(presenter, days_ago):
+    expense = Expense(15.0, 2, expense_date=date.today() - timedelta(days=days_ago))
+    presenter.expense_repository.add(expense)
+    presenter.on_expense_added(expense)
+    assert_matches_fresh_load(presenter)
+
+
+@pytest.mark.parametrize('changes', [
+    {'amount': 500.0},
+    {'category_id': 3},
+    {'category_id': None},
+    {'expense_date': date.today() - timedelta(days=40)},
+    {'expense_date': date.today() - timedelta(days=1000), 'category_id': 1},
+])
+def test_update_expense(presenter, changes):
+    old = presenter.expenses[0]
+    expense = replace(old, **changes)
+    presenter.on_expense_updated(
+        update_existing(presenter.expense_repository, expense), expense
+    )
+    assert_matches_fresh_load(presenter)
+
+
+def test_update_deleted_expense(presenter):
+    expense = replace(presenter.expenses[0], amount=500.0)
+    presenter.expense_repository.delete(expense.pk)
+    presenter.on_expense_deleted(presenter.expenses[0])
+    presenter.on_expense_updated(
+        update_existing(presenter.expense_repository, expense), expense
+    )
+    assert_matches_fresh_load(presenter)
+
+
+@pytest.mark.parametrize('row_id', [0, 2, 4])
+def test_delete_expense(presenter, row_id):
+    pk = presenter.expenses[row_id].pk
+    presenter.on_expense_deleted(delete_existing(presenter.expense_repository, pk))
+    # Повторное удаление ничего не меняет.
+    presenter.on_expense_deleted(delete_existing(presenter.expense_repository, pk))
+    assert_matches_fresh_load(presenter)
+
+
+@pytest.mark.parametrize('parent_id', [None, 1])
+def test_add_category(presenter, parent_id):
+    category = Category('Новая', parent_id)
+    presenter.category_repository.add(category)
+    presenter.on_category_added(category)
+    assert_matches_fresh_load(presenter)
+
+
+@pytest.mark.parametrize('pk, changes', [
+    (1, {'name': 'Продукты'}),
+    (2, {'parent_id': None}),
+    (2, {'parent_id': 3, 'name': 'Журналы'}),
+    (3, {'parent_id': 2}),
+])
+def test_update_category(presenter, pk, changes):
+    category = replace(presenter.category_tree[pk], **changes)
+    presenter.on_category_updated(
+        update_existing(presenter.category_repository, category), category
+    )
+    assert_matches_fresh_load(presenter)
+
+
+@pytest.mark.parametrize('pk', [1, 2, 3])
+def test_delete_category(presenter, pk):
+    old = delete_existing(presenter.category_repository, pk)
+    # Как внешний ключ в бд: расходы остаются без категории.
+    repository = presenter.expense_repository
+    repository.update_many(
+        replace(expense, category_id=None)
+        for expense in repository.get_all({'category_id': pk})
+    )
+    presenter.on_category_deleted(old, pk)
+    presenter.on_category_deleted(
+        delete_existing(presenter.category_repository, pk), pk
+    )
+    assert_matches_fresh_load(presenter)
+
+
+def test_add_budget(presenter):
+    budget = Budget(5000.0, 'Неделя')
+    presenter.budget_repository.add(budget)
+    presenter.on_budget_added(budget)
+    assert_matches_fresh_load(presenter)
+
+
+def test_update_budget(presenter):
+    budget = replace(presenter.budgets[0], amount=10.0, period='Год')
+    update_existing(presenter.budget_repository, budget)
+    presenter.on_budget_updated(budget)
+    assert_matches_fresh_load(presenter)
+
+
+def test_delete_budget(presenter):
+    pk = presenter.budgets[0].pk
+    delete_existing(presenter.budget_repository, pk)
+    presenter.on_budget_deleted(pk)
+    assert_matches_fresh_load(presenter)
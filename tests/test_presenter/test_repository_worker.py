@@ -0,0 +1,98 @@
+"""
+Тесты для исполнителя запросов к репозиториям в фоновом потоке
+"""
+import threading
+
+import pytest
+
+QtCore = pytest.importorskip('PySide6.QtCore')
+from bookkeeper.presenter.repository_worker import RepositoryWorker  # noqa: E402
+
+
+@pytest.fixture
+def worker(app):
+    worker = RepositoryWorker()
+    yield worker
+    worker.stop()
+
+
+@pytest.fixture
+def blocked(worker):
+    """Держит фоновый поток занятым, пока не выставлено событие."""
+    release = threading.Event()
+    worker.submit(release.wait)
+    yield release
+    release.set()
+
+
+def test_results_in_order_in_main_thread(worker):
+    main_thread = threading.get_ident()
+    results = []
+    threads = []
+
+    def job(x):
+        threads.append(threading.get_ident())
+        return x
+
+    for x in range(5):
+        worker.submit(lambda x=x: job(x), results.append)
+    worker.wait()
+    assert results == [0, 1, 2, 3, 4]
+    assert main_thread not in threads
+    assert worker.pending() == 0
+
+
+def test_superseded_job_is_not_run(worker, blocked):
+    calls = []
+    results = []
+    worker.submit(lambda: calls.append('old') or 'old', results.append, key='load')
+    worker.submit(lambda: calls.append('new') or 'new', results.append, key='load')
+    worker.submit(lambda: 'other', results.append, key='other')
+    blocked.set()
+    worker.wait()
+    assert calls == ['new']
+    assert results == ['new', 'other']
+
+
+def test_superseded_result_is_dropped(worker):
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        release.wait()
+        return 'old'
+
+    worker.submit(slow, results.append, key='load')
+    started.wait()
+    worker.submit(lambda: 'new', results.append, key='load')
+    release.set()
+    worker.wait()
+    assert results == ['new']
+
+
+def test_cancel(worker, blocked):
+    results = []
+    worker.submit(lambda: 1, results.append, key='load')
+    worker.cancel('load')
+    worker.submit(lambda: 2, results.append)
+    blocked.set()
+    worker.wait()
+    assert results == [2]
+
+
+def test_callback_can_submit(worker):
+    results = []
+    worker.submit(lambda: 1, lambda x: worker.submit(lambda: x + 1, results.append))
+    worker.wait()
+    assert results == [2]
+
+
+def test_failed_job_does_not_stop_worker(worker, capsys):
+    results = []
+    worker.submit(lambda: 1 / 0, results.append)
+    worker.submit(lambda: 2, results.append)
+    worker.wait()
+    assert results == [2]
+    assert 'ZeroDivisionError' in capsys.readouterr().err
@@ -0,0 +1,151 @@
+"""
+Тесты для асинхронных репозиториев
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository.async_memory_repository import AsyncMemoryRepository
+from bookkeeper.repository.async_sqlite_repository import (
+    AsyncSQLiteRepository, get_database_executor
+)
+from bookkeeper.repository.sqlite_category_repository import SQLiteCategoryRepository
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+
+
+@dataclass
+class Custom:
+    value: int = 0
+    pk: int = 0
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / 'async.db')
+    with sqlite3.connect(db_file) as con:
+        con.execute('CREATE TABLE custom (pk INTEGER PRIMARY KEY, value int)')
+    con.close()
+    return db_file
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def repo(request, db_file):
+    if request.param == 'memory':
+        yield AsyncMemoryRepository[Custom]()
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor, \
+            SQLiteConnectionManager(db_file) as manager:
+        yield AsyncSQLiteRepository[Custom](db_file, Custom, manager, executor)
+
+
+def test_crud(repo):
+    async def scenario():
+        obj = Custom(1)
+        pk = await repo.add(obj)
+        assert obj.pk == pk
+        assert await repo.get(pk) == obj
+
+        await repo.update(Custom(2, pk))
+        assert (await repo.get(pk)).value == 2
+
+        await repo.delete(pk)
+        assert await repo.get(pk) is None
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_coroutines(repo):
+    async def scenario():
+        pks = await asyncio.gather(*(repo.add(Custom(i)) for i in range(50)))
+        assert len(set(pks)) == 50
+        objs = await repo.get_all({'value__gte': 25})
+        assert sorted(obj.value for obj in objs) == list(range(25, 50))
+        assert await repo.aggregate('sum', 'value') == sum(range(50))
+        page = await repo.get_page(order_by='-value', limit=3)
+        assert [obj.value for obj in page] == [49, 48, 47]
+
+    asyncio.run(scenario())
+
+
+def test_iter_all(repo):
+    async def scenario():
+        await repo.add_many([Custom(i) for i in range(7)])
+        values = [obj.value async for obj in repo.iter_all(batch_size=3)]
+        assert sorted(values) == list(range(7))
+
+        async for obj in repo.iter_all(batch_size=2):
+            break
+        assert await repo.get(obj.pk) == obj
+
+    asyncio.run(scenario())
+
+
+def test_run_in_transaction(repo):
+    async def scenario():
+        def move(sync_repo):
+            objs = sync_repo.get_all()
+            sync_repo.delete_many([obj.pk for obj in objs])
+            return sync_repo.add(Custom(sum(obj.value for obj in objs)))
+
+        await repo.add_many([Custom(1), Custom(2)])
+        pk = await repo.run_in_transaction(move)
+        assert await repo.get_all() == [Custom(3, pk)]
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_single_thread(db_file):
+    threads = set()
+
+    async def scenario(repo):
+        original = repo.repository.get_all
+
+        def get_all(where=None):
+            threads.add(threading.get_ident())
+            return original(where)
+
+        repo.repository.get_all = get_all
+        await asyncio.gather(*(repo.get_all() for _ in range(10)))
+
+    repo = AsyncSQLiteRepository[Custom](db_file, Custom)
+    asyncio.run(scenario(repo))
+    assert len(threads) == 1
+    assert threading.get_ident() not in threads
+    assert repo.executor is get_database_executor(db_file)
+    repo.repository.connection_manager.close()
+
+
+def test_sqlite_category_closure(tmp_path):
+    migration_dir = os.path.join(
+        os.path.dirname(__file__), '..', '..', 'bookkeeper', 'database', 'migration'
+    )
+    db_file = str(tmp_path / 'categories.db')
+    with sqlite3.connect(db_file) as con:
+        for name in ('01_init_tables.sql', '04_category_closure.sql'):
+            with open(os.path.join(migration_dir, name), encoding='utf-8') as file:
+                con.executescript(file.read().split('-- down')[0])
+    con.close()
+
+    async def scenario(repo):
+        parent = await repo.add(Category('Еда'))
+        return parent, await repo.add(Category('Мясо', parent))
+
+    with ThreadPoolExecutor(max_workers=1) as executor, \
+            SQLiteConnectionManager(db_file) as manager:
+        repo = AsyncSQLiteRepository[Category](db_file, Category, manager, executor)
+        assert isinstance(repo.repository, SQLiteCategoryRepository)
+        parent, child = asyncio.run(scenario(repo))
+        sync_repo = SQLiteCategoryRepository(db_file, manager)
+        assert [c.pk for c in sync_repo.get_ancestors(child)] == [parent]
+
+        shared = AsyncSQLiteRepository[Category](
+            db_file, Category, executor=executor, repository=sync_repo
+        )
+        assert shared.repository is sync_repo
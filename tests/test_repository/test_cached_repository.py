@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+import pytest
+
+from bookkeeper.repository.cached_repository import CachedRepository
+from bookkeeper.repository.memory_repository import MemoryRepository
+
+
+@dataclass
+class Custom:
+    value: int = 0
+    pk: int = 0
+
+
+@pytest.fixture
+def inner():
+    return MemoryRepository()
+
+
+@pytest.fixture
+def repo(inner):
+    return CachedRepository(inner, max_size=2)
+
+
+def test_get_hits_cache(repo, inner):
+    pk = inner.add(Custom(1))
+    obj = repo.get(pk)
+    assert repo.get(pk) is obj
+    assert (repo.hits, repo.misses) == (1, 1)
+
+
+def test_get_nonexistent(repo):
+    assert repo.get(1) is None
+    assert repo.misses == 1
+    assert len(repo) == 0
+
+
+def test_add_and_update_write_through(repo, inner):
+    obj = Custom(1)
+    pk = repo.add(obj)
+    assert inner.get(pk) is obj
+    assert repo.get(pk) is obj
+    new_obj = Custom(2, pk)
+    repo.update(new_obj)
+    assert inner.get(pk) is new_obj
+    assert repo.get(pk) is new_obj
+    assert repo.misses == 0
+
+
+def test_lru_eviction(repo):
+    pks = repo.add_many([Custom(i) for i in range(3)])
+    assert len(repo) == 2
+    repo.get(pks[1])
+    repo.get(pks[0])
+    assert (repo.hits, repo.misses) == (1, 1)
+    repo.get(pks[2])
+    assert repo.misses == 2
+
+
+def test_delete_invalidates(repo):
+    pks = repo.add_many([Custom(1), Custom(2)])
+    repo.delete(pks[0])
+    assert repo.get(pks[0]) is None
+    assert len(repo) == 0
+
+
+def test_rollback_invalidates(repo):
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.add(Custom(1))
+            raise RuntimeError
+    assert len(repo) == 0
+
+
+def test_queries_are_delegated(repo):
+    objs = [Custom(i) for i in range(3)]
+    repo.add_many(objs)
+    assert repo.get_all({'value__gte': 1}) == objs[1:]
+    assert list(repo.iter_all()) == objs
+    assert repo.get_page(order_by='-value', limit=1) == [objs[2]]
+    assert repo.aggregate('sum', 'value') == 3
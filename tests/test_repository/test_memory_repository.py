@@ -1,6 +1,8 @@
 from bookkeeper.repository.memory_repository import MemoryRepository
+from bookkeeper.repository.abstract_repository import page_key
 
 import pytest
+from inspect import isgenerator
 
 
 @pytest.fixture
@@ -77,3 +79,184 @@ def test_get_all_with_condition(repo, custom_class):
         objects.append(o)
     assert repo.get_all({'name': '0'}) == [objects[0]]
     assert repo.get_all({'test': 'test'}) == objects
+
+
+def test_add_many(repo, custom_class):
+    objects = [custom_class() for _ in range(5)]
+    pks = repo.add_many(objects)
+    assert pks == [o.pk for o in objects]
+    assert repo.get_all() == objects
+
+
+def test_cannot_add_many_with_pk(repo, custom_class):
+    objects = [custom_class() for _ in range(2)]
+    objects[1].pk = 1
+    with pytest.raises(ValueError):
+        repo.add_many(objects)
+    assert repo.get_all() == []
+
+
+def test_update_many(repo, custom_class):
+    pks = repo.add_many([custom_class() for _ in range(3)])
+    new_objects = []
+    for pk in pks:
+        o = custom_class()
+        o.pk = pk
+        new_objects.append(o)
+    repo.update_many(new_objects)
+    assert repo.get_all() == new_objects
+
+
+def test_delete_many(repo, custom_class):
+    pks = repo.add_many([custom_class() for _ in range(3)])
+    repo.delete_many(pks[:2])
+    assert [o.pk for o in repo.get_all()] == pks[2:]
+
+
+def test_cannot_delete_many_unexistent(repo, custom_class):
+    pk = repo.add(custom_class())
+    with pytest.raises(KeyError):
+        repo.delete_many([pk, pk + 1])
+    assert repo.get(pk) is not None
+
+
+def test_cannot_delete_many_duplicates(repo, custom_class):
+    pks = repo.add_many([custom_class() for _ in range(2)])
+    with pytest.raises(KeyError):
+        repo.delete_many([pks[0], pks[1], pks[0]])
+    assert [o.pk for o in repo.get_all()] == pks
+
+
+def test_transaction_is_noop(repo, custom_class):
+    with repo.transaction():
+        obj = custom_class()
+        repo.add(obj)
+    assert repo.get_all() == [obj]
+
+
+def test_iter_all(repo, custom_class):
+    objects = []
+    for i in range(5):
+        o = custom_class()
+        o.name = str(i % 2)
+        repo.add(o)
+        objects.append(o)
+    gen = repo.iter_all()
+    assert isgenerator(gen)
+    assert list(gen) == objects
+    assert list(repo.iter_all({'name': '0'})) == objects[::2]
+
+
+def test_get_page(repo, custom_class):
+    objects = []
+    for i in range(7):
+        o = custom_class()
+        o.value = i % 3
+        repo.add(o)
+        objects.append(o)
+    expected = sorted(objects, key=lambda o: (o.value, o.pk))
+
+    first = repo.get_page(order_by='value', limit=4)
+    assert first == expected[:4]
+    second = repo.get_page(order_by='value', limit=4,
+                           after_key=page_key(first[-1], 'value'))
+    assert second == expected[4:]
+
+
+def test_get_page_descending_with_condition(repo, custom_class):
+    objects = []
+    for i in range(6):
+        o = custom_class()
+        o.value = i
+        o.even = i % 2 == 0
+        repo.add(o)
+        objects.append(o)
+    page = repo.get_page({'even': True}, order_by='-value', limit=2)
+    assert page == [objects[4], objects[2]]
+    page = repo.get_page({'even': True}, order_by='-value', limit=2,
+                         after_key=page_key(page[-1], '-value'))
+    assert page == [objects[0]]
+
+
+def test_get_all_with_operators(repo, custom_class):
+    objects = []
+    for i in range(5):
+        o = custom_class()
+        o.value = i
+        repo.add(o)
+        objects.append(o)
+    assert repo.get_all({'value__gte': 1, 'value__lt': 3}) == objects[1:3]
+    assert repo.get_all({'value__in': [0, 4]}) == [objects[0], objects[4]]
+
+
+def test_aggregate(repo, custom_class):
+    for value, group in [(1, 'a'), (2, 'a'), (3, 'b'), (None, 'b')]:
+        o = custom_class()
+        o.value = value
+        o.group = group
+        repo.add(o)
+    assert repo.aggregate('sum', 'value') == 6
+    assert repo.aggregate('count', 'value') == 3
+    assert repo.aggregate('max', 'value', where={'group': 'a'}) == 2
+    assert repo.aggregate('sum', 'value', where={'value__gt': 10}) == 0
+    assert repo.aggregate('avg', 'value', group_by='group') == {'a': 1.5, 'b': 3}
+    with pytest.raises(ValueError):
+        repo.aggregate('median', 'value')
+
+
+@pytest.fixture
+def indexed_repo():
+    return MemoryRepository(indexes=['group'], ordered_indexes=['value'])
+
+
+def make_objects(repo, custom_class, n=10):
+    objects = []
+    for i in range(n):
+        o = custom_class()
+        o.group = i % 3 if i % 4 else None
+        o.value = i if i != 5 else None
+        repo.add(o)
+        objects.append(o)
+    return objects
+
+
+@pytest.mark.parametrize('where', [
+    {'group': 1},
+    {'group': None},
+    {'group__in': [0, 2]},
+    {'group__in': [None, 1]},
+    {'group__isnull': True},
+    {'group__isnull': False},
+    {'value': 3},
+    {'value__gte': 4},
+    {'value__gt': 4},
+    {'value__lt': 4},
+    {'value__lte': 4},
+    {'value__gte': 2, 'value__lt': 8, 'group': 2},
+    {'value__ne': 3},
+    {'value': None},
+    {'value__lt': None},
+])
+def test_indexed_get_all(indexed_repo, custom_class, where):
+    objects = make_objects(indexed_repo, custom_class)
+    plain_repo = MemoryRepository()
+    make_objects(plain_repo, custom_class)
+    expected = [o.pk for o in plain_repo.get_all(where)]
+    assert [o.pk for o in indexed_repo.get_all(where)] == expected
+    assert [o.pk for o in indexed_repo.iter_all(where)] == expected
+    assert all(o in objects for o in indexed_repo.get_all(where))
+
+
+def test_indexes_follow_updates(indexed_repo, custom_class):
+    objects = make_objects(indexed_repo, custom_class)
+    obj = objects[1]
+    obj.group = 'new'
+    obj.value = 100
+    indexed_repo.update(obj)
+    assert indexed_repo.get_all({'group': 'new'}) == [obj]
+    assert indexed_repo.get_all({'group': 1}) == [objects[7]]
+    assert indexed_repo.get_all({'value__gt': 9}) == [obj]
+
+    indexed_repo.delete(obj.pk)
+    assert indexed_repo.get_all({'group': 'new'}) == []
+    assert indexed_repo.get_all({'value__gt': 9}) == []
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+
+import pytest
+
+from bookkeeper.repository.memory_repository import MemoryRepository
+from bookkeeper.repository.observed_repository import ObservedRepository
+
+
+@dataclass
+class Custom:
+    value: int = 0
+    pk: int = 0
+
+
+@pytest.fixture
+def repo():
+    return ObservedRepository(MemoryRepository())
+
+
+@pytest.fixture
+def calls(repo):
+    calls = []
+    repo.add_observer(lambda: calls.append(1))
+    return calls
+
+
+def test_writes_notify(repo, calls):
+    pk = repo.add(Custom(1))
+    repo.add_many([Custom(2), Custom(3)])
+    repo.update(Custom(4, pk))
+    repo.update_many([Custom(5, pk)])
+    repo.delete(pk)
+    repo.delete_many([pk + 1])
+    assert len(calls) == 6
+
+
+def test_reads_do_not_notify(repo, calls):
+    pk = repo.repository.add(Custom(1))
+    assert repo.get(pk) == Custom(1, pk)
+    assert repo.get_all({'value': 1}) == [Custom(1, pk)]
+    assert list(repo.iter_all()) == [Custom(1, pk)]
+    assert repo.get_page(limit=1) == [Custom(1, pk)]
+    assert repo.aggregate('sum', 'value') == 1
+    assert calls == []
+
+
+def test_failed_write_notifies(repo, calls):
+    with pytest.raises(KeyError):
+        repo.delete_many([1])
+    assert len(calls) == 1
+
+
+def test_remove_observer(repo, calls):
+    observer = calls.append
+    repo.add_observer(observer)
+    repo.remove_observer(observer)
+    repo.add(Custom())
+    assert calls == [1]
+
+
+def test_rollback_notifies(repo, calls):
+    with pytest.raises(ValueError):
+        with repo.transaction():
+            raise ValueError
+    with repo.transaction():
+        pass
+    assert len(calls) == 1
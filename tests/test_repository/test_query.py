@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import pytest
+
+from bookkeeper.repository.query import (
+    aggregate_objects, compile_where, parse_condition, parse_group_by, truncate_date
+)
+
+
+@dataclass
+class Custom:
+    value: int | None = 0
+    name: str = ''
+
+
+def test_parse_condition():
+    assert parse_condition('value') == ('value', 'eq')
+    assert parse_condition('value__gte') == ('value', 'gte')
+    assert parse_condition('some__field') == ('some__field', 'eq')
+
+
+@pytest.mark.parametrize('where, expected', [
+    (None, [0, 1, 2, 3, None]),
+    ({'value': 1}, [1]),
+    ({'value': None}, [None]),
+    ({'value__ne': 1}, [0, 2, 3, None]),
+    ({'value__gte': 1, 'value__lt': 3}, [1, 2]),
+    ({'value__gt': 2}, [3]),
+    ({'value__lte': 0}, [0]),
+    ({'value__in': [0, 3]}, [0, 3]),
+    ({'value__in': []}, []),
+    ({'value__in': [None, 1]}, [1]),
+    ({'value__isnull': True}, [None]),
+    ({'value__isnull': False}, [0, 1, 2, 3]),
+    ({'value__lt': None}, []),
+    ({'value__gte': None}, []),
+])
+def test_compile_where(where, expected):
+    objs = [Custom(value) for value in [0, 1, 2, 3, None]]
+    predicate = compile_where(where)
+    assert [obj.value for obj in objs if predicate(obj)] == expected
+
+
+def test_like():
+    predicate = compile_where({'name__like': 'мя_о%'})
+    assert predicate(Custom(name='мясо'))
+    assert predicate(Custom(name='мясо сырое'))
+    assert not predicate(Custom(name='сырое мясо'))
+    assert not compile_where({'name__like': 'a.b'})(Custom(name='axb'))
+    assert compile_where({'name__like': 'str%'})(Custom(name='STR1'))
+    assert not compile_where({'name__like': None})(Custom(name='str'))
+
+
+def test_like_folds_ascii_only():
+    # Как SQLite LIKE: регистр кириллицы учитывается.
+    assert not compile_where({'name__like': 'мясо'})(Custom(name='Мясо'))
+
+
+def test_parse_group_by():
+    assert parse_group_by('day') == ('day', None)
+    assert parse_group_by('expense_date__week') == ('expense_date', 'week')
+    assert parse_group_by('some__field') == ('some__field', None)
+
+
+@pytest.mark.parametrize('truncation, expected', [
+    ('day', date(2023, 3, 19)),
+    ('week', date(2023, 3, 13)),
+    ('month', date(2023, 3, 1)),
+    ('year', date(2023, 1, 1)),
+])
+def test_truncate_date(truncation, expected):
+    assert truncate_date(date(2023, 3, 19), truncation) == expected
+    assert truncate_date(datetime(2023, 3, 19, 12), truncation) == expected
+    assert truncate_date(None, truncation) is None
+
+
+def test_aggregate_objects_group_by_fields():
+    @dataclass
+    class Item:
+        value: int
+        name: str
+        day: date
+
+    items = [
+        Item(1, 'a', date(2023, 1, 31)),
+        Item(2, 'a', date(2023, 2, 1)),
+        Item(4, 'b', date(2023, 2, 28)),
+        Item(8, 'a', date(2023, 2, 2)),
+    ]
+    assert aggregate_objects(items, 'sum', 'value', group_by='day__month') == {
+        date(2023, 1, 1): 1, date(2023, 2, 1): 14,
+    }
+    assert aggregate_objects(items, 'sum', 'value', group_by=('day__month', 'name')) == {
+        (date(2023, 1, 1), 'a'): 1,
+        (date(2023, 2, 1), 'a'): 10,
+        (date(2023, 2, 1), 'b'): 4,
+    }
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+
+import pytest
+
+from bookkeeper.models.category import Category
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
+from bookkeeper.repository.sqlite_category_repository import SQLiteCategoryRepository
+
+MIGRATION_DIR = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'bookkeeper', 'database', 'migration'
+)
+
+
+def apply_migration(con, name):
+    with open(os.path.join(MIGRATION_DIR, name), encoding='utf-8') as file:
+        con.executescript(file.read().split('-- down')[0])
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    db_file = str(tmp_path / 'test.db')
+    con = sqlite3.connect(db_file)
+    apply_migration(con, '01_init_tables.sql')
+    apply_migration(con, '04_category_closure.sql')
+    con.close()
+    return db_file
+
+
+@pytest.fixture
+def repo(db_file):
+    with SQLiteConnectionManager(db_file) as manager:
+        yield SQLiteCategoryRepository(db_file, manager)
+
+
+def closure(repo):
+    rows = repo.connection_manager.connection.execute(
+        'SELECT ancestor_id, descendant_id, depth FROM category_closure'
+    )
+    return set(rows)
+
+
+def expected_closure(repo):
+    parents = {c.pk: c.parent_id for c in repo.get_all()}
+    res = set()
+    for pk in parents:
+        node, depth = pk, 0
+        while node is not None:
+            res.add((node, pk, depth))
+            node, depth = parents[node], depth + 1
+    return res
+
+
+@pytest.fixture
+def tree(repo):
+    # 0 -> 1 -> 3, 0 -> 2 -> 4 -> 5
+    tree = [('0', None), ('1', '0'), ('2', '0'), ('3', '1'), ('4', '2'), ('5', '4')]
+    cats = {c.name: c for c in Category.create_from_tree(tree, repo)}
+    assert closure(repo) == expected_closure(repo)
+    return cats
+
+
+def test_migration_backfills_closure(tmp_path):
+    db_file = str(tmp_path / 'backfill.db')
+    con = sqlite3.connect(db_file)
+    apply_migration(con, '01_init_tables.sql')
+    apply_migration(con, '02_fill_init_data.sql')
+    apply_migration(con, '04_category_closure.sql')
+    con.close()
+    with SQLiteConnectionManager(db_file) as manager:
+        repo = SQLiteCategoryRepository(db_file, manager)
+        assert closure(repo) == expected_closure(repo)
+
+
+def test_add_many(repo):
+    root = Category('root')
+    repo.add(root)
+    children = [Category('a', root.pk), Category('b', root.pk)]
+    repo.add_many(children)
+    assert closure(repo) == expected_closure(repo)
+
+
+def test_get_ancestors_and_descendants(repo, tree):
+    assert [c.name for c in repo.get_ancestors(tree['5'].pk)] == ['4', '2', '0']
+    assert [c.name for c in repo.get_descendants(tree['2'].pk)] == ['4', '5']
+    assert sorted(repo.get_subtree_pks(tree['1'].pk)) == [tree['1'].pk, tree['3'].pk]
+
+
+def test_model_uses_hierarchy(repo, tree):
+    assert [c.name for c in tree['5'].get_all_parents(repo)] == ['4', '2', '0']
+    assert {c.name for c in tree['0'].get_subcategories(repo)} == {'1', '2', '3', '4', '5'}
+
+
+def test_move_subtree(repo, tree):
+    tree['2'].parent_id = tree['3'].pk
+    repo.update(tree['2'])
+    assert closure(repo) == expected_closure(repo)
+    assert [c.name for c in repo.get_ancestors(tree['5'].pk)] == ['4', '2', '3', '1', '0']
+
+    tree['4'].parent_id = None
+    repo.update(tree['4'])
+    assert closure(repo) == expected_closure(repo)
+
+
+def test_cannot_move_into_own_subtree(repo, tree):
+    before = closure(repo)
+    tree['2'].parent_id = tree['5'].pk
+    with pytest.raises(ValueError):
+        repo.update(tree['2'])
+    assert closure(repo) == before
+    assert repo.get(tree['2'].pk).parent_id == tree['0'].pk
+
+
+def test_delete_detaches_children(repo, tree):
+    repo.delete(tree['2'].pk)
+    assert repo.get(tree['4'].pk).parent_id is None
+    assert closure(repo) == expected_closure(repo)
+    assert repo.get_ancestors(tree['5'].pk) == [repo.get(tree['4'].pk)]
+
+
+def test_cannot_delete_nonexistent(repo, tree):
+    before = closure(repo)
+    with pytest.raises(ValueError):
+        repo.delete(-1)
+    assert closure(repo) == before
+
+
+def test_read_only(repo, db_file):
+    parent = Category('parent')
+    repo.add(parent)
+    with SQLiteConnectionManager(db_file, read_only=True) as manager:
+        ro_repo = SQLiteCategoryRepository(db_file, manager)
+        assert ro_repo.get_subtree_pks(parent.pk) == [parent.pk]
+        with pytest.raises(PermissionError):
+            ro_repo.delete(parent.pk)
+        with pytest.raises(PermissionError):
+            ro_repo.add(Category('child', parent_id=parent.pk))
+    assert closure(repo) == expected_closure(repo)
@@ -0,0 +1,171 @@
+import sqlite3
+import threading
+
+import pytest
+
+from bookkeeper.repository.sqlite_connection import (
+    SQLiteConnectionManager, close_connection_managers, create_snapshot,
+    get_connection_manager
+)
+
+DB_FILE = "bookkeeper_test.db"
+
+
+@pytest.fixture
+def manager():
+    with SQLiteConnectionManager(DB_FILE) as manager:
+        yield manager
+
+
+def test_connection_is_reused(manager):
+    assert manager.connection is manager.connection
+
+
+def test_foreign_keys_enabled(manager):
+    assert manager.connection.execute('PRAGMA foreign_keys').fetchone() == (1,)
+
+
+def test_connection_per_thread(manager):
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(manager.connection))
+    thread.start()
+    thread.join()
+    assert connections[0] is not manager.connection
+
+
+def test_connection_closed_when_thread_ends(manager):
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(manager.connection))
+    thread.start()
+    thread.join()
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute('SELECT 1')
+    assert manager._connections == [manager.connection]
+
+
+def test_setup_hook_runs_once_per_connection():
+    calls = []
+    with SQLiteConnectionManager(DB_FILE, setup_hooks=[calls.append]) as manager:
+        for _ in range(3):
+            manager.connection.execute('SELECT 1')
+        assert calls == [manager.connection]
+
+
+def test_close_reopens_connection(manager):
+    con = manager.connection
+    manager.close()
+    assert manager.connection is not con
+    assert manager.connection.execute('SELECT 1').fetchone() == (1,)
+
+
+def test_shared_manager_for_same_file():
+    assert get_connection_manager(DB_FILE) is get_connection_manager('./' + DB_FILE)
+
+
+def pragma(con, name):
+    return con.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+def test_pragma_profiles(tmp_path):
+    db_file = str(tmp_path / 'profile.db')
+    with SQLiteConnectionManager(db_file, profile='fast') as manager:
+        con = manager.connection
+        assert pragma(con, 'journal_mode') == 'wal'
+        assert pragma(con, 'synchronous') == 1
+        assert pragma(con, 'temp_store') == 2
+        assert pragma(con, 'foreign_keys') == 1
+        con.execute('CREATE TABLE t (x int)')
+
+    with SQLiteConnectionManager(db_file, profile='readonly-analytics') as manager:
+        con = manager.connection
+        assert pragma(con, 'journal_mode') == 'wal'
+        assert pragma(con, 'query_only') == 1
+        assert con.execute('SELECT count(*) FROM t').fetchone() == (0,)
+        with pytest.raises(sqlite3.OperationalError):
+            con.execute('INSERT INTO t VALUES (1)')
+
+
+def test_custom_pragma_profile(tmp_path):
+    db_file = str(tmp_path / 'profile.db')
+    with SQLiteConnectionManager(db_file, profile={'cache_size': -1024}) as manager:
+        assert pragma(manager.connection, 'cache_size') == -1024
+
+
+@pytest.mark.parametrize('profile', ['unknown', {'cache_size': '1; DROP TABLE t'}])
+def test_invalid_pragma_profile(profile):
+    with pytest.raises(ValueError):
+        SQLiteConnectionManager(DB_FILE, profile=profile)
+
+
+def test_shared_manager_profile_mismatch(tmp_path):
+    db_file = str(tmp_path / 'profile.db')
+    manager = get_connection_manager(db_file, 'durable')
+    assert get_connection_manager(db_file) is manager
+    assert get_connection_manager(db_file, 'durable') is manager
+    with pytest.raises(ValueError):
+        get_connection_manager(db_file, 'fast')
+
+
+def test_snapshot(tmp_path):
+    db_file = str(tmp_path / 'live.db')
+    snapshot_file = str(tmp_path / 'snapshot.db')
+    with SQLiteConnectionManager(db_file, profile='fast') as manager:
+        con = manager.connection
+        con.execute('CREATE TABLE t (x int)')
+        con.execute('INSERT INTO t VALUES (1)')
+        create_snapshot(db_file, snapshot_file)
+        con.execute('INSERT INTO t VALUES (2)')
+
+    with SQLiteConnectionManager(snapshot_file, read_only=True) as manager:
+        con = manager.connection
+        assert con.execute('SELECT x FROM t').fetchall() == [(1,)]
+        assert pragma(con, 'journal_mode') == 'delete'
+
+
+def test_shared_read_only_manager(tmp_path):
+    db_file = str(tmp_path / 'ro.db')
+    manager = get_connection_manager(db_file)
+    ro_manager = get_connection_manager(db_file, read_only=True)
+    assert ro_manager is not manager and ro_manager.read_only
+    assert get_connection_manager(db_file, read_only=True) is ro_manager
+
+
+def test_close_connection_managers(tmp_path):
+    db_file = str(tmp_path / 'shared.db')
+    other_file = str(tmp_path / 'other.db')
+    manager = get_connection_manager(db_file)
+    ro_manager = get_connection_manager(db_file, read_only=True)
+    other = get_connection_manager(other_file)
+    con = manager.connection
+
+    close_connection_managers(db_file)
+    with pytest.raises(sqlite3.ProgrammingError):
+        con.execute('SELECT 1')
+    assert get_connection_manager(db_file) is not manager
+    assert get_connection_manager(db_file, read_only=True) is not ro_manager
+    assert get_connection_manager(other_file) is other
+
+    close_connection_managers()
+    assert get_connection_manager(other_file) is not other
+    close_connection_managers()
+
+
+def test_failed_commit_rolls_back(tmp_path):
+    db_file = str(tmp_path / 'deferred.db')
+    with SQLiteConnectionManager(db_file) as manager:
+        con = manager.connection
+        con.execute('CREATE TABLE parent (pk INTEGER PRIMARY KEY)')
+        con.execute(
+            'CREATE TABLE child (parent_id INTEGER REFERENCES parent(pk)'
+            ' DEFERRABLE INITIALLY DEFERRED)'
+        )
+        with pytest.raises(sqlite3.IntegrityError):
+            with manager.transaction():
+                con.execute('INSERT INTO child VALUES (1)')
+        assert not con.in_transaction
+
+        with manager.transaction():
+            con.execute('INSERT INTO parent VALUES (1)')
+        assert not con.in_transaction
+        assert con.execute('SELECT pk FROM parent').fetchall() == [(1,)]
+        assert con.execute('SELECT * FROM child').fetchall() == []
@@ -1,8 +1,12 @@
 import pytest
 import sqlite3
+from inspect import isgenerator
 from dataclasses import dataclass
 from datetime import datetime, date
 from bookkeeper.repository.sqlite_repository import SQLiteRepository
+from bookkeeper.repository.abstract_repository import page_key
+from bookkeeper.repository.memory_repository import MemoryRepository
+from bookkeeper.repository.sqlite_connection import SQLiteConnectionManager
 
 DB_FILE = "bookkeeper_test.db"
 FIELD_INT = 1337
@@ -48,8 +52,18 @@ def custom_class():
 
 
 @pytest.fixture
-def repo(custom_class, create_schema):
-    return SQLiteRepository(db_file=DB_FILE, cls=custom_class)
+def connection_manager():
+    with SQLiteConnectionManager(DB_FILE) as manager:
+        yield manager
+
+
+@pytest.fixture
+def repo(custom_class, create_schema, connection_manager):
+    return SQLiteRepository(
+        db_file=DB_FILE,
+        cls=custom_class,
+        connection_manager=connection_manager,
+    )
 
 
 def test__row2obj(repo):
@@ -143,3 +157,280 @@ def test_get_all_with_condition(repo, custom_class):
     res = repo.get_all({'field_int': 0})
     assert res == [objs[0]]
     assert repo.get_all({'field_str': FILED_STR}) == objs
+
+
+def test_add_many(repo, custom_class):
+    objs = [custom_class(field_int=i) for i in range(5)]
+    pks = repo.add_many(objs)
+    assert pks == [obj.pk for obj in objs]
+    assert len(set(pks)) == len(objs)
+    assert repo.get_all() == objs
+
+
+def test_add_many_after_delete(repo, custom_class):
+    repo.delete(repo.add(custom_class()))
+    objs = [custom_class(field_int=i) for i in range(3)]
+    repo.add_many(objs)
+    assert all(repo.get(obj.pk) == obj for obj in objs)
+
+
+def test_cannot_add_many_with_filled_pk(repo, custom_class):
+    with pytest.raises(ValueError):
+        repo.add_many([custom_class(), custom_class(pk=1)])
+    assert repo.get_all() == []
+
+
+def test_update_many(repo, custom_class):
+    objs = [custom_class(field_int=i) for i in range(3)]
+    repo.add_many(objs)
+    for obj in objs:
+        obj.field_str = 'updated'
+    repo.update_many(objs)
+    assert repo.get_all({'field_str': 'updated'}) == objs
+
+
+def test_update_many_nonexistent_rolls_back(repo, custom_class):
+    obj = custom_class()
+    repo.add(obj)
+    obj.field_str = 'updated'
+    with pytest.raises(ValueError):
+        repo.update_many([obj, custom_class(pk=obj.pk + 1)])
+    assert repo.get(obj.pk).field_str == FILED_STR
+
+
+def test_delete_many(repo, custom_class):
+    pks = repo.add_many([custom_class() for _ in range(3)])
+    repo.delete_many(pks[:2])
+    assert [obj.pk for obj in repo.get_all()] == pks[2:]
+
+
+def test_cannot_delete_many_nonexistent(repo, custom_class):
+    pk = repo.add(custom_class())
+    with pytest.raises(ValueError):
+        repo.delete_many([pk, -1])
+    assert repo.get(pk) is not None
+
+
+def test_transaction_shared_between_repositories(repo, custom_class, connection_manager):
+    other_repo = SQLiteRepository(DB_FILE, custom_class, connection_manager)
+    with repo.transaction():
+        repo.add(custom_class(field_int=1))
+        other_repo.add(custom_class(field_int=2))
+        assert connection_manager.connection.in_transaction
+    assert not connection_manager.connection.in_transaction
+    with sqlite3.connect(DB_FILE) as con:
+        assert con.execute('SELECT count(*) FROM custom').fetchone() == (2,)
+    con.close()
+
+
+def test_transaction_rollback(repo, custom_class):
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.add(custom_class())
+            raise RuntimeError
+    assert repo.get_all() == []
+
+
+def test_nested_transaction_rollback_to_savepoint(repo, custom_class):
+    outer = custom_class(field_int=1)
+    with repo.transaction():
+        repo.add(outer)
+        with pytest.raises(ValueError):
+            with repo.transaction():
+                repo.add(custom_class(field_int=2))
+                repo.delete(-1)
+    assert repo.get_all() == [outer]
+
+
+def test_iter_all(repo, custom_class):
+    objs = [custom_class(field_int=i % 2) for i in range(5)]
+    repo.add_many(objs)
+    gen = repo.iter_all(batch_size=2)
+    assert isgenerator(gen)
+    assert list(gen) == objs
+    assert list(repo.iter_all({'field_int': 0}, batch_size=1)) == objs[::2]
+
+
+def test_get_page(repo, custom_class):
+    objs = [custom_class(field_int=i % 3) for i in range(7)]
+    repo.add_many(objs)
+    expected = sorted(objs, key=lambda obj: (obj.field_int, obj.pk))
+
+    first = repo.get_page(order_by='field_int', limit=4)
+    assert first == expected[:4]
+    second = repo.get_page(order_by='field_int', limit=4,
+                           after_key=page_key(first[-1], 'field_int'))
+    assert second == expected[4:]
+
+
+def test_get_page_descending_with_condition(repo, custom_class):
+    objs = [custom_class(field_int=i, field_str='ab'[i % 2]) for i in range(6)]
+    repo.add_many(objs)
+    page = repo.get_page({'field_str': 'a'}, order_by='-field_int', limit=2)
+    assert page == [objs[4], objs[2]]
+    page = repo.get_page({'field_str': 'a'}, order_by='-field_int', limit=2,
+                         after_key=page_key(page[-1], '-field_int'))
+    assert page == [objs[0]]
+
+
+def all_pages(repo, order_by, limit):
+    res, after_key = [], None
+    while page := repo.get_page(order_by=order_by, limit=limit, after_key=after_key):
+        res.extend(obj.pk for obj in page)
+        after_key = page_key(page[-1], order_by)
+    return res
+
+
+@pytest.mark.parametrize('order_by', ['field_int', '-field_int'])
+def test_get_page_nullable_field(repo, custom_class, order_by):
+    values = [2, None, 1, None, 2, 0, None, 1]
+    memory_repo = MemoryRepository()
+    for value in values:
+        repo.add(custom_class(field_int=value))
+        memory_repo.add(custom_class(field_int=value))
+
+    # Как NULL в SQLite: None меньше любого значения.
+    expected = sorted(
+        range(1, len(values) + 1),
+        key=lambda pk: (values[pk - 1] is not None, values[pk - 1] or 0, pk),
+        reverse=order_by.startswith('-'),
+    )
+    assert all_pages(repo, order_by, 3) == expected
+    assert all_pages(memory_repo, order_by, 3) == expected
+
+
+def test_get_page_by_pk(repo, custom_class):
+    objs = [custom_class() for _ in range(3)]
+    repo.add_many(objs)
+    assert repo.get_page(order_by='-pk', limit=2) == objs[:0:-1]
+    assert repo.get_page(limit=5, after_key=page_key(objs[0])) == objs[1:]
+
+
+def test_get_page_unknown_field(repo):
+    with pytest.raises(ValueError):
+        repo.get_page(order_by='pk; DROP TABLE custom')
+
+
+def test_get_all_with_operators(repo, custom_class):
+    objs = [custom_class(field_int=i, field_str=f'str{i}') for i in range(5)]
+    objs.append(custom_class(field_int=None, field_str='other'))
+    repo.add_many(objs)
+    assert repo.get_all({'field_int__gte': 1, 'field_int__lt': 3}) == objs[1:3]
+    assert repo.get_all({'field_int__in': [0, 4]}) == [objs[0], objs[4]]
+    assert repo.get_all({'field_int__in': []}) == []
+    assert repo.get_all({'field_int__ne': 0}) == objs[1:]
+    assert repo.get_all({'field_int': None}) == objs[5:]
+    assert repo.get_all({'field_int__isnull': False}) == objs[:5]
+    assert repo.get_all({'field_str__like': 'STR%'}) == objs[:5]
+    assert repo.get_all({'field_int__lt': None}) == []
+    assert list(repo.iter_all({'field_int__gt': 3})) == [objs[4]]
+
+
+@pytest.mark.parametrize('where', [
+    {'field_int__in': [None, 1]},
+    {'field_int__lt': None},
+    {'field_int__ne': None},
+    {'field_int': None},
+    {'field_str__like': 'мясо%'},
+    {'field_str__like': 'STR%'},
+])
+def test_conditions_match_memory_repository(repo, custom_class, where):
+    memory_repo = MemoryRepository()
+    for i, name in enumerate(['str1', 'Мясо', 'мясо', None, 'STR2']):
+        value = None if i % 2 else i % 3
+        repo.add(custom_class(field_int=value, field_str=name))
+        memory_repo.add(custom_class(field_int=value, field_str=name))
+    assert [obj.pk for obj in repo.get_all(where)] \
+        == [obj.pk for obj in memory_repo.get_all(where)]
+
+
+def test_get_all_by_date_range(repo, custom_class):
+    days = [date(2023, 1, day) for day in (1, 15, 31)]
+    objs = [custom_class(field_date=day) for day in days]
+    repo.add_many(objs)
+    res = repo.get_all({
+        'field_date__gte': date(2023, 1, 2),
+        'field_date__lt': date(2023, 2, 1),
+    })
+    assert res == objs[1:]
+
+
+def test_get_all_unknown_field(repo):
+    with pytest.raises(ValueError):
+        repo.get_all({'unknown': 1})
+
+
+def test_aggregate(repo, custom_class):
+    days = [date(2023, 1, 1), date(2023, 1, 1), date(2023, 1, 2)]
+    objs = [custom_class(field_int=i + 1, field_date=day) for i, day in enumerate(days)]
+    objs.append(custom_class(field_int=None, field_date=days[2]))
+    repo.add_many(objs)
+    assert repo.aggregate('sum', 'field_int') == 6
+    assert repo.aggregate('count', 'field_int') == 3
+    assert repo.aggregate('count', 'pk') == 4
+    assert repo.aggregate('avg', 'field_int') == 2
+    assert repo.aggregate('max', 'field_date') == date(2023, 1, 2)
+    assert repo.aggregate('sum', 'field_int', where={'field_int__gt': 1}) == 5
+    assert repo.aggregate('sum', 'field_int', where={'field_int__gt': 10}) == 0
+    assert repo.aggregate('min', 'field_int', where={'field_int__gt': 10}) is None
+    assert repo.aggregate('sum', 'field_int', group_by='field_date') == {
+        date(2023, 1, 1): 3,
+        date(2023, 1, 2): 3,
+    }
+
+
+def test_aggregate_group_by_truncated_date(repo, custom_class):
+    # 2023-01-01 - воскресенье, 2023-01-02 - понедельник
+    days = [date(2022, 12, 31), date(2023, 1, 1), date(2023, 1, 2), date(2023, 2, 5)]
+    repo.add_many(
+        custom_class(field_int=i + 1, field_str='ab'[i % 2], field_date=day)
+        for i, day in enumerate(days)
+    )
+    assert repo.aggregate('sum', 'field_int', group_by='field_date__week') == {
+        date(2022, 12, 26): 3, date(2023, 1, 2): 3, date(2023, 1, 30): 4,
+    }
+    assert repo.aggregate('sum', 'field_int', group_by='field_datetime__year') == {
+        FIELD_DATETIME.date().replace(month=1, day=1): 10,
+    }
+    assert repo.aggregate(
+        'count', 'pk', group_by=('field_date__month', 'field_str'),
+        where={'field_date__gte': date(2023, 1, 1)},
+    ) == {
+        (date(2023, 1, 1), 'a'): 1,
+        (date(2023, 1, 1), 'b'): 1,
+        (date(2023, 2, 1), 'b'): 1,
+    }
+    with pytest.raises(ValueError):
+        repo.aggregate('sum', 'field_int', group_by='unknown__month')
+
+
+def test_aggregate_unknown_function(repo):
+    with pytest.raises(ValueError):
+        repo.aggregate('median', 'field_int')
+
+
+def test_read_only(repo, custom_class):
+    obj = custom_class()
+    pk = repo.add(obj)
+    with SQLiteConnectionManager(DB_FILE, read_only=True) as manager:
+        ro_repo = SQLiteRepository(DB_FILE, custom_class, manager)
+        assert ro_repo.read_only and not repo.read_only
+        assert ro_repo.get(pk) == obj
+        assert ro_repo.aggregate('count', 'pk') == 1
+
+        for write in [
+            lambda: ro_repo.add(custom_class()),
+            lambda: ro_repo.add_many([custom_class()]),
+            lambda: ro_repo.update(obj),
+            lambda: ro_repo.update_many([obj]),
+            lambda: ro_repo.delete(pk),
+            lambda: ro_repo.delete_many([pk]),
+        ]:
+            with pytest.raises(PermissionError):
+                write()
+        with pytest.raises(sqlite3.OperationalError):
+            manager.connection.execute('DELETE FROM custom')
+
+        with ro_repo.transaction():
+            assert len(ro_repo.get_all()) == 1
+    assert repo.get(pk) == obj
@@ -0,0 +1,109 @@
+"""
+Тесты для таблицы, подгружающей строки страницами
+"""
+import pytest
+
+QtWidgets = pytest.importorskip('PySide6.QtWidgets')
+from PySide6.QtCore import QModelIndex, Qt  # noqa: E402
+from bookkeeper.view.widget.common import LazyTable, LazyTableModel  # noqa: E402
+
+HEADERS = ['Дата', 'Сумма']
+
+
+def make_rows(first, count):
+    return [[str(i), str(i * 10)] for i in range(first, first + count)]
+
+
+@pytest.fixture
+def requests():
+    return []
+
+
+@pytest.fixture
+def model(app, requests):
+    model = LazyTableModel(HEADERS, page_size=3)
+    model.reset(requests.append)
+    return model
+
+
+@pytest.fixture
+def signals(model):
+    signals = []
+    model.rowsInserted.connect(
+        lambda parent, first, last: signals.append(('inserted', first, last)))
+    model.rowsRemoved.connect(
+        lambda parent, first, last: signals.append(('removed', first, last)))
+    model.dataChanged.connect(
+        lambda top_left, bottom_right: signals.append(
+            ('changed', top_left.row(), top_left.column(),
+             bottom_right.row(), bottom_right.column())))
+    return signals
+
+
+def test_fetch_pages(model, requests):
+    root = QModelIndex()
+    assert requests == [3]
+    # Пока страница не получена, следующая не запрашивается.
+    assert not model.canFetchMore(root)
+    model.fetchMore(root)
+    assert requests == [3]
+
+    model.append_rows(make_rows(0, 3))
+    assert model.rowCount() == 3 and model.columnCount() == 2
+    assert model.canFetchMore(root)
+    model.fetchMore(root)
+    assert requests == [3, 3]
+
+    model.append_rows(make_rows(3, 2))
+    assert not model.has_more
+    assert not model.canFetchMore(root)
+    assert model.rowCount() == 5
+    assert model.data(model.index(4, 1)) == '40'
+    assert model.headerData(1, Qt.Orientation.Horizontal) == 'Сумма'
+
+
+def test_empty_page_stops_fetching(model):
+    model.append_rows(make_rows(0, 3))
+    model.append_rows([])
+    assert not model.has_more
+    assert model.rowCount() == 3
+
+
+def test_reset(model, requests):
+    model.append_rows(make_rows(0, 3))
+    model.reset(requests.append)
+    assert model.rowCount() == 0
+    assert requests == [3, 3]
+    model.reset(None)
+    assert not model.canFetchMore(QModelIndex())
+
+
+def test_row_signals(model, signals):
+    model.append_rows(make_rows(0, 3))
+    assert signals == [('inserted', 0, 2)]
+
+    model.insert_row(1, ['x', 'y'])
+    model.update_row(2, ['u', 'v'])
+    model.remove_row(0)
+    assert signals[1:] == [
+        ('inserted', 1, 1),
+        ('changed', 2, 0, 2, 1),
+        ('removed', 0, 0),
+    ]
+    assert model.rows == [['x', 'y'], ['u', 'v'], make_rows(2, 1)[0]]
+
+
+def test_lazy_table_fetches_visible_rows(app):
+    requests = []
+    table = LazyTable(HEADERS, [QtWidgets.QHeaderView.ResizeMode.Stretch] * 2)
+    table.resize(300, 600)
+    table.table_model.page_size = 2
+    table.show()
+    table.table_model.reset(requests.append)
+    table.table_model.append_rows(make_rows(0, 2))
+    for _ in range(5):
+        app.processEvents()
+    # Две строки не заполняют таблицу по высоте - запрошена следующая страница.
+    assert requests == [2, 2]
+    assert table.row(1) == ['1', '10']
+    table.close()